@@ -1,31 +1,53 @@
-from fastapi import APIRouter, Depends
-from app.services.deps import configurator, settings, key_manager, ml_service, crypto_service
+from fastapi import APIRouter, Depends, HTTPException
+from app.services import deps
+from app.services.deps import configurator
 from app.schemas import ConfigOptions, ConfigUpdate
 from app.api.routes.auth import get_current_user
+from app.crypto.core.kdf import configure_kdf
 
 router = APIRouter()
 
 @router.get("/", response_model=ConfigOptions)
 async def get_config(_=Depends(get_current_user)):
-    return settings
+    return deps.settings
 
 @router.post("/", response_model=ConfigOptions)
 async def update_config(upd: ConfigUpdate, _=Depends(get_current_user)):
+    # Сначала проверяем весь запрос: при ошибке конфигуратор не должен остаться наполовину изменённым
+    kdf_changed = upd.kdf_profile is not None or upd.kdf_iterations is not None
+    if kdf_changed:
+        try:
+            configurator.validate_kdf(upd.kdf_profile, upd.kdf_iterations)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
     if upd.core_type    is not None: configurator.set_core(upd.core_type)
     if upd.entropy_source is not None: configurator.set_entropy_source(upd.entropy_source)
     if upd.retrain_autoencoder is not None: configurator.set_retrain(upd.retrain_autoencoder)
+    if kdf_changed: configurator.set_kdf(upd.kdf_profile, upd.kdf_iterations)
 
     new_settings = configurator.build()
 
-    # Monkey-patch сервисов в deps
-    import app.services.deps as deps
+    # Monkey-patch сервисов в deps (роуты читают их как deps.<имя> при каждом вызове)
     deps.settings        = new_settings
-    deps.key_manager     = deps.KeyManager(new_settings.entropy_source)
-    deps.ml_service      = deps.MLService(new_settings.retrain_autoencoder)
+    deps.kdf             = configure_kdf(new_settings.kdf_profile, new_settings.kdf_iterations)
+    deps.key_manager     = deps.KeyManager(
+        new_settings.entropy_source,
+        shards=deps.cfg.KEY_MANAGER_SHARDS,
+        ttl=deps.cfg.SYMMETRIC_KEY_TTL_SECONDS or None,
+        max_size=deps.cfg.SYMMETRIC_KEY_MAX or None,
+    )
+    # MLService один на процесс (реестр моделей, фоновый retrainer): только
+    # переключаем флаг; до этапа "models" его возьмёт load_models из deps.settings
+    if deps.ml_service is not None:
+        deps.ml_service.retrain = new_settings.retrain_autoencoder
     deps.crypto_service  = deps.CryptoService(
-        core_type=new_settings.core_type,
+        settings=new_settings,
         key_manager=deps.key_manager,
         ml_service=deps.ml_service,
-        entropy_source=new_settings.entropy_source
+        encoder=deps.encoder,
+        batch_processor=deps.batch_processor,
+        key_pool=deps.symmetric_key_pool,
+        algorithm=deps.cfg.SYMMETRIC_ALGORITHM,
     )
     return new_settings
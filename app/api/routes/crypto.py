@@ -1,7 +1,17 @@
+import json
 import base64
-from fastapi import APIRouter, Depends, HTTPException
-from app.schemas import EncryptRequest, EncryptResponse, DecryptRequest, DecryptResponse
-from app.services.deps import crypto_service
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Header, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from app.schemas import (
+    EncryptRequest, EncryptResponse, DecryptRequest, DecryptResponse,
+    BatchEncryptRequest, BatchDecryptRequest, BatchItemResult, BatchResponse,
+    KeyPoolStats,
+)
+from app.services import deps
+from app.services.batch import BatchTooLarge, check_batch_size
+from app.services.deps import cfg
 from app.api.routes.auth import get_current_user
 
 router = APIRouter()
@@ -13,7 +23,9 @@ async def encrypt_endpoint(
 ):
     data_bytes = req.data.encode("utf-8")
     try:
-        ct_bytes, metrics = crypto_service.encrypt(
+        # выпуск ключа (пул или encoder.predict) и шифрование — в пуле потоков
+        ct_bytes, metrics = await run_in_threadpool(
+            deps.crypto_service.encrypt,
             key_id=req.key_id,
             data=data_bytes,
             retrain=req.retrain_autoencoder,
@@ -35,7 +47,8 @@ async def decrypt_endpoint(
         # 1) раскодируем base64-текст
         ct = base64.b64decode(req.ciphertext)
         # 2) передадим вместе с ним metadata (сюда входит IV)
-        pt_bytes, metrics = crypto_service.decrypt(
+        pt_bytes, metrics = await run_in_threadpool(
+            deps.crypto_service.decrypt,
             key_id=req.key_id,
             payload=ct,
             metadata=req.metadata,
@@ -48,4 +61,187 @@ async def decrypt_endpoint(
         plaintext=pt_bytes.decode("utf-8"),
         metrics=metrics,
         metadata=req.metadata,
-    )
\ No newline at end of file
+    )
+
+
+@router.get("/pool/stats", response_model=KeyPoolStats)
+async def key_pool_stats(_=Depends(get_current_user)):
+    return KeyPoolStats(**deps.symmetric_key_pool.stats())
+
+
+def _check_batch(items) -> None:
+    # пустой пакет — 400, слишком большой — 413
+    try:
+        check_batch_size(items, cfg.BATCH_MAX_ITEMS)
+    except BatchTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/encrypt/batch", response_model=BatchResponse)
+async def encrypt_batch_endpoint(
+    req: BatchEncryptRequest,
+    _=Depends(get_current_user),
+):
+    """
+    Шифрует список сообщений под одним key_id: ключ выпускается
+    один раз, элементы обрабатываются в пуле потоков.
+    """
+    _check_batch(req.items)
+    try:
+        outcomes = await run_in_threadpool(
+            deps.crypto_service.encrypt_batch,
+            req.key_id,
+            [item.encode("utf-8") for item in req.items],
+            req.retrain_autoencoder,
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    results = []
+    for i, (ok, value) in enumerate(outcomes):
+        if ok:
+            ct_bytes, metadata = value
+            results.append(BatchItemResult(
+                index=i, ok=True,
+                result=base64.b64encode(ct_bytes).decode("utf-8"),
+                metadata=metadata,
+            ))
+        else:
+            results.append(BatchItemResult(index=i, ok=False, error=value))
+    return BatchResponse(results=results)
+
+
+@router.post("/decrypt/batch", response_model=BatchResponse)
+async def decrypt_batch_endpoint(
+    req: BatchDecryptRequest,
+    _=Depends(get_current_user),
+):
+    _check_batch(req.items)
+    payloads, positions = [], []
+    results = {}
+    for i, item in enumerate(req.items):
+        try:
+            payloads.append((base64.b64decode(item.ciphertext, validate=True), item.metadata))
+            positions.append(i)
+        except ValueError:
+            # битый base64 — ошибка только этого элемента, в пакет он не идёт
+            results[i] = BatchItemResult(index=i, ok=False, error="invalid base64")
+    try:
+        outcomes = await run_in_threadpool(deps.crypto_service.decrypt_batch, req.key_id, payloads)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    for i, (ok, value) in zip(positions, outcomes):
+        if ok:
+            try:
+                results[i] = BatchItemResult(index=i, ok=True, result=value.decode("utf-8"))
+            except UnicodeDecodeError:
+                results[i] = BatchItemResult(index=i, ok=False, error="Plaintext is not valid UTF-8")
+        else:
+            results[i] = BatchItemResult(index=i, ok=False, error=value)
+    return BatchResponse(results=[results[i] for i in range(len(req.items))])
+
+
+async def _pump(request: Request, stream):
+    # тело читается по кускам, в памяти — не больше чанка
+    async for piece in request.stream():
+        out = stream.update(piece)
+        if out:
+            yield out
+    yield stream.finalize()
+
+
+@router.post("/encrypt/stream")
+async def encrypt_stream_endpoint(
+    request: Request,
+    key_id: str,
+    retrain_autoencoder: Optional[bool] = None,
+    _=Depends(get_current_user),
+):
+    """
+    Шифрует сырое тело запроса потоком (AES-256-GCM, схема STREAM)
+    и отдаёт шифротекст по мере поступления данных.
+    """
+    try:
+        sealer = await run_in_threadpool(
+            deps.crypto_service.encrypt_stream, key_id, retrain_autoencoder, cfg.STREAM_CHUNK_SIZE,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return StreamingResponse(_pump(request, sealer), media_type="application/octet-stream")
+
+
+@router.post("/decrypt/stream")
+async def decrypt_stream_endpoint(
+    request: Request,
+    key_id: str,
+    _=Depends(get_current_user),
+):
+    """
+    Потоковая расшифровка: каждый кадр проверяется и отдаётся сразу.
+    Ошибка проверки после начала ответа обрывает соединение, так что
+    клиент должен считать неполный ответ недействительным.
+    """
+    try:
+        opener = deps.crypto_service.decrypt_stream(key_id)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return StreamingResponse(_pump(request, opener), media_type="application/octet-stream")
+
+
+# Метаданные (IV и т.п.) в бинарных эндпоинтах передаются компактным
+# JSON в заголовке, тело — сырые байты без base64.
+METADATA_HEADER = "X-Crypto-Metadata"
+
+
+@router.post("/encrypt/raw")
+async def encrypt_raw_endpoint(
+    request: Request,
+    key_id: str = Header(..., alias="X-Key-Id"),
+    retrain_autoencoder: Optional[bool] = Header(None, alias="X-Retrain-Autoencoder"),
+    _=Depends(get_current_user),
+):
+    """
+    Бинарный вариант /crypto/encrypt: тело — произвольные байты,
+    ответ — шифротекст, метаданные — в заголовке X-Crypto-Metadata.
+    """
+    data = await request.body()
+    try:
+        ct_bytes, metadata = await run_in_threadpool(
+            deps.crypto_service.encrypt, key_id, data, retrain_autoencoder,
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return Response(
+        content=ct_bytes,
+        media_type="application/octet-stream",
+        headers={METADATA_HEADER: json.dumps(metadata, separators=(",", ":"))},
+    )
+
+
+@router.post("/decrypt/raw")
+async def decrypt_raw_endpoint(
+    request: Request,
+    key_id: str = Header(..., alias="X-Key-Id"),
+    metadata: str = Header("{}", alias=METADATA_HEADER),
+    _=Depends(get_current_user),
+):
+    try:
+        meta = json.loads(metadata)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid JSON in {METADATA_HEADER}")
+    if not isinstance(meta, dict):
+        raise HTTPException(status_code=400, detail=f"{METADATA_HEADER} must be a JSON object")
+
+    payload = await request.body()
+    try:
+        pt_bytes, _ = await run_in_threadpool(deps.crypto_service.decrypt, key_id, payload, meta)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return Response(content=pt_bytes, media_type="application/octet-stream")
@@ -0,0 +1,34 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import JSONResponse
+from app.schemas import HealthStatus
+from app.services.deps import lifecycle
+
+router = APIRouter(tags=["health"])
+
+
+def require_ready() -> None:
+    """
+    Зависимость для роутов, которым нужны модели и пулы ключей:
+    до окончания прогрева отвечаем 503 вместо AttributeError на None.
+    """
+    if not lifecycle.ready:
+        status = lifecycle.status()
+        raise HTTPException(
+            status_code=503,
+            detail=f"Service is warming up (stage: {status['stage'] or status['state']})",
+            headers={"Retry-After": "5"},
+        )
+
+
+@router.get("/live", response_model=HealthStatus)
+async def live():
+    # процесс жив и обслуживает запросы, даже если прогрев не закончен
+    return HealthStatus(**lifecycle.status())
+
+
+@router.get("/ready", response_model=HealthStatus)
+async def ready():
+    status = HealthStatus(**lifecycle.status())
+    if not lifecycle.ready:
+        return JSONResponse(status_code=503, content=status.model_dump())
+    return status
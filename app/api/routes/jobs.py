@@ -0,0 +1,42 @@
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException
+from app.schemas import JobInfo, JobSchedulerStats
+from app.services.deps import job_scheduler
+from app.api.routes.auth import get_current_user
+
+router = APIRouter()
+
+
+def _get_job(job_id: str):
+    try:
+        return job_scheduler.get(job_id)
+    except KeyError as e:
+        raise HTTPException(404, str(e))
+
+
+@router.get("/", response_model=List[JobInfo])
+async def list_jobs(_=Depends(get_current_user)):
+    return [JobInfo(**job.info()) for job in job_scheduler.list()]
+
+
+@router.get("/stats", response_model=JobSchedulerStats)
+async def jobs_stats(_=Depends(get_current_user)):
+    return JobSchedulerStats(**job_scheduler.stats())
+
+
+@router.get("/{job_id}", response_model=JobInfo)
+async def get_job(job_id: str, _=Depends(get_current_user)):
+    # прогресс, метрики (loss), время и результат (MSE) задачи
+    return JobInfo(**_get_job(job_id).info())
+
+
+@router.post("/{job_id}/cancel", response_model=JobInfo)
+async def cancel_job(job_id: str, _=Depends(get_current_user)):
+    """
+    Ждущая задача снимается с очереди сразу; запущенная
+    останавливается после ближайшего батча обучения.
+    """
+    job = _get_job(job_id)
+    if not job_scheduler.cancel(job_id):
+        raise HTTPException(409, f"Job '{job_id}' already {job.state}")
+    return JobInfo(**job.info())
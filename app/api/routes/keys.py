@@ -1,17 +1,21 @@
 from fastapi import APIRouter, HTTPException
-from app.schemas import KeyOut
-from app.services.deps import key_manager
+from app.schemas import KeyOut, KeyStoreStats
+from app.services import deps
 
 router = APIRouter()
 
 @router.post("/", response_model=KeyOut)
 async def create_key():
-    kid = key_manager.create_key()
+    kid = deps.key_manager.create_key()
     return KeyOut(key_id=kid, algorithm="AES-256-CBC", length=32)
 
+@router.get("/stats", response_model=KeyStoreStats)
+async def key_store_stats():
+    return KeyStoreStats(**deps.key_manager.stats())
+
 @router.get("/{key_id}", response_model=KeyOut)
 async def get_key(key_id: str):
-    key = key_manager.get_key(key_id)
+    key = deps.key_manager.get_key(key_id)
     if not key:
         raise HTTPException(status_code=404, detail="Key not found")
     return KeyOut(key_id=key_id, algorithm="AES-256-CBC", length=len(key))
@@ -0,0 +1,43 @@
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException
+from app.schemas import ModelInfo, RetrainStats, InferenceStats
+from app.services import deps
+from app.api.routes.auth import get_current_user
+
+router = APIRouter()
+
+
+def _retrain_stats() -> RetrainStats:
+    ml = deps.ml_service
+    return RetrainStats(version=ml.encoder.version, **ml.retrainer.stats())
+
+
+@router.get("/", response_model=List[ModelInfo])
+async def list_models(_=Depends(get_current_user)):
+    # версии и занимаемая память моделей из общего реестра
+    return [ModelInfo(**info) for info in deps.model_registry.stats()]
+
+
+@router.get("/retrain", response_model=RetrainStats)
+async def retrain_status(_=Depends(get_current_user)):
+    return _retrain_stats()
+
+
+@router.post("/retrain", response_model=RetrainStats, status_code=202)
+async def schedule_retrain(_=Depends(get_current_user)):
+    """
+    Ставит дообучение в фон; новая версия появится в GET /models/
+    после атомарной замены, до этого запросы обслуживает текущая.
+    """
+    if not deps.ml_service.schedule_retrain():
+        if not deps.ml_service.retrain:
+            raise HTTPException(409, "Autoencoder retraining is disabled")
+    return _retrain_stats()
+
+
+@router.get("/inference/stats", response_model=InferenceStats)
+async def inference_stats(_=Depends(get_current_user)):
+    # задержка в зависимости от размера микро-батча
+    if deps.inference_batcher is None:
+        raise HTTPException(404, "Inference batching is disabled")
+    return InferenceStats(**deps.inference_batcher.stats())
@@ -1,6 +1,11 @@
+import asyncio
 import binascii
+import json
+from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Header, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from cryptography.hazmat.primitives import serialization
 import time
 from concurrent.futures import ThreadPoolExecutor
@@ -13,28 +18,42 @@ from app.schemas import (
     RSADecryptRequest,
     RSADecryptResponse,
     RetrainingResult,
+    JobInfo,
+    KeyPoolStats,
+    RSAKeyStoreStats,
+    PrimeSearchStats,
+    EntropySamplerStats,
+    DecryptTimingStats,
+    RSABatchEncryptRequest,
+    RSABatchDecryptRequest,
+    BatchItemResult,
+    BatchResponse,
 )
 from app.crypto.core.enhanced_rsa import (
     generate_enhanced_rsa_keys_from_image,
+    encode_latents,
+    derive_rsa_keys_from_latent,
     rsa_encrypt_with_metadata,
-    rsa_decrypt_with_metadata,
+    rsa_hybrid_encrypt,
+    rsa_hybrid_decrypt,
+    is_hybrid_container,
+    oaep_max_plaintext,
 )
-from app.crypto.autoencoder.retraining import (
-    dynamic_retraining_test,
-    dynamic_retraining_with_chaos_maps,
+from app.crypto.core.security import secure_decrypt_async, decrypt_container
+from app.services import deps
+from app.services.batch import BatchTooLarge, check_batch_size
+from app.services.deps import (
+    cfg, prime_engine, entropy_sampler, timing_equalizer, batch_processor, rsa_key_manager,
+    job_scheduler,
 )
-from app.services.rsa_key_manager import RSAKeyManager
-from app.services.deps import encoder, autoencoder
 
 router = APIRouter()
-rsa_km = RSAKeyManager()
+rsa_km = rsa_key_manager
+# Потоки KDF/prime-стадий пакетной генерации (сами простые ищет prime_engine)
+batch_executor = ThreadPoolExecutor(max_workers=cfg.RSA_BATCH_WORKERS)
 
 
-@router.post("/generate", response_model=RSAKeyOut)
-async def rsa_generate(_=Depends(get_current_user)):
-    priv, pub, entropy, ts = generate_enhanced_rsa_keys_from_image(encoder)
-    key_id = rsa_km.create(priv, pub, entropy, ts)
-
+def _key_out(key_id, priv, pub, entropy, ts) -> RSAKeyOut:
     return RSAKeyOut(
         key_id=key_id,
         private_key_pem=priv.private_bytes(
@@ -42,15 +61,74 @@ async def rsa_generate(_=Depends(get_current_user)):
             serialization.PrivateFormat.PKCS8,
             serialization.NoEncryption(),
         ).decode("utf-8"),
-        public_key_pem=pub.public_bytes(
-            serialization.Encoding.PEM,
-            serialization.PublicFormat.SubjectPublicKeyInfo,
-        ).decode("utf-8"),
+        # PEM уже сериализован при сохранении ключа
+        public_key_pem=rsa_km.public_pem(key_id).decode("utf-8"),
         entropy=entropy.hex(),
         timestamp=ts.decode("utf-8"),
     )
 
 
+@router.post("/generate", response_model=RSAKeyOut)
+async def rsa_generate(_=Depends(get_current_user)):
+    # Ключ из пула (O(1)); при пустом пуле — генерация в пуле потоков, не в event loop
+    priv, pub, entropy, ts = await run_in_threadpool(deps.rsa_key_pool.acquire)
+    key_id = await run_in_threadpool(rsa_km.create, priv, pub, entropy, ts)
+    return _key_out(key_id, priv, pub, entropy, ts)
+
+
+@router.post("/generate/batch")
+async def rsa_generate_batch(
+    count: int = Query(..., ge=1, le=cfg.RSA_BATCH_MAX_COUNT),
+    _=Depends(get_current_user),
+):
+    """
+    POST /rsa/generate/batch?count=N
+
+    Все N изображений и латентов считаются одним encoder.predict,
+    KDF- и prime-стадии идут параллельно по ключам. Ответ — NDJSON:
+    по строке RSAKeyOut на каждый ключ в порядке готовности
+    (или {"error": ...}, если ключ построить не удалось).
+    """
+    latents = await run_in_threadpool(encode_latents, deps.encoder, count)
+    loop = asyncio.get_running_loop()
+
+    async def _stream():
+        futures = [
+            loop.run_in_executor(batch_executor, derive_rsa_keys_from_latent, latent)
+            for latent in latents
+        ]
+        for fut in asyncio.as_completed(futures):
+            try:
+                priv, pub, entropy, ts = await fut
+            except Exception as e:
+                yield json.dumps({"error": str(e)}) + "\n"
+                continue
+            key_id = await run_in_threadpool(rsa_km.create, priv, pub, entropy, ts)
+            yield _key_out(key_id, priv, pub, entropy, ts).model_dump_json() + "\n"
+
+    return StreamingResponse(_stream(), media_type="application/x-ndjson")
+
+
+@router.get("/pool/stats", response_model=KeyPoolStats)
+async def rsa_pool_stats(_=Depends(get_current_user)):
+    return KeyPoolStats(**deps.rsa_key_pool.stats())
+
+
+@router.get("/keys/stats", response_model=RSAKeyStoreStats)
+async def rsa_key_store_stats(_=Depends(get_current_user)):
+    return RSAKeyStoreStats(**rsa_km.stats())
+
+
+@router.get("/primes/stats", response_model=PrimeSearchStats)
+async def rsa_prime_stats(_=Depends(get_current_user)):
+    return PrimeSearchStats(**prime_engine.stats())
+
+
+@router.get("/entropy/stats", response_model=EntropySamplerStats)
+async def rsa_entropy_stats(_=Depends(get_current_user)):
+    return EntropySamplerStats(**entropy_sampler.stats())
+
+
 @router.post("/encrypt", response_model=RSAEncryptResponse)
 async def rsa_encrypt(
     req: RSAEncryptRequest,
@@ -60,22 +138,34 @@ async def rsa_encrypt(
     POST /rsa/encrypt
     {
       "key_id": "...",
-      "data":   "Hello, RSA!"
+      "data":   "Hello, RSA!",
+      "mode":   "oaep" | "hybrid"   (необязательно)
     }
+    Без mode данные длиннее лимита RSA-OAEP шифруются гибридно
+    (RSA оборачивает ключ данных, нагрузка — AES-256-GCM чанками).
     """
-    try:
-        priv, pub, entropy, ts = rsa_km.get(req.key_id)
-    except KeyError as e:
-        raise HTTPException(status_code=404, detail=str(e))
-
-    container = rsa_encrypt_with_metadata(
-        pub, priv, entropy, ts, req.data.encode("utf-8")
-    )
+    container = await _encrypt_bytes(req.key_id, req.data.encode("utf-8"), req.mode)
     return RSAEncryptResponse(
         ciphertext_asn1_hex=binascii.hexlify(container).decode("utf-8")
     )
 
 
+async def _encrypt_bytes(key_id: str, data: bytes, mode=None) -> bytes:
+    priv, pub, entropy, ts = await _key_entry(key_id)
+
+    mode = mode or ("hybrid" if len(data) > oaep_max_plaintext(pub) else "oaep")
+    if mode == "hybrid":
+        container = await run_in_threadpool(rsa_hybrid_encrypt, pub, entropy, ts, data)
+    elif mode == "oaep":
+        try:
+            container = rsa_encrypt_with_metadata(pub, priv, entropy, ts, data)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    else:
+        raise HTTPException(status_code=400, detail=f"Unknown mode '{mode}'")
+    return container
+
+
 @router.post("/decrypt", response_model=RSADecryptResponse)
 async def rsa_decrypt(
     req: RSADecryptRequest,
@@ -88,10 +178,8 @@ async def rsa_decrypt(
       "ciphertext_asn1_hex": "..."
     }
     """
-    try:
-        priv, _, _, _ = rsa_km.get(req.key_id)
-    except KeyError as e:
-        raise HTTPException(status_code=404, detail=str(e))
+    # неизвестный ключ — 404 раньше, чем проверка hex
+    priv = (await _key_entry(req.key_id))[0]
 
     # hex → bytes
     try:
@@ -99,75 +187,237 @@ async def rsa_decrypt(
     except binascii.Error:
         raise HTTPException(status_code=400, detail="Invalid hex in ciphertext_asn1_hex")
 
-    # Расшифровка (теперь возвращает только plaintext)
+    plaintext_bytes = await _decrypt_bytes(priv, container)
+
+    # Попробуем декодировать UTF-8, иначе base64
+    return RSADecryptResponse(plaintext=_plaintext_text(plaintext_bytes))
+
+
+async def _key_entry(key_id: str):
+    # попадание в кэш — сразу; промах (чтение из базы + расшифровка PEM) — в пуле потоков
+    entry = rsa_km.cached(key_id)
+    if entry is not None:
+        return entry
     try:
-        plaintext_bytes = rsa_decrypt_with_metadata(container, priv)
+        return await run_in_threadpool(rsa_km.get, key_id)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+async def _decrypt_bytes(priv, container: bytes) -> bytes:
+    # Ослеплённая КТО-расшифровка в пуле потоков, выравнивание времени — в event loop
+    try:
+        if is_hybrid_container(container):
+            plaintext_bytes = await timing_equalizer.run(rsa_hybrid_decrypt, container, priv)
+        else:
+            plaintext_bytes = await secure_decrypt_async(container, priv)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
+    return plaintext_bytes
 
-    # Попробуем декодировать UTF-8, иначе base64
+
+@router.post("/encrypt/raw")
+async def rsa_encrypt_raw(
+    request: Request,
+    key_id: str = Header(..., alias="X-Key-Id"),
+    mode: Optional[str] = Header(None, alias="X-Crypto-Mode"),
+    _=Depends(get_current_user),
+):
+    """
+    Бинарный вариант /rsa/encrypt: тело — произвольные байты,
+    ответ — DER-контейнер как application/octet-stream.
+    """
+    container = await _encrypt_bytes(key_id, await request.body(), mode)
+    return Response(content=container, media_type="application/octet-stream")
+
+
+@router.post("/decrypt/raw")
+async def rsa_decrypt_raw(
+    request: Request,
+    key_id: str = Header(..., alias="X-Key-Id"),
+    _=Depends(get_current_user),
+):
+    """
+    Бинарный вариант /rsa/decrypt: тело — DER-контейнер,
+    ответ — открытый текст как есть, без UTF-8/base64.
+    """
+    priv = (await _key_entry(key_id))[0]
+    plaintext_bytes = await _decrypt_bytes(priv, await request.body())
+    return Response(content=plaintext_bytes, media_type="application/octet-stream")
+
+
+def _plaintext_text(plaintext_bytes: bytes) -> str:
+    # UTF-8, иначе base64 — как в /rsa/decrypt
     try:
-        text = plaintext_bytes.decode("utf-8")
+        return plaintext_bytes.decode("utf-8")
     except UnicodeDecodeError:
         import base64
-        text = base64.b64encode(plaintext_bytes).decode("ascii")
+        return base64.b64encode(plaintext_bytes).decode("ascii")
 
-    return RSADecryptResponse(plaintext=text)
 
+def _check_batch(items) -> None:
+    # пустой пакет — 400, слишком большой — 413
+    try:
+        check_batch_size(items, cfg.BATCH_MAX_ITEMS)
+    except BatchTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-@router.post("/test/random", response_model=RetrainingResult)
-async def rsa_test_random(_=Depends(get_current_user)):
-    t, mse, kt = dynamic_retraining_test(autoencoder, encoder)
-    return RetrainingResult(training_time=t, mse=mse, key_generation_time=kt)
 
+@router.post("/encrypt/batch", response_model=BatchResponse)
+async def rsa_encrypt_batch(
+    req: RSABatchEncryptRequest,
+    _=Depends(get_current_user),
+):
+    """
+    Шифрует список сообщений одним ключом: ключ ищется в RSAKeyManager
+    один раз, элементы шифруются в пуле потоков (режим — как в /rsa/encrypt).
+    """
+    _check_batch(req.items)
+    priv, pub, entropy, ts = await _key_entry(req.key_id)
+    limit = oaep_max_plaintext(pub)
 
-@router.post("/test/chaos", response_model=RetrainingResult)
-async def rsa_test_chaos(_=Depends(get_current_user)):
-    t, mse = dynamic_retraining_with_chaos_maps(autoencoder, encoder)
-    return RetrainingResult(training_time=t, mse=mse)
+    def _encrypt(text: str) -> str:
+        data = text.encode("utf-8")
+        mode = req.mode or ("hybrid" if len(data) > limit else "oaep")
+        if mode == "hybrid":
+            container = rsa_hybrid_encrypt(pub, entropy, ts, data)
+        elif mode == "oaep":
+            container = rsa_encrypt_with_metadata(pub, priv, entropy, ts, data)
+        else:
+            raise ValueError(f"Unknown mode '{mode}'")
+        return binascii.hexlify(container).decode("utf-8")
 
-@router.post("/test/concurrency", response_model=RetrainingResult)
-async def rsa_test_concurrency(
-    threads: int = 5,
+    outcomes = await run_in_threadpool(batch_processor.map, _encrypt, req.items)
+    return BatchResponse(results=[
+        BatchItemResult(index=i, ok=ok, **({"result": value} if ok else {"error": value}))
+        for i, (ok, value) in enumerate(outcomes)
+    ])
+
+
+@router.post("/decrypt/batch", response_model=BatchResponse)
+async def rsa_decrypt_batch(
+    req: RSABatchDecryptRequest,
     _=Depends(get_current_user),
 ):
     """
-    Многопоточный тест генерации RSA-ключей:
-    спавним `threads` параллельных вызовов `generate_enhanced_rsa_keys_from_image`.
-    Возвращаем общее время.
+    Пакетная расшифровка: весь пакет выполняется в пуле потоков и
+    выравнивается по времени как одна операция.
     """
+    _check_batch(req.items)
+    priv = (await _key_entry(req.key_id))[0]
+
+    def _decrypt(hex_container: str) -> str:
+        container = binascii.unhexlify(hex_container)
+        if is_hybrid_container(container):
+            return _plaintext_text(rsa_hybrid_decrypt(container, priv))
+        return _plaintext_text(decrypt_container(container, priv))
+
+    outcomes = await timing_equalizer.run(batch_processor.map, _decrypt, req.items)
+    return BatchResponse(results=[
+        BatchItemResult(index=i, ok=ok, **({"result": value} if ok else {"error": value}))
+        for i, (ok, value) in enumerate(outcomes)
+    ])
+
+
+@router.get("/decrypt/timing", response_model=DecryptTimingStats)
+async def rsa_decrypt_timing(_=Depends(get_current_user)):
+    return DecryptTimingStats(**timing_equalizer.stats())
+
+
+# --- Тесты дообучения и генерации ключей: фоновые задачи планировщика ---
+# Обучаются теневые копии текущей версии модели, общая модель не меняется;
+# обработчик сразу отвечает 202 с id задачи, статус — GET /jobs/{id}
+
+def _retrain_random_job(job, model):
+    from app.crypto.autoencoder.retraining import (
+        clone_autoencoder, dynamic_retraining_test, JobProgress,
+    )
+    autoencoder, encoder = clone_autoencoder(model.autoencoder)
+    t, mse, kt = dynamic_retraining_test(autoencoder, encoder, callbacks=[JobProgress(job)])
+    return RetrainingResult(training_time=t, mse=mse, key_generation_time=kt).model_dump()
+
+
+def _retrain_chaos_job(job, model):
+    from app.crypto.autoencoder.retraining import (
+        clone_autoencoder, dynamic_retraining_with_chaos_maps, JobProgress,
+    )
+    autoencoder, encoder = clone_autoencoder(model.autoencoder)
+    t, mse = dynamic_retraining_with_chaos_maps(autoencoder, encoder, callbacks=[JobProgress(job)])
+    return RetrainingResult(training_time=t, mse=mse).model_dump()
+
+
+def _keygen_concurrency_job(job, threads):
     start = time.time()
     with ThreadPoolExecutor(max_workers=threads) as exe:
-        futures = [exe.submit(generate_enhanced_rsa_keys_from_image, encoder) for _ in range(threads)]
-        # ждём завершения всех
-        for f in futures:
+        futures = [exe.submit(generate_enhanced_rsa_keys_from_image, deps.encoder) for _ in range(threads)]
+        for done, f in enumerate(futures, 1):
             f.result()
+            job.update(done / threads)
+            job.check_cancelled()
     elapsed = time.time() - start
-    return RetrainingResult(training_time=elapsed, mse=0.0, key_generation_time=None)
+    return RetrainingResult(training_time=elapsed, mse=0.0, key_generation_time=None).model_dump()
 
 
-@router.post("/test/concurrency-chaos", response_model=RetrainingResult)
+def _retrain_concurrency_job(job, model, threads):
+    from app.crypto.autoencoder.retraining import (
+        clone_autoencoder, dynamic_retraining_with_chaos_maps, JobProgress,
+    )
+    # у каждого потока своя копия модели: fit одной Keras-модели
+    # из нескольких потоков сразу небезопасен
+    copies = [clone_autoencoder(model.autoencoder) for _ in range(threads)]
+    with ThreadPoolExecutor(max_workers=threads) as exe:
+        futures = [
+            exe.submit(
+                dynamic_retraining_with_chaos_maps, ae, enc,
+                callbacks=[JobProgress(job, start=i / threads, span=1 / threads)],
+            )
+            for i, (ae, enc) in enumerate(copies)
+        ]
+        results = [f.result() for f in futures]
+    avg_t = sum(r[0] for r in results) / len(results)
+    avg_mse = sum(r[1] for r in results) / len(results)
+    return RetrainingResult(training_time=avg_t, mse=avg_mse, key_generation_time=None).model_dump()
+
+
+@router.post("/test/random", response_model=JobInfo, status_code=202)
+async def rsa_test_random(_=Depends(get_current_user)):
+    job = job_scheduler.submit("retrain-random", _retrain_random_job, deps.model_registry.get())
+    return JobInfo(**job.info())
+
+
+@router.post("/test/chaos", response_model=JobInfo, status_code=202)
+async def rsa_test_chaos(_=Depends(get_current_user)):
+    job = job_scheduler.submit("retrain-chaos", _retrain_chaos_job, deps.model_registry.get())
+    return JobInfo(**job.info())
+
+@router.post("/test/concurrency", response_model=JobInfo, status_code=202)
+async def rsa_test_concurrency(
+    threads: int = Query(5, ge=1, le=64),
+    _=Depends(get_current_user),
+):
+    """
+    Многопоточный тест генерации RSA-ключей:
+    `threads` параллельных вызовов `generate_enhanced_rsa_keys_from_image`.
+    Результат задачи — общее время.
+    """
+    job = job_scheduler.submit("keygen-concurrency", _keygen_concurrency_job, threads)
+    return JobInfo(**job.info())
+
+
+@router.post("/test/concurrency-chaos", response_model=JobInfo, status_code=202)
 async def rsa_test_concurrency_chaos(
-    threads: int = 5,
+    threads: int = Query(5, ge=1, le=16),
     _=Depends(get_current_user),
 ):
     """
     Многопоточный тест дообучения на хаос-картах:
-    запускаем `threads` вызовов `dynamic_retraining_with_chaos_maps` параллельно.
-    Возвращаем средние время и средний MSE.
+    `threads` вызовов `dynamic_retraining_with_chaos_maps` параллельно,
+    каждый на своей копии модели. Результат задачи — средние время и MSE.
     """
-    results = []
-    start = time.time()
-    with ThreadPoolExecutor(max_workers=threads) as exe:
-        futures = [
-            exe.submit(dynamic_retraining_with_chaos_maps, autoencoder, encoder)
-            for _ in range(threads)
-        ]
-        for f in futures:
-            t, mse = f.result()
-            results.append((t, mse))
-    total = time.time() - start
-    avg_t = sum(r[0] for r in results) / len(results)
-    avg_mse = sum(r[1] for r in results) / len(results)
-    return RetrainingResult(training_time=avg_t, mse=avg_mse, key_generation_time=None)
+    job = job_scheduler.submit(
+        "retrain-concurrency-chaos", _retrain_concurrency_job, deps.model_registry.get(), threads,
+    )
+    return JobInfo(**job.info())
 
@@ -0,0 +1,189 @@
+"""
+Пакетное шифрование файлов без HTTP API.
+
+    python -m app.cli encrypt --public-key pub.pem  -o out/ archive.tar data/
+    python -m app.cli decrypt --private-key priv.pem -o restored/ out/
+    python -m app.cli encrypt --key-id <id> -o out/ data/   # ключ из RSA_KEYSTORE_URL
+
+Каждый файл получает свой ключ данных, обёрнутый RSA-OAEP
+(см. app.crypto.core.file_container). Файлы каталога обрабатываются
+параллельно в пуле процессов.
+"""
+import os
+import sys
+import time
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+from cryptography.hazmat.primitives import serialization
+
+from app.crypto.core.aead_stream import STREAM_CHUNK_SIZE
+from app.crypto.core.file_container import FILE_SUFFIX, encrypt_file, decrypt_file
+
+# (исходный файл, файл результата)
+Job = Tuple[str, str]
+
+
+def _collect_jobs(inputs: List[str], out_dir: str, command: str) -> List[Job]:
+    jobs: List[Job] = []
+    for path in inputs:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                for name in sorted(files):
+                    src = os.path.join(root, name)
+                    rel = os.path.relpath(src, path)
+                    jobs.append((src, _target(os.path.join(out_dir, rel), command)))
+        else:
+            jobs.append((path, _target(os.path.join(out_dir, os.path.basename(path)), command)))
+    return jobs
+
+
+def _target(path: str, command: str) -> str:
+    if command == "encrypt":
+        return path + FILE_SUFFIX
+    if path.endswith(FILE_SUFFIX):
+        return path[:-len(FILE_SUFFIX)]
+    return path + ".dec"
+
+
+# Ключ, загруженный один раз на процесс (_init_worker)
+_key = None
+
+
+def _load_key(pem: bytes, command: str, password: Optional[bytes]):
+    if command == "encrypt":
+        return serialization.load_pem_public_key(pem)
+    return serialization.load_pem_private_key(pem, password=password)
+
+
+def _init_worker(command: str, pem: bytes, password: Optional[bytes]) -> None:
+    # PEM разбирается (и пароль проверяется KDF) один раз на процесс, а не на файл
+    global _key
+    _key = _load_key(pem, command, password)
+
+
+def _run_job(command: str, job: Job, chunk_size: int) -> Tuple[str, int, float]:
+    src, dst = job
+    os.makedirs(os.path.dirname(dst) or ".", exist_ok=True)
+    start = time.perf_counter()
+    if command == "encrypt":
+        size = encrypt_file(src, dst, _key, chunk_size)
+    else:
+        size = decrypt_file(src, dst, _key, chunk_size)
+    return src, size, time.perf_counter() - start
+
+
+def _key_material(args) -> Tuple[bytes, Optional[bytes]]:
+    """
+    PEM для шифрования (публичный) или расшифровки (приватный)
+    из файла либо из хранилища Chaos-RSA ключей по key_id.
+    """
+    if args.key_id:
+        from app.config import KeyStoreConfig
+        from app.services.rsa_key_manager import RSAKeyManager
+
+        cfg = KeyStoreConfig()
+        try:
+            km = RSAKeyManager(args.keystore or cfg.RSA_KEYSTORE_URL, passphrase=cfg.RSA_KEYSTORE_PASSPHRASE)
+        except ValueError as e:
+            raise SystemExit(f"{args.command}: {e} (set RSA_KEYSTORE_PASSPHRASE)")
+        try:
+            if args.command == "encrypt":
+                return km.public_pem(args.key_id), None
+            priv = km.get(args.key_id)[0]
+        except KeyError as e:
+            raise SystemExit(f"{args.command}: {e.args[0]}")
+        # дочерние процессы — наши же, ключ уходит им по pipe без пароля
+        return priv.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        ), None
+
+    path = args.public_key if args.command == "encrypt" else args.private_key
+    if not path:
+        raise SystemExit(f"{args.command}: --key-id or --{'public' if args.command == 'encrypt' else 'private'}-key is required")
+    with open(path, "rb") as f:
+        pem = f.read()
+    passphrase = getattr(args, "passphrase", None)
+    password = passphrase.encode("utf-8") if passphrase else None
+    return pem, password
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Шифрование файлов Chaos-RSA + AES-256-GCM")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for command in ("encrypt", "decrypt"):
+        p = sub.add_parser(command)
+        p.add_argument("inputs", nargs="+", help="файлы и каталоги")
+        p.add_argument("-o", "--output", required=True, help="каталог результата")
+        p.add_argument("--key-id", help="ключ из хранилища RSA-ключей")
+        p.add_argument("--keystore", help="URL хранилища (по умолчанию RSA_KEYSTORE_URL)")
+        if command == "encrypt":
+            p.add_argument("--public-key", help="публичный ключ PEM")
+        else:
+            p.add_argument("--private-key", help="приватный ключ PEM")
+            p.add_argument("--passphrase", help="пароль приватного ключа")
+        p.add_argument("-j", "--workers", type=int, default=0, help="число процессов (0 — по числу ядер)")
+        p.add_argument("--chunk-size", type=int, default=STREAM_CHUNK_SIZE)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = _build_parser().parse_args(argv)
+    pem, password = _key_material(args)
+    jobs = _collect_jobs(args.inputs, args.output, args.command)
+    workers = min(args.workers or os.cpu_count() or 1, max(1, len(jobs)))
+
+    try:
+        # ключ проверяется до запуска пула: неверный пароль — одна ошибка, а не на каждый файл
+        _init_worker(args.command, pem, password)
+    except (ValueError, TypeError) as e:
+        raise SystemExit(f"{args.command}: cannot load key: {e}")
+
+    start = time.perf_counter()
+    total, failed = 0, 0
+    if workers == 1:
+        outcomes = (_safe(args.command, job, args.chunk_size) for job in jobs)
+        failed, total = _report(outcomes)
+    else:
+        with ProcessPoolExecutor(
+            workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(args.command, pem, password),
+        ) as ex:
+            futures = [ex.submit(_safe, args.command, job, args.chunk_size) for job in jobs]
+            failed, total = _report(f.result() for f in futures)
+    elapsed = time.perf_counter() - start
+
+    mb = total / 2 ** 20
+    print(f"{args.command}: {len(jobs) - failed}/{len(jobs)} файлов, {mb:.1f} МБ "
+          f"за {elapsed:.2f} с ({mb / elapsed if elapsed else 0.0:.1f} МБ/с, процессов: {workers})")
+    return 1 if failed else 0
+
+
+def _safe(command, job, chunk_size):
+    try:
+        return _run_job(command, job, chunk_size), None
+    except Exception as e:
+        return (job[0], 0, 0.0), f"{type(e).__name__}: {e}"
+
+
+def _report(outcomes) -> Tuple[int, int]:
+    failed, total = 0, 0
+    for (src, size, seconds), error in outcomes:
+        if error:
+            failed += 1
+            print(f"  {src}: ошибка — {error}", file=sys.stderr)
+            continue
+        total += size
+        rate = size / 2 ** 20 / seconds if seconds else 0.0
+        print(f"  {src}: {size / 2 ** 20:.2f} МБ, {seconds:.3f} с, {rate:.1f} МБ/с")
+    return failed, total
+
+
+if __name__ == "__main__":
+    sys.exit(main())
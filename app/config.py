@@ -1,14 +1,92 @@
 from dotenv import load_dotenv
 load_dotenv()  
 
+from typing import Optional
+
 from pydantic.v1 import BaseSettings
 
 
-class Config(BaseSettings):
+class KeyStoreConfig(BaseSettings):
+    """
+    Настройки хранилища RSA-ключей отдельно от остальных: их читает
+    и CLI (python -m app.cli --key-id), которому JWT и прочее не нужно.
+    """
+
+    # Постоянное хранилище RSA-ключей и LRU-кэш десериализованных ключей.
+    # Без пароля закрытые ключи на диск не пишутся (хранилище в памяти)
+    RSA_KEYSTORE_URL: str = "sqlite:///./rsa_keys.db"
+    RSA_KEY_CACHE_SIZE: int = 1024
+    RSA_KEYSTORE_PASSPHRASE: Optional[str] = None
+
+    class Config:
+        env_file = ".env"
+        env_file_encoding = "utf-8"
+
+
+class Config(KeyStoreConfig):
     CORE_TYPE: str = "python"
     ENTROPY_SOURCE: str = "system"
     RETRAIN_AUTOENCODER: bool = True
 
+    # Кэш весов предобученного автоэнкодера (см. autoencoder/checkpoint.py)
+    MODEL_CHECKPOINT_DIR: str = "./checkpoints"
+    MODEL_SEED: int = 0
+    MODEL_FORCE_RETRAIN: bool = False
+
+    # Профиль KDF при генерации RSA-ключей: "pbkdf2" или "hkdf"
+    KDF_PROFILE: str = "pbkdf2"
+    KDF_ITERATIONS: int = 5000
+
+    # Пул заранее сгенерированных RSA-ключей для /rsa/generate
+    RSA_POOL_LOW_WATERMARK: int = 2
+    RSA_POOL_HIGH_WATERMARK: int = 8
+    # Сколько ключей пула выводится из одного encoder.predict
+    RSA_POOL_BATCH: int = 4
+
+    # Пул заранее выведенных симметричных ключей для CryptoService.encrypt
+    SYMMETRIC_POOL_LOW_WATERMARK: int = 16
+    SYMMETRIC_POOL_HIGH_WATERMARK: int = 128
+    SYMMETRIC_POOL_BATCH: int = 32
+
+    # Число процессов поиска простых p/q (0 — по числу ядер)
+    PRIME_WORKERS: int = 0
+
+    # Пакетная генерация /rsa/generate/batch
+    RSA_BATCH_MAX_COUNT: int = 1000
+    RSA_BATCH_WORKERS: int = 8
+
+    # Фоновый сборщик системной энтропии
+    ENTROPY_SAMPLER_INTERVAL_MS: int = 50
+    ENTROPY_SAMPLER_DEPTH: int = 64
+
+    # Выравнивание времени RSA-расшифровки (0 потоков — по умолчанию пула)
+    DECRYPT_TARGET_TIME_MS: int = 100
+    DECRYPT_WORKERS: int = 0
+
+    # Симметричный алгоритм: aes-gcm | chacha20-poly1305 | aes-cbc (старый формат)
+    SYMMETRIC_ALGORITHM: str = "aes-gcm"
+
+    # Склейка одиночных encoder.predict в микро-батчи: размер батча и ожидание
+    INFERENCE_BATCHING: bool = True
+    INFERENCE_MAX_BATCH: int = 64
+    INFERENCE_MAX_WAIT_MS: float = 2.0
+
+    # Фоновые задачи /rsa/test/* (GET /jobs/{id}): параллельных задач и сколько хранить
+    JOB_WORKERS: int = 1
+    JOB_HISTORY: int = 256
+
+    # Пакетные эндпоинты */batch (0 потоков — по умолчанию пула)
+    BATCH_WORKERS: int = 0
+    BATCH_MAX_ITEMS: int = 1000
+
+    # Потоковое AEAD-шифрование /crypto/*/stream: размер чанка открытого текста
+    STREAM_CHUNK_SIZE: int = 64 * 1024
+
+    # Хранилище симметричных ключей: шарды, TTL (0 — без срока), лимит (0 — без лимита)
+    KEY_MANAGER_SHARDS: int = 16
+    SYMMETRIC_KEY_TTL_SECONDS: int = 0
+    SYMMETRIC_KEY_MAX: int = 0
+
     # Настройки JWT
     JWT_SECRET_KEY: str
     JWT_ALGORITHM: str = "HS256"
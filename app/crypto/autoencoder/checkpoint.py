@@ -0,0 +1,130 @@
+import os
+import json
+import time
+import hashlib
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+from app.crypto.chaos.dataset import generate_logistic_map_dataset
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHECKPOINT_DIR = "./checkpoints"
+_SUFFIX = ".weights.h5"
+
+
+def architecture_fingerprint(model) -> str:
+    """
+    Отпечаток архитектуры: классы слоёв и формы их весов.
+    Имена слоёв не учитываются — Keras нумерует их по порядку создания.
+    """
+    layers = [
+        [type(layer).__name__, [list(w.shape) for w in layer.weights]]
+        for layer in model.layers
+    ]
+    return hashlib.sha256(json.dumps(layers).encode("utf-8")).hexdigest()
+
+
+def checkpoint_key(model, dataset: Dict[str, Any], training: Dict[str, Any], seed: int) -> str:
+    payload = {
+        "arch": architecture_fingerprint(model),
+        "dataset": dataset,
+        "training": training,
+        "seed": seed,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class AutoencoderCheckpoint:
+    """
+    Кэш весов предобученного автоэнкодера на диске.
+
+    Ключ — архитектура модели, параметры датасета логистических карт,
+    параметры обучения и seed. При совпадении веса загружаются
+    (миллисекунды), иначе модель обучается и веса сохраняются атомарно
+    (запись во временный файл + os.replace).
+    """
+
+    def __init__(
+        self,
+        image_size: int = 28,
+        num_images: int = 1000,
+        r: float = 3.99,
+        epochs: int = 3,
+        batch_size: int = 64,
+        validation_split: float = 0.0,
+        seed: int = 0,
+        cache_dir: Optional[str] = None,
+    ):
+        self.image_size = image_size
+        self.dataset = {"num_images": num_images, "image_size": image_size, "r": r}
+        self.training = {"epochs": epochs, "batch_size": batch_size, "validation_split": validation_split}
+        self.seed = seed
+        self.cache_dir = cache_dir or DEFAULT_CHECKPOINT_DIR
+
+    def path(self, model) -> str:
+        key = checkpoint_key(model, self.dataset, self.training, self.seed)
+        return os.path.join(self.cache_dir, f"autoencoder-{key[:32]}{_SUFFIX}")
+
+    def load(self, autoencoder) -> bool:
+        """
+        Загружает веса из кэша; False — в кэше ничего нет.
+        """
+        path = self.path(autoencoder)
+        if not os.path.exists(path):
+            return False
+        try:
+            autoencoder.load_weights(path)
+        except Exception:
+            logger.exception("Broken autoencoder checkpoint %s, retraining", path)
+            return False
+        return True
+
+    def train(self, autoencoder, verbose: int = 0) -> None:
+        """
+        Обучает модель на логистических картах и сохраняет веса.
+        """
+        data = generate_logistic_map_dataset(
+            num_images=self.dataset["num_images"],
+            image_size=self.image_size,
+            r=self.dataset["r"],
+            fixed_initial=False,
+            seed=self.seed,
+        )
+        autoencoder.fit(data, data, verbose=verbose, **self.training)
+
+        path = self.path(autoencoder)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp = f"{path[:-len(_SUFFIX)]}.tmp-{os.getpid()}{_SUFFIX}"
+        autoencoder.save_weights(tmp)
+        os.replace(tmp, path)
+
+    def load_or_train(self, autoencoder, force: bool = False, verbose: int = 0) -> bool:
+        """
+        Возвращает True, если веса взяты из кэша.
+        """
+        start = time.perf_counter()
+        if not force and self.load(autoencoder):
+            logger.info("Autoencoder loaded from checkpoint in %.3f s", time.perf_counter() - start)
+            return True
+        self.train(autoencoder, verbose=verbose)
+        logger.info("Autoencoder trained and checkpointed in %.1f s", time.perf_counter() - start)
+        return False
+
+
+def load_or_train_autoencoder(
+    checkpoint: AutoencoderCheckpoint,
+    force: bool = False,
+    verbose: int = 0,
+) -> Tuple[Any, Any, bool]:
+    """
+    Строит автоэнкодер и энкодер и загружает/обучает их через checkpoint.
+    Возвращает (autoencoder, encoder, cache_hit).
+    """
+    # TensorFlow импортируется только при построении модели
+    from app.crypto.autoencoder.retraining import build_autoencoder
+
+    size = checkpoint.image_size
+    autoencoder, encoder = build_autoencoder((size, size))
+    hit = checkpoint.load_or_train(autoencoder, force=force, verbose=verbose)
+    return autoencoder, encoder, hit
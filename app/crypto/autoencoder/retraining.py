@@ -51,7 +51,53 @@ def build_autoencoder(image_size=(28, 28)):
     return autoencoder, encoder
 
 
-def dynamic_retraining_test(autoencoder, encoder, num_images=500, epochs=2, used_images=None):
+def clone_autoencoder(autoencoder):
+    """
+    Теневая копия для дообучения: та же архитектура и копия весов;
+    энкодер — подграф копии, с исходной моделью ничего не общего.
+    """
+    shadow, encoder = build_autoencoder(tuple(autoencoder.input_shape[1:3]))
+    shadow.set_weights(autoencoder.get_weights())
+    return shadow, encoder
+
+
+def compile_encoder(encoder, image_size=(28, 28)):
+    """
+    Прямой проход энкодера как tf.function с фиксированной сигнатурой
+    (float32, [None, H, W, 1]): трассируется один раз на любой размер
+    батча, без накладных расходов Keras predict на каждый вызов.
+    """
+    @tf.function(input_signature=[tf.TensorSpec([None, *image_size, 1], tf.float32)])
+    def forward(images):
+        return encoder(images, training=False)
+
+    return lambda images: forward(tf.convert_to_tensor(images, tf.float32)).numpy()
+
+
+class JobProgress(keras.callbacks.Callback):
+    """
+    Прогресс fit в задачу планировщика (app.services.jobs.Job):
+    доля пройденных эпох в отрезке [start, start + span] и текущий loss.
+    При отмене задачи обучение останавливается после ближайшего батча.
+    """
+
+    def __init__(self, job, start=0.0, span=1.0):
+        super().__init__()
+        self.job = job
+        self.start = start
+        self.span = span
+
+    def on_train_batch_end(self, batch, logs=None):
+        if self.job.cancel_requested:
+            self.model.stop_training = True
+
+    def on_epoch_end(self, epoch, logs=None):
+        done = (epoch + 1) / self.params["epochs"]
+        loss = (logs or {}).get("loss")
+        self.job.update(self.start + self.span * done, **({"loss": loss} if loss is not None else {}))
+
+
+def dynamic_retraining_test(autoencoder, encoder, num_images=500, epochs=2, used_images=None, callbacks=None):
     imgs = generate_unique_random_images(
         num_images, shape=(28,28,1), used_images=used_images or set()
     )
@@ -60,7 +106,7 @@ def dynamic_retraining_test(autoencoder, encoder, num_images=500, epochs=2, used
     autoencoder.compile(optimizer=tf.keras.optimizers.Adam(1e-4), loss="mse")
 
     t0 = time.time()
-    autoencoder.fit(imgs, imgs, epochs=epochs, batch_size=32, verbose=1)
+    autoencoder.fit(imgs, imgs, epochs=epochs, batch_size=32, verbose=0, callbacks=callbacks)
     train_time = time.time() - t0
 
     recon = autoencoder.predict(imgs, verbose=0)
@@ -74,7 +120,7 @@ def dynamic_retraining_test(autoencoder, encoder, num_images=500, epochs=2, used
     return train_time, mse, key_time
 
 
-def dynamic_retraining_with_chaos_maps(autoencoder, encoder, num_images=500, epochs=2):
+def dynamic_retraining_with_chaos_maps(autoencoder, encoder, num_images=500, epochs=2, callbacks=None):
     imgs = generate_logistic_map_dataset(
         num_images=num_images,
         image_size=28,
@@ -86,7 +132,7 @@ def dynamic_retraining_with_chaos_maps(autoencoder, encoder, num_images=500, epo
     autoencoder.compile(optimizer=tf.keras.optimizers.Adam(1e-4), loss="mse")
 
     t0 = time.time()
-    autoencoder.fit(imgs, imgs, epochs=epochs, batch_size=32, verbose=1)
+    autoencoder.fit(imgs, imgs, epochs=epochs, batch_size=32, verbose=0, callbacks=callbacks)
     train_time = time.time() - t0
 
     recon = autoencoder.predict(imgs, verbose=0)
@@ -12,10 +12,12 @@ def generate_logistic_map_image(image_size=28, initial_value=0.4, r=3.99):
     img = np.array(seq).reshape((image_size,image_size))
     return img
 
-def generate_logistic_map_dataset(num_images, image_size=28, r=3.99, fixed_initial=True):
+def generate_logistic_map_dataset(num_images, image_size=28, r=3.99, fixed_initial=True, seed=None):
+    # seed задаёт начальные значения воспроизводимо, не трогая глобальный np.random
+    rng = np.random if seed is None else np.random.RandomState(seed)
     data = []
     for _ in range(num_images):
-        init = 0.4 if fixed_initial else np.random.rand()
+        init = 0.4 if fixed_initial else rng.rand()
         img = generate_logistic_map_image(image_size, init, r)
         data.append(img)
     return np.array(data)[...,np.newaxis]
@@ -0,0 +1,194 @@
+import os
+import struct
+from typing import List, Optional, Tuple
+
+# Чанковое AEAD-шифрование по схеме STREAM:
+# nonce = prefix(7) || counter(4, big-endian) || last_flag(1).
+# Последний чанк всегда короче chunk_size (возможно, пустой), поэтому
+# обрезка или перестановка чанков ломает проверку тега.
+NONCE_PREFIX_LEN = 7
+TAG_LEN = 16
+MAX_CHUNKS = 1 << 32
+
+
+def stream_nonce(prefix: bytes, counter: int, last: bool) -> bytes:
+    if counter >= MAX_CHUNKS:
+        raise ValueError("Too many chunks for one nonce prefix")
+    return prefix + counter.to_bytes(4, "big") + (b"\x01" if last else b"\x00")
+
+
+def chunk_count(plaintext_len: int, chunk_size: int) -> int:
+    """
+    Число чанков для открытого текста длины plaintext_len.
+    """
+    return plaintext_len // chunk_size + 1
+
+
+def seal_chunks(aead, prefix: bytes, data, chunk_size: int, aad: bytes = b"") -> bytes:
+    """
+    Шифрует data чанками по chunk_size байт; aead — объект
+    AESGCM/ChaCha20Poly1305. Результат — конкатенация ct||tag чанков.
+    """
+    view = memoryview(data)
+    total = chunk_count(len(view), chunk_size)
+    out: List[bytes] = []
+    for i in range(total):
+        chunk = view[i * chunk_size:(i + 1) * chunk_size]
+        out.append(aead.encrypt(stream_nonce(prefix, i, i == total - 1), chunk, aad))
+    return b"".join(out)
+
+
+def open_chunks(aead, prefix: bytes, blob, chunk_size: int, aad: bytes = b"") -> bytes:
+    """
+    Обратная к seal_chunks операция; при любой порче бросает
+    cryptography.exceptions.InvalidTag или ValueError.
+    """
+    view = memoryview(blob)
+    frame = chunk_size + TAG_LEN
+    total = len(view) // frame + 1
+    if len(view) % frame < TAG_LEN:
+        raise ValueError("Truncated AEAD stream")
+    out: List[bytes] = []
+    for i in range(total):
+        chunk = view[i * frame:(i + 1) * frame]
+        out.append(aead.decrypt(stream_nonce(prefix, i, i == total - 1), chunk, aad))
+    return b"".join(out)
+
+
+# Самоописывающий потоковый формат:
+# header = magic(4) || version(1) || chunk_size(4, big-endian) || prefix(7),
+# затем кадры ct||tag по схеме STREAM. Заголовок целиком идёт в AAD
+# каждого кадра, так что подмена chunk_size или префикса ломает теги.
+STREAM_MAGIC = b"CSTR"
+STREAM_VERSION = 1
+STREAM_CHUNK_SIZE = 64 * 1024
+MAX_STREAM_CHUNK_SIZE = 16 * 1024 * 1024
+_HEADER = struct.Struct(">4sBI7s")
+STREAM_HEADER_LEN = _HEADER.size
+
+
+def stream_header(chunk_size: int, prefix: bytes) -> bytes:
+    if not 0 < chunk_size <= MAX_STREAM_CHUNK_SIZE:
+        raise ValueError("Invalid chunk size")
+    return _HEADER.pack(STREAM_MAGIC, STREAM_VERSION, chunk_size, prefix)
+
+
+def parse_stream_header(data) -> Tuple[int, bytes, bytes]:
+    """
+    Разбирает заголовок потока; возвращает (chunk_size, prefix, header).
+    """
+    if len(data) < STREAM_HEADER_LEN:
+        raise ValueError("Truncated AEAD stream")
+    magic, version, chunk_size, prefix = _HEADER.unpack_from(data)
+    if magic != STREAM_MAGIC or version != STREAM_VERSION:
+        raise ValueError("Not an AEAD stream")
+    if not 0 < chunk_size <= MAX_STREAM_CHUNK_SIZE:
+        raise ValueError("Invalid chunk size")
+    return chunk_size, prefix, bytes(data[:STREAM_HEADER_LEN])
+
+
+class StreamSealer:
+    """
+    Инкрементальное шифрование в потоковом формате: update() принимает
+    куски произвольной длины и возвращает готовые кадры, finalize()
+    дописывает последний (короткий) кадр. В памяти держится не больше
+    одного чанка открытого текста.
+    """
+
+    def __init__(self, aead, chunk_size: int = STREAM_CHUNK_SIZE, prefix: Optional[bytes] = None):
+        self.aead = aead
+        self.chunk_size = chunk_size
+        self.prefix = prefix if prefix is not None else os.urandom(NONCE_PREFIX_LEN)
+        self.header = stream_header(chunk_size, self.prefix)
+        self._buf = bytearray()
+        self._counter = 0
+        self._header_sent = False
+        self._done = False
+
+    def _seal(self, chunk, last: bool) -> bytes:
+        frame = self.aead.encrypt(stream_nonce(self.prefix, self._counter, last), bytes(chunk), self.header)
+        self._counter += 1
+        return frame
+
+    def _emit(self, frames: List[bytes]) -> bytes:
+        if not self._header_sent:
+            self._header_sent = True
+            frames.insert(0, self.header)
+        return b"".join(frames)
+
+    def update(self, data) -> bytes:
+        if self._done:
+            raise ValueError("Stream already finalized")
+        self._buf += data
+        frames: List[bytes] = []
+        # чанк уходит, только когда за ним точно есть ещё данные:
+        # последний чанк должен быть короче chunk_size
+        while len(self._buf) > self.chunk_size:
+            frames.append(self._seal(memoryview(self._buf)[:self.chunk_size], False))
+            del self._buf[:self.chunk_size]
+        return self._emit(frames)
+
+    def finalize(self) -> bytes:
+        if self._done:
+            raise ValueError("Stream already finalized")
+        self._done = True
+        frames: List[bytes] = []
+        if len(self._buf) == self.chunk_size:
+            frames.append(self._seal(self._buf, False))
+            self._buf.clear()
+        frames.append(self._seal(self._buf, True))
+        self._buf.clear()
+        return self._emit(frames)
+
+
+class StreamOpener:
+    """
+    Обратная к StreamSealer операция. Полный кадр (chunk_size + TAG_LEN)
+    всегда не последний, поэтому каждый чанк расшифровывается сразу по
+    приходу, без заглядывания вперёд. Обрыв потока обнаруживает
+    finalize(); отданный до этого открытый текст уже проверен
+    покадрово, но потребитель должен учитывать ошибку в конце.
+    """
+
+    def __init__(self, aead):
+        self.aead = aead
+        self.header: Optional[bytes] = None
+        self.chunk_size = 0
+        self.prefix = b""
+        self._buf = bytearray()
+        self._counter = 0
+        self._done = False
+
+    def _parse_header(self) -> None:
+        self.chunk_size, self.prefix, self.header = parse_stream_header(self._buf)
+        del self._buf[:STREAM_HEADER_LEN]
+
+    def _open(self, frame, last: bool) -> bytes:
+        chunk = self.aead.decrypt(stream_nonce(self.prefix, self._counter, last), bytes(frame), self.header)
+        self._counter += 1
+        return chunk
+
+    def update(self, data) -> bytes:
+        if self._done:
+            raise ValueError("Stream already finalized")
+        self._buf += data
+        if self.header is None:
+            if len(self._buf) < STREAM_HEADER_LEN:
+                return b""
+            self._parse_header()
+        frame = self.chunk_size + TAG_LEN
+        out: List[bytes] = []
+        while len(self._buf) >= frame:
+            out.append(self._open(memoryview(self._buf)[:frame], False))
+            del self._buf[:frame]
+        return b"".join(out)
+
+    def finalize(self) -> bytes:
+        if self._done:
+            raise ValueError("Stream already finalized")
+        self._done = True
+        if self.header is None or len(self._buf) < TAG_LEN:
+            raise ValueError("Truncated AEAD stream")
+        chunk = self._open(self._buf, True)
+        self._buf.clear()
+        return chunk
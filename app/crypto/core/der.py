@@ -0,0 +1,140 @@
+from typing import NamedTuple, Tuple, Union
+
+# Быстрый DER-кодек для фиксированного RSAContainer
+# (SEQUENCE из OCTET STRING ×3, INTEGER ×2, OCTET STRING).
+# Вывод побайтово совпадает с pyasn1 der_encoder.encode(RSAContainer).
+
+_TAG_SEQUENCE = 0x30
+_TAG_INTEGER = 0x02
+_TAG_OCTET_STRING = 0x04
+
+# (имя, тег) в порядке полей RSAContainer
+_RSA_CONTAINER_FIELDS = (
+    ("ciphertext", _TAG_OCTET_STRING),
+    ("timestamp", _TAG_OCTET_STRING),
+    ("entropy", _TAG_OCTET_STRING),
+    ("n", _TAG_INTEGER),
+    ("e", _TAG_INTEGER),
+    ("hmac", _TAG_OCTET_STRING),
+)
+
+BytesLike = Union[bytes, bytearray, memoryview]
+
+
+class RSAContainerFields(NamedTuple):
+    ciphertext: memoryview
+    timestamp: memoryview
+    entropy: memoryview
+    n: int
+    e: int
+    hmac: memoryview
+
+
+def _length_size(length: int) -> int:
+    if length < 0x80:
+        return 1
+    return 1 + (length.bit_length() + 7) // 8
+
+
+def _put_length(buf: bytearray, pos: int, length: int) -> int:
+    if length < 0x80:
+        buf[pos] = length
+        return pos + 1
+    size = (length.bit_length() + 7) // 8
+    buf[pos] = 0x80 | size
+    buf[pos + 1:pos + 1 + size] = length.to_bytes(size, "big")
+    return pos + 1 + size
+
+
+def _integer_content(value: int) -> bytes:
+    # минимальное дополнение до двух, как требует DER
+    size = ((value + (value < 0)).bit_length() + 8) // 8
+    return value.to_bytes(size, "big", signed=True)
+
+
+def encode_rsa_container(
+    ciphertext: BytesLike,
+    timestamp: BytesLike,
+    entropy: BytesLike,
+    n: int,
+    e: int,
+    mac: BytesLike,
+) -> bytes:
+    """
+    DER RSAContainer в один заранее выделенный буфер.
+    """
+    contents = (
+        ciphertext, timestamp, entropy,
+        _integer_content(n), _integer_content(e),
+        mac,
+    )
+    body = sum(1 + _length_size(len(c)) + len(c) for c in contents)
+    buf = bytearray(1 + _length_size(body) + body)
+
+    buf[0] = _TAG_SEQUENCE
+    pos = _put_length(buf, 1, body)
+    for (_, tag), content in zip(_RSA_CONTAINER_FIELDS, contents):
+        size = len(content)
+        buf[pos] = tag
+        pos = _put_length(buf, pos + 1, size)
+        buf[pos:pos + size] = content
+        pos += size
+    return bytes(buf)
+
+
+def _read_header(view: memoryview, pos: int, tag: int) -> Tuple[int, int]:
+    """
+    Проверяет тег и строгую DER-длину; возвращает (начало, конец) содержимого.
+    """
+    end = len(view)
+    if pos + 2 > end or view[pos] != tag:
+        raise ValueError("Malformed DER: unexpected tag")
+    first = view[pos + 1]
+    pos += 2
+    if first < 0x80:
+        length = first
+    else:
+        size = first & 0x7F
+        # 0x80 — неопределённая длина (BER), в DER запрещена
+        if size == 0 or size > 8 or pos + size > end or view[pos] == 0:
+            raise ValueError("Malformed DER: bad length")
+        length = int.from_bytes(view[pos:pos + size], "big")
+        if length < 0x80:
+            raise ValueError("Malformed DER: non-minimal length")
+        pos += size
+    if pos + length > end:
+        raise ValueError("Malformed DER: truncated")
+    return pos, pos + length
+
+
+def decode_rsa_container(data: BytesLike) -> RSAContainerFields:
+    """
+    Разбор DER RSAContainer без копирования: строковые поля
+    возвращаются как memoryview поверх входного буфера.
+    """
+    view = memoryview(data)
+    start, end = _read_header(view, 0, _TAG_SEQUENCE)
+    if end != len(view):
+        raise ValueError("Malformed DER: trailing data")
+
+    values = []
+    pos = start
+    body = view[:end]
+    for _, tag in _RSA_CONTAINER_FIELDS:
+        c_start, c_end = _read_header(body, pos, tag)
+        content = body[c_start:c_end]
+        if tag == _TAG_INTEGER:
+            if len(content) == 0:
+                raise ValueError("Malformed DER: empty INTEGER")
+            if len(content) > 1 and (
+                (content[0] == 0x00 and content[1] < 0x80)
+                or (content[0] == 0xFF and content[1] >= 0x80)
+            ):
+                raise ValueError("Malformed DER: non-minimal INTEGER")
+            values.append(int.from_bytes(content, "big", signed=True))
+        else:
+            values.append(content)
+        pos = c_end
+    if pos != end:
+        raise ValueError("Malformed DER: unexpected fields")
+    return RSAContainerFields(*values)
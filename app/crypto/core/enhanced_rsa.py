@@ -1,26 +1,26 @@
 import os
 import numpy as np
 from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor
-
-import psutil
-import gmpy2
-from gmpy2 import mpz
 
 import hmac
 import hashlib
 
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 from cryptography.hazmat.primitives.asymmetric import rsa, padding
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 
 from pyasn1.type import univ, namedtype
 from pyasn1.codec.der import encoder as der_encoder, decoder as der_decoder
 
 from app.crypto.utils import generate_unique_random_images
-from app.crypto.core.prime import generate_prime, KEY_BIT_LENGTH
+from app.crypto.core.prime import KEY_BIT_LENGTH
+from app.crypto.core.prime_engine import get_prime_engine
+from app.crypto.core.entropy import get_entropy_sampler
+from app.crypto.core.kdf import get_kdf
 from app.crypto.core.math_utils import modinv
+from app.crypto.core.der import encode_rsa_container, decode_rsa_container
+from app.crypto.core.aead_stream import NONCE_PREFIX_LEN, seal_chunks, open_chunks
 
 # -----------------------------------------------------------------------------
 # ASN.1-контейнер с полем HMAC для целостности
@@ -35,34 +35,68 @@ class RSAContainer(univ.Sequence):
         namedtype.NamedType('hmac',        univ.OctetString()),
     )
 
+# -----------------------------------------------------------------------------
+# Гибридный контейнер: RSA-OAEP оборачивает ключ данных, полезная нагрузка —
+# AES-256-GCM чанками по chunkSize (схема STREAM, см. aead_stream).
+# Первое поле — INTEGER, а не OCTET STRING, как у RSAContainer, поэтому
+# типы контейнеров различаются по первому байту после заголовка SEQUENCE.
+# -----------------------------------------------------------------------------
+HYBRID_VERSION = 1
+HYBRID_CHUNK_SIZE = 64 * 1024
+
+
+class RSAHybridContainer(univ.Sequence):
+    componentType = namedtype.NamedTypes(
+        namedtype.NamedType('version',    univ.Integer()),
+        namedtype.NamedType('wrappedKey', univ.OctetString()),
+        namedtype.NamedType('nonce',      univ.OctetString()),
+        namedtype.NamedType('chunkSize',  univ.Integer()),
+        namedtype.NamedType('timestamp',  univ.OctetString()),
+        namedtype.NamedType('entropy',    univ.OctetString()),
+        namedtype.NamedType('n',          univ.Integer()),
+        namedtype.NamedType('e',          univ.Integer()),
+        namedtype.NamedType('payload',    univ.OctetString()),
+    )
+
 # -----------------------------------------------------------------------------
 # Генерация RSA-ключей на основе латента автоэнкодера + системной энтропии
 # -----------------------------------------------------------------------------
-def generate_enhanced_rsa_keys_from_image(encoder, used_images=None):
+def encode_latents(encoder, count: int, used_images=None) -> np.ndarray:
+    """
+    Генерирует `count` уникальных случайных изображений и получает
+    их латенты одним батчевым encoder.predict.
+    """
     if used_images is None:
         used_images = set()
+    images = generate_unique_random_images(
+        count, shape=(28, 28, 1), used_images=used_images
+    )
+    return encoder.predict(images, verbose=0)
 
+
+def generate_enhanced_rsa_keys_from_image(encoder, used_images=None, kdf=None):
     # 1) случайное уникальное изображение → латент
-    image = generate_unique_random_images(
-        1, shape=(28, 28, 1), used_images=used_images
-    )[0]
-    latent = encoder.predict(image[np.newaxis, ...], verbose=0)
+    latent = encode_latents(encoder, 1, used_images)[0]
+    return derive_rsa_keys_from_latent(latent, kdf)
+
 
+def derive_rsa_keys_from_latent(latent: np.ndarray, kdf=None):
+    """
+    KDF- и prime-стадии генерации: из латента одного изображения
+    строит пару ключей (private_key, public_key, entropy, timestamp).
+    kdf — стратегия из app.crypto.core.kdf (по умолчанию настроенная в Config).
+    """
     # 2) собираем энтропию
     system_entropy = os.urandom(32)
     timestamp      = datetime.utcnow().isoformat().encode('utf-8')
-    cpu_usage      = str(psutil.cpu_percent(interval=0.01)).encode('utf-8')
-    combined       = latent.tobytes() + system_entropy + timestamp + cpu_usage
+    # CPU/таймеры/память/urandom из буфера фонового сборщика — без ожидания
+    system_sample  = get_entropy_sampler().read()
+    combined       = latent.tobytes() + system_entropy + timestamp + system_sample
 
     # 3) KDF → 64 байта
-    kdf = PBKDF2HMAC(
-        algorithm=hashes.SHA512(),
-        length=64,
-        salt=system_entropy[:16],
-        iterations=5000,
-        backend=default_backend()
-    )
-    derived = kdf.derive(combined)
+    if kdf is None:
+        kdf = get_kdf()
+    derived = kdf.derive(combined, salt=system_entropy[:16], length=64)
 
     # 4) семена для p и q via SHA256
     h_p = hashes.Hash(hashes.SHA256(), backend=default_backend())
@@ -73,12 +107,11 @@ def generate_enhanced_rsa_keys_from_image(encoder, used_images=None):
     h_q.update(derived[32:] + b"q")
     seed_q = h_q.finalize()
 
-    # 5) параллельная генерация p, q
-    with ThreadPoolExecutor(max_workers=2) as ex:
-        p = int(ex.submit(generate_prime, seed_p).result())
-        q = int(ex.submit(generate_prime, seed_q).result())
+    # 5) параллельная генерация p, q в общем пуле процессов
+    p, q = get_prime_engine().generate_pair(seed_p, seed_q)
     if p == q:
-        q = int(gmpy2.next_prime(mpz(q + 2)))
+        import gmpy2
+        q = int(gmpy2.next_prime(q + 2))
 
     # 6) считаем n, phi и обратный к e
     n   = p * q
@@ -119,21 +152,12 @@ def rsa_encrypt_with_metadata(
         )
     )
 
-    # 2) заполняем ASN.1-контейнер
-    container = RSAContainer()
-    container.setComponentByName('ciphertext', ct)
-    container.setComponentByName('timestamp',   timestamp)
-    container.setComponentByName('entropy',     entropy)
-    nums = public_key.public_numbers()
-    container.setComponentByName('n', nums.n)
-    container.setComponentByName('e', nums.e)
-
-    # 3) HMAC-SHA256 по ciphertext, ключ = system_entropy
+    # 2) HMAC-SHA256 по ciphertext, ключ = system_entropy
     mac = hmac.new(entropy, ct, hashlib.sha256).digest()
-    container.setComponentByName('hmac', mac)
 
-    # 4) DER-кодируем
-    return der_encoder.encode(container)
+    # 3) DER-кодируем RSAContainer (быстрый кодек, вывод как у pyasn1)
+    nums = public_key.public_numbers()
+    return encode_rsa_container(ct, timestamp, entropy, nums.n, nums.e, mac)
 
 # -----------------------------------------------------------------------------
 # Расшифровка + проверка HMAC
@@ -143,10 +167,10 @@ def rsa_decrypt_with_metadata(
     private_key
 ) -> bytes:
     # 1) извлекаем поля из ASN.1
-    container, _ = der_decoder.decode(container_bytes, asn1Spec=RSAContainer())
-    ct       = bytes(container.getComponentByName('ciphertext'))
-    ent      = bytes(container.getComponentByName('entropy'))
-    recv_mac = bytes(container.getComponentByName('hmac'))
+    fields   = decode_rsa_container(container_bytes)
+    ct       = bytes(fields.ciphertext)
+    ent      = bytes(fields.entropy)
+    recv_mac = fields.hmac
 
     # 2) проверяем HMAC
     calc_mac = hmac.new(ent, ct, hashlib.sha256).digest()
@@ -163,3 +187,91 @@ def rsa_decrypt_with_metadata(
         )
     )
     return pt
+
+# -----------------------------------------------------------------------------
+# Гибридный режим RSA-KEM + AES-GCM для сообщений больше лимита OAEP
+# -----------------------------------------------------------------------------
+_OAEP_SHA512 = padding.OAEP(
+    mgf=padding.MGF1(hashes.SHA512()),
+    algorithm=hashes.SHA512(),
+    label=None
+)
+
+
+def oaep_max_plaintext(public_key) -> int:
+    """
+    Максимальная длина открытого текста RSA-OAEP-SHA512 для ключа.
+    """
+    return (public_key.key_size + 7) // 8 - 2 * hashes.SHA512.digest_size - 2
+
+
+def is_hybrid_container(container_bytes: bytes) -> bool:
+    """
+    True, если DER-контейнер — RSAHybridContainer (первое поле INTEGER).
+    """
+    if len(container_bytes) < 2 or container_bytes[0] != 0x30:
+        return False
+    first_len = container_bytes[1]
+    offset = 2 + (first_len & 0x7F if first_len & 0x80 else 0)
+    return len(container_bytes) > offset and container_bytes[offset] == 0x02
+
+
+def _hybrid_aad(wrapped_key: bytes, nonce: bytes, chunk_size: int,
+                timestamp: bytes, entropy: bytes) -> bytes:
+    # Заголовок контейнера привязан к каждому чанку через AAD
+    h = hashlib.sha256()
+    for part in (wrapped_key, nonce, chunk_size.to_bytes(4, "big"), timestamp, entropy):
+        h.update(len(part).to_bytes(4, "big"))
+        h.update(part)
+    return h.digest()
+
+
+def rsa_hybrid_encrypt(
+    public_key,
+    entropy: bytes,
+    timestamp: bytes,
+    plaintext: bytes,
+    chunk_size: int = HYBRID_CHUNK_SIZE
+) -> bytes:
+    # 1) случайный ключ данных, один раз оборачиваем RSA-OAEP
+    data_key = AESGCM.generate_key(bit_length=256)
+    wrapped = public_key.encrypt(data_key, _OAEP_SHA512)
+    nonce = os.urandom(NONCE_PREFIX_LEN)
+
+    # 2) полезная нагрузка — AES-GCM чанками
+    aad = _hybrid_aad(wrapped, nonce, chunk_size, timestamp, entropy)
+    payload = seal_chunks(AESGCM(data_key), nonce, plaintext, chunk_size, aad)
+
+    container = RSAHybridContainer()
+    container.setComponentByName('version',    HYBRID_VERSION)
+    container.setComponentByName('wrappedKey', wrapped)
+    container.setComponentByName('nonce',      nonce)
+    container.setComponentByName('chunkSize',  chunk_size)
+    container.setComponentByName('timestamp',  timestamp)
+    container.setComponentByName('entropy',    entropy)
+    nums = public_key.public_numbers()
+    container.setComponentByName('n', nums.n)
+    container.setComponentByName('e', nums.e)
+    container.setComponentByName('payload', payload)
+    return der_encoder.encode(container)
+
+
+def rsa_hybrid_decrypt(
+    container_bytes: bytes,
+    private_key
+) -> bytes:
+    container, _ = der_decoder.decode(container_bytes, asn1Spec=RSAHybridContainer())
+    if int(container.getComponentByName('version')) != HYBRID_VERSION:
+        raise ValueError("Unsupported hybrid container version")
+    wrapped    = bytes(container.getComponentByName('wrappedKey'))
+    nonce      = bytes(container.getComponentByName('nonce'))
+    chunk_size = int(container.getComponentByName('chunkSize'))
+    timestamp  = bytes(container.getComponentByName('timestamp'))
+    entropy    = bytes(container.getComponentByName('entropy'))
+    payload    = container.getComponentByName('payload').asOctets()
+    if len(nonce) != NONCE_PREFIX_LEN or not 0 < chunk_size < (1 << 32):
+        raise ValueError("Malformed hybrid container")
+
+    data_key = private_key.decrypt(wrapped, _OAEP_SHA512)
+    aad = _hybrid_aad(wrapped, nonce, chunk_size, timestamp, entropy)
+    return open_chunks(AESGCM(data_key), nonce, payload, chunk_size, aad)
@@ -1,4 +1,12 @@
 import os
+import time
+import hashlib
+import threading
+from collections import deque
+from typing import Deque, Dict, Optional
+
+import psutil
+
 from ..chaos.logistic_map import generate_logistic_map_image
 
 def get_entropy(length: int, source: str = "system") -> bytes:
@@ -18,3 +26,107 @@ def get_entropy(length: int, source: str = "system") -> bytes:
 
 def generate_symmetric_key(length: int = 32, source: str = "system") -> bytes:
     return get_entropy(length, source)
+
+
+class SystemEntropySampler:
+    """
+    Фоновый сборщик системной энтропии для генерации ключей.
+
+    Поток раз в `interval` секунд снимает измерения (загрузка CPU без
+    ожидания, счётчики времени, статистика памяти, os.urandom) и кладёт
+    их в кольцевой буфер глубиной `depth`. read() не блокируется:
+    хэширует текущее содержимое буфера вместе со свежим таймером.
+    """
+
+    def __init__(self, interval: float = 0.05, depth: int = 64):
+        self.interval = interval
+        self.depth = depth
+        self._buffer: Deque[bytes] = deque(maxlen=depth)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started_at: Optional[float] = None
+        self.samples = 0
+        # первый вызов cpu_percent(None) задаёт точку отсчёта
+        psutil.cpu_percent(interval=None)
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._started_at = time.monotonic()
+        self.samples = 0
+        self._thread = threading.Thread(
+            target=self._run, name="entropy-sampler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    @staticmethod
+    def _sample() -> bytes:
+        mem = psutil.virtual_memory()
+        return b"|".join((
+            str(psutil.cpu_percent(interval=None)).encode("utf-8"),
+            str(time.perf_counter_ns()).encode("utf-8"),
+            str(time.time_ns()).encode("utf-8"),
+            str(mem.available).encode("utf-8"),
+            str(mem.used).encode("utf-8"),
+            os.urandom(16),
+        ))
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._buffer.append(self._sample())
+            self.samples += 1
+            self._stop.wait(self.interval)
+
+    def read(self) -> bytes:
+        """
+        64 байта (SHA-512) от содержимого буфера и свежего таймера.
+        Если сборщик ещё не запущен, берёт одно измерение на месте.
+        """
+        snapshot = tuple(self._buffer) or (self._sample(),)
+        h = hashlib.sha512()
+        for sample in snapshot:
+            h.update(sample)
+        h.update(str(time.perf_counter_ns()).encode("utf-8"))
+        return h.digest()
+
+    def stats(self) -> Dict[str, float]:
+        elapsed = time.monotonic() - self._started_at if self._started_at else 0.0
+        return {
+            "running": self._thread is not None and self._thread.is_alive(),
+            "interval_ms": self.interval * 1000,
+            "refresh_rate_hz": self.samples / elapsed if elapsed > 0 else 0.0,
+            "buffer_depth": len(self._buffer),
+            "buffer_capacity": self.depth,
+            "samples": self.samples,
+        }
+
+
+_sampler: Optional[SystemEntropySampler] = None
+_sampler_lock = threading.Lock()
+
+
+def configure_entropy_sampler(interval: float = 0.05, depth: int = 64) -> SystemEntropySampler:
+    """
+    Пересоздаёт общий сборщик энтропии (старый останавливается).
+    """
+    global _sampler
+    with _sampler_lock:
+        old, _sampler = _sampler, SystemEntropySampler(interval, depth)
+    if old is not None:
+        old.stop()
+    return _sampler
+
+
+def get_entropy_sampler() -> SystemEntropySampler:
+    global _sampler
+    with _sampler_lock:
+        if _sampler is None:
+            _sampler = SystemEntropySampler()
+        return _sampler
@@ -0,0 +1,97 @@
+import os
+import mmap
+import struct
+from typing import Tuple
+
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import padding
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+from app.crypto.core.aead_stream import STREAM_CHUNK_SIZE, StreamSealer, StreamOpener
+
+# Файловый формат:
+# magic(4) || version(1) || len(wrapped)(2) || wrapped ||  поток aead_stream.
+# wrapped — 32-байтный ключ данных под RSA-OAEP-SHA512 (как у гибридного
+# контейнера), у каждого файла свой ключ. Сам поток — AES-256-GCM по схеме
+# STREAM, поэтому файл шифруется и расшифровывается за один проход.
+FILE_MAGIC = b"CENC"
+FILE_VERSION = 1
+FILE_SUFFIX = ".cenc"
+_HEADER = struct.Struct(">4sBH")
+
+_OAEP_SHA512 = padding.OAEP(
+    mgf=padding.MGF1(algorithm=hashes.SHA512()),
+    algorithm=hashes.SHA512(),
+    label=None,
+)
+
+
+def _map_input(f):
+    # пустой файл нельзя отобразить в память
+    size = os.fstat(f.fileno()).st_size
+    if size == 0:
+        return None, 0
+    return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ), size
+
+
+def _pump(stream, src, offset: int, dst, chunk_size: int) -> None:
+    mm, size = _map_input(src)
+    if mm is None:
+        if offset:
+            raise ValueError("Truncated encrypted file")
+        dst.write(stream.finalize())
+        return
+    try:
+        with memoryview(mm) as view:
+            for pos in range(offset, size, chunk_size):
+                dst.write(stream.update(view[pos:pos + chunk_size]))
+        dst.write(stream.finalize())
+    finally:
+        mm.close()
+
+
+def encrypt_file(src_path: str, dst_path: str, public_key, chunk_size: int = STREAM_CHUNK_SIZE) -> int:
+    """
+    Шифрует файл потоком через mmap; возвращает размер открытого текста.
+    """
+    data_key = AESGCM.generate_key(256)
+    wrapped = public_key.encrypt(data_key, _OAEP_SHA512)
+    sealer = StreamSealer(AESGCM(data_key), chunk_size)
+    with open(src_path, "rb") as src, open(dst_path, "wb") as dst:
+        dst.write(_HEADER.pack(FILE_MAGIC, FILE_VERSION, len(wrapped)) + wrapped)
+        _pump(sealer, src, 0, dst, chunk_size)
+        return os.fstat(src.fileno()).st_size
+
+
+def _read_header(src) -> Tuple[bytes, int]:
+    head = src.read(_HEADER.size)
+    if len(head) < _HEADER.size:
+        raise ValueError("Not an encrypted file")
+    magic, version, wrapped_len = _HEADER.unpack(head)
+    if magic != FILE_MAGIC or version != FILE_VERSION:
+        raise ValueError("Not an encrypted file")
+    wrapped = src.read(wrapped_len)
+    if len(wrapped) != wrapped_len:
+        raise ValueError("Truncated encrypted file")
+    return wrapped, _HEADER.size + wrapped_len
+
+
+def decrypt_file(src_path: str, dst_path: str, private_key, chunk_size: int = STREAM_CHUNK_SIZE) -> int:
+    """
+    Расшифровывает файл из encrypt_file. Открытый текст пишется во
+    временный файл и переименовывается только после проверки всех
+    тегов, так что при порче dst_path не появляется.
+    """
+    part = dst_path + ".part"
+    try:
+        with open(src_path, "rb") as src, open(part, "wb") as dst:
+            wrapped, offset = _read_header(src)
+            opener = StreamOpener(AESGCM(private_key.decrypt(wrapped, _OAEP_SHA512)))
+            _pump(opener, src, offset, dst, chunk_size)
+            written = dst.tell()
+        os.replace(part, dst_path)
+    except BaseException:
+        if os.path.exists(part):
+            os.remove(part)
+        raise
+    return written
@@ -0,0 +1,130 @@
+import os
+import time
+import threading
+from typing import Dict, Iterable, Optional
+
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+
+# Профиль по умолчанию — исторический PBKDF2-HMAC-SHA512 × 5000
+DEFAULT_KDF_PROFILE = "pbkdf2"
+DEFAULT_KDF_ITERATIONS = 5000
+
+
+class KDFStrategy:
+    """
+    Стадия вывода ключевого материала при генерации Chaos-RSA ключей:
+    из объединённой энтропии (латент + система) и соли получает
+    `length` байт, из которых затем хэшируются семена p и q.
+    """
+    name = "base"
+
+    def derive(self, material: bytes, salt: bytes, length: int = 64) -> bytes:
+        raise NotImplementedError
+
+    def describe(self) -> Dict[str, object]:
+        return {"profile": self.name}
+
+
+class PBKDF2Strategy(KDFStrategy):
+    name = "pbkdf2"
+
+    def __init__(self, iterations: int = DEFAULT_KDF_ITERATIONS):
+        if iterations < 1:
+            raise ValueError("PBKDF2 iterations must be positive")
+        self.iterations = iterations
+
+    def derive(self, material: bytes, salt: bytes, length: int = 64) -> bytes:
+        kdf = PBKDF2HMAC(
+            algorithm=hashes.SHA512(),
+            length=length,
+            salt=salt,
+            iterations=self.iterations,
+            backend=default_backend()
+        )
+        return kdf.derive(material)
+
+    def describe(self) -> Dict[str, object]:
+        return {"profile": self.name, "iterations": self.iterations}
+
+
+class HKDFStrategy(KDFStrategy):
+    """
+    HKDF-SHA512: без растяжения, только extract-and-expand.
+    Подходит, когда вход и так высокоэнтропийный (os.urandom + латент).
+    """
+    name = "hkdf"
+
+    def __init__(self, info: bytes = b"chaos-rsa-seed"):
+        self.info = info
+
+    def derive(self, material: bytes, salt: bytes, length: int = 64) -> bytes:
+        kdf = HKDF(
+            algorithm=hashes.SHA512(),
+            length=length,
+            salt=salt,
+            info=self.info,
+            backend=default_backend()
+        )
+        return kdf.derive(material)
+
+
+KDF_PROFILES = {
+    PBKDF2Strategy.name: PBKDF2Strategy,
+    HKDFStrategy.name: HKDFStrategy,
+}
+
+
+def build_kdf(profile: str = DEFAULT_KDF_PROFILE, iterations: int = DEFAULT_KDF_ITERATIONS) -> KDFStrategy:
+    """
+    Строит стратегию по имени профиля ('pbkdf2' или 'hkdf').
+    """
+    if profile not in KDF_PROFILES:
+        raise ValueError(f"Unknown KDF profile '{profile}', use one of {sorted(KDF_PROFILES)}")
+    if profile == PBKDF2Strategy.name:
+        return PBKDF2Strategy(iterations)
+    return KDF_PROFILES[profile]()
+
+
+_kdf: Optional[KDFStrategy] = None
+_kdf_lock = threading.Lock()
+
+
+def configure_kdf(profile: str = DEFAULT_KDF_PROFILE, iterations: int = DEFAULT_KDF_ITERATIONS) -> KDFStrategy:
+    """
+    Задаёт стратегию KDF, используемую генерацией ключей по умолчанию.
+    """
+    global _kdf
+    kdf = build_kdf(profile, iterations)
+    with _kdf_lock:
+        _kdf = kdf
+    return kdf
+
+
+def get_kdf() -> KDFStrategy:
+    global _kdf
+    with _kdf_lock:
+        if _kdf is None:
+            _kdf = build_kdf()
+        return _kdf
+
+
+def benchmark_kdf(strategies: Iterable[KDFStrategy], rounds: int = 20) -> Dict[str, float]:
+    """
+    Средняя задержка derive (мс) для каждой стратегии на входе
+    того же размера, что и при генерации ключей.
+    """
+    # латент 64×float32 + urandom(32) + timestamp + буфер энтропии
+    material = os.urandom(64 * 4 + 32 + 26 + 64)
+    salt = os.urandom(16)
+    results: Dict[str, float] = {}
+    for strategy in strategies:
+        desc = strategy.describe()
+        label = "-".join(str(v) for v in desc.values())
+        start = time.perf_counter()
+        for _ in range(rounds):
+            strategy.derive(material, salt)
+        results[label] = (time.perf_counter() - start) * 1000 / rounds
+    return results
@@ -1,12 +1,75 @@
-import gmpy2
-from gmpy2 import mpz
+from itertools import compress
+from typing import Dict, List, Tuple
 
 # Размер простого в битах
 KEY_BIT_LENGTH = 2048
 
+# Параметры решета: простые до SIEVE_BOUND, окно — SIEVE_WINDOW нечётных кандидатов
+SIEVE_BOUND = 1 << 16
+SIEVE_WINDOW = 1024
+MR_ROUNDS = 25
+
+
+def _small_primes(bound: int) -> List[int]:
+    flags = bytearray([1]) * bound
+    flags[0:2] = b"\x00\x00"
+    for i in range(2, int(bound ** 0.5) + 1):
+        if flags[i]:
+            flags[i * i::i] = bytes(len(range(i * i, bound, i)))
+    # 2 не нужна: в окне только нечётные кандидаты
+    return [p for p in range(3, bound) if flags[p]]
+
+
+SMALL_PRIMES = _small_primes(SIEVE_BOUND)
+# Для простого p: индекс i первого кандидата base + 2*i, кратного p,
+# равен (p - base mod p) * inv(2) mod p, где inv(2) = (p + 1) / 2
+_HALF_INV = [(p + 1) >> 1 for p in SMALL_PRIMES]
+
+
+def search_prime(seed: bytes) -> Tuple[int, Dict[str, int]]:
+    """
+    Наименьшее простое, большее seed как 2048-битного числа
+    (результат совпадает с gmpy2.next_prime), и статистика поиска.
+
+    Окно из SIEVE_WINDOW нечётных кандидатов просеивается по таблице
+    малых простых, остатки при сдвиге окна обновляются инкрементально.
+    Выжившие кандидаты проверяются по порядку: сначала дешёвый тест
+    Миллера–Рабина по основанию 2, затем полная проверка первого
+    прошедшего, поэтому выбор детерминирован.
+    """
+    # gmpy2 — только при поиске: импорт app не должен его тянуть
+    import gmpy2
+    from gmpy2 import mpz
+
+    si = int.from_bytes(seed, "big") | (1 << (KEY_BIT_LENGTH - 1))
+    base = si + 1 if si % 2 == 0 else si + 2
+    stats = {"windows": 0, "sieved": 0, "tested": 0}
+
+    residues = [base % p for p in SMALL_PRIMES]
+    step = 2 * SIEVE_WINDOW
+    while True:
+        stats["windows"] += 1
+        sieve = bytearray([1]) * SIEVE_WINDOW
+        for p, half, r in zip(SMALL_PRIMES, _HALF_INV, residues):
+            i = ((p - r) * half) % p
+            if i < SIEVE_WINDOW:
+                sieve[i::p] = bytes(len(range(i, SIEVE_WINDOW, p)))
+
+        survivors = list(compress(range(SIEVE_WINDOW), sieve))
+        stats["sieved"] += SIEVE_WINDOW - len(survivors)
+
+        for i in survivors:
+            candidate = mpz(base + 2 * i)
+            stats["tested"] += 1
+            if gmpy2.is_strong_prp(candidate, 2) and gmpy2.is_prime(candidate, MR_ROUNDS):
+                return int(candidate), stats
+
+        base += step
+        residues = [(r + step) % p for p, r in zip(SMALL_PRIMES, residues)]
+
+
 def generate_prime(seed: bytes) -> int:
     """
     Превращает seed в 2048-битное число и берёт следующее простое.
     """
-    si = int.from_bytes(seed, "big") | (1 << (KEY_BIT_LENGTH - 1))
-    return int(gmpy2.next_prime(mpz(si)))
+    return search_prime(seed)[0]
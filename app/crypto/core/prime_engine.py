@@ -0,0 +1,115 @@
+import os
+import time
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Iterable, Optional, Tuple
+
+from app.crypto.core.prime import search_prime
+
+
+class PrimeEngine:
+    """
+    Общий для всех генераторов ключей пул процессов поиска простых.
+
+    Поиск p и q отправляется в пул одновременно, поэтому пара ищется
+    параллельно на разных ядрах и не конкурирует за GIL с потоками
+    приложения. Используется контекст 'spawn': дочерние процессы
+    импортируют только app.crypto.core.prime, без TensorFlow.
+    """
+
+    def __init__(self, workers: Optional[int] = None):
+        self.workers = workers if workers and workers > 0 else (os.cpu_count() or 1)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._stats = {"primes": 0, "windows": 0, "sieved": 0, "tested": 0}
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def generate_pair(self, seed_p: bytes, seed_q: bytes) -> Tuple[int, int]:
+        """
+        Параллельно ищет простые для seed_p и seed_q.
+        """
+        ex = self._get_executor()
+        fut_p = ex.submit(search_prime, seed_p)
+        fut_q = ex.submit(search_prime, seed_q)
+        p, stats_p = fut_p.result()
+        q, stats_q = fut_q.result()
+        with self._lock:
+            self._stats["primes"] += 2
+            for key in ("windows", "sieved", "tested"):
+                self._stats[key] += stats_p[key] + stats_q[key]
+        return p, q
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Суммарная статистика поиска: сколько кандидатов отсеяно решетом
+        и сколько прошло через тест Миллера–Рабина.
+        """
+        with self._lock:
+            return dict(self._stats, workers=self.workers)
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait)
+                self._executor = None
+
+
+_engine: Optional[PrimeEngine] = None
+_engine_lock = threading.Lock()
+
+
+def configure_prime_engine(workers: Optional[int] = None) -> PrimeEngine:
+    """
+    Пересоздаёт общий движок с заданным числом процессов
+    (None или 0 — по числу ядер).
+    """
+    global _engine
+    with _engine_lock:
+        old, _engine = _engine, PrimeEngine(workers)
+    if old is not None:
+        old.shutdown(wait=False)
+    return _engine
+
+
+def get_prime_engine() -> PrimeEngine:
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = PrimeEngine()
+        return _engine
+
+
+def benchmark_prime_engine(
+    worker_counts: Iterable[int],
+    pairs: int = 8,
+) -> Dict[int, float]:
+    """
+    Замеряет пропускную способность (пар p/q ≈ ключей в секунду)
+    для разного числа процессов. Пары запрашиваются одновременно
+    `pairs` потоками-клиентами, как при параллельных /rsa/generate.
+    Для всех значений workers используются одни и те же seed'ы:
+    поиск детерминирован, так что замеры сравнимы между собой.
+    """
+    seeds = [(os.urandom(32), os.urandom(32)) for _ in range(pairs)]
+    results: Dict[int, float] = {}
+    for workers in worker_counts:
+        engine = PrimeEngine(workers)
+        try:
+            # прогрев: запуск процессов не должен попадать в замер
+            engine.generate_pair(os.urandom(32), os.urandom(32))
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=pairs) as clients:
+                list(clients.map(lambda s: engine.generate_pair(*s), seeds))
+            results[workers] = pairs / (time.perf_counter() - start)
+        finally:
+            engine.shutdown()
+    return results
@@ -1,45 +1,268 @@
 import time
-import random
-from cryptography.hazmat.primitives import hashes, hmac
-from pyasn1.codec.der.decoder import decode as der_decode
-from .enhanced_rsa import RSAContainer
-from cryptography.hazmat.backends import default_backend
+import hmac
+import asyncio
+import hashlib
+import secrets
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+from .der import decode_rsa_container
 
 TARGET_TIME = 0.1  # сек
 
-def secure_decrypt(container: bytes, private_key=None) -> bytes:
-    start = time.time()
+# Через сколько расшифровок пара ослепления генерируется заново
+# (между ними она обновляется возведением в квадрат)
+BLINDING_REFRESH = 64
+# Сколько ключей держим в кэше расшифровщиков
+DECRYPTOR_CACHE_SIZE = 256
+
+_OAEP_HASH = hashlib.sha512
+_OAEP_HLEN = _OAEP_HASH().digest_size
+_OAEP_LHASH = _OAEP_HASH(b"").digest()
+
+
+def _mgf1(seed: bytes, length: int) -> bytes:
+    out = bytearray()
+    counter = 0
+    while len(out) < length:
+        out += _OAEP_HASH(seed + counter.to_bytes(4, "big")).digest()
+        counter += 1
+    return bytes(out[:length])
+
+
+def _xor(a: bytes, b: bytes) -> bytes:
+    return (int.from_bytes(a, "big") ^ int.from_bytes(b, "big")).to_bytes(len(a), "big")
+
+
+def oaep_decode(em: bytes, k: int) -> bytes:
+    """
+    Снятие EME-OAEP (SHA-512, MGF1-SHA-512, пустая метка) —
+    те же параметры, что в rsa_encrypt_with_metadata.
+    Все ошибки формата сводятся к одному ValueError.
+    """
+    if k < 2 * _OAEP_HLEN + 2 or len(em) != k:
+        raise ValueError("Decryption error")
+    y = em[0]
+    masked_seed = em[1:1 + _OAEP_HLEN]
+    masked_db = em[1 + _OAEP_HLEN:]
+    seed = _xor(masked_seed, _mgf1(masked_db, _OAEP_HLEN))
+    db = _xor(masked_db, _mgf1(seed, k - _OAEP_HLEN - 1))
+
+    rest = db[_OAEP_HLEN:]
+    stripped = rest.lstrip(b"\x00")
+    good = hmac.compare_digest(db[:_OAEP_HLEN], _OAEP_LHASH)
+    good &= y == 0
+    good &= stripped[:1] == b"\x01"
+    if not good:
+        raise ValueError("Decryption error")
+    return stripped[1:]
+
+
+class CRTDecryptor:
+    """
+    Ослеплённое RSA-дешифрование по КТО для одного ключа.
+
+    Параметры p, q, dmp1, dmq1, iqmp переводятся в mpz один раз,
+    возведение в степень идёт по модулям p и q через gmpy2.powmod.
+    Пара ослепления (r^e, r^-1) хранится на ключ и между расшифровками
+    обновляется возведением в квадрат; раз в BLINDING_REFRESH вызовов
+    r выбирается заново.
+    """
+
+    def __init__(self, private_key):
+        # gmpy2 — при первой расшифровке, а не при импорте app
+        from gmpy2 import mpz
+
+        nums = private_key.private_numbers()
+        self.n = mpz(nums.public_numbers.n)
+        self.e = mpz(nums.public_numbers.e)
+        self.p = mpz(nums.p)
+        self.q = mpz(nums.q)
+        self.dmp1 = mpz(nums.dmp1)
+        self.dmq1 = mpz(nums.dmq1)
+        self.iqmp = mpz(nums.iqmp)
+        self.k = (int(self.n).bit_length() + 7) // 8
+        self._lock = threading.Lock()
+        self._new_blinding()
+
+    def _new_blinding(self) -> None:
+        import gmpy2
+
+        while True:
+            r = gmpy2.mpz(secrets.randbelow(int(self.n) - 3) + 2)
+            if gmpy2.gcd(r, self.n) == 1:
+                break
+        self._r_e = gmpy2.powmod(r, self.e, self.n)
+        self._r_inv = gmpy2.invert(r, self.n)
+        self._uses = 0
+
+    def _next_blinding(self):
+        with self._lock:
+            pair = (self._r_e, self._r_inv)
+            self._uses += 1
+            if self._uses >= BLINDING_REFRESH:
+                self._new_blinding()
+            else:
+                self._r_e = self._r_e * self._r_e % self.n
+                self._r_inv = self._r_inv * self._r_inv % self.n
+        return pair
+
+    def raw_decrypt(self, c: int) -> int:
+        if not 0 <= c < self.n:
+            raise ValueError("Decryption error")
+        import gmpy2
+
+        r_e, r_inv = self._next_blinding()
+        blinded = r_e * c % self.n
+
+        m1 = gmpy2.powmod(blinded, self.dmp1, self.p)
+        m2 = gmpy2.powmod(blinded, self.dmq1, self.q)
+        h = self.iqmp * (m1 - m2) % self.p
+        m = m2 + h * self.q
+        # Проверка против сбоев в одной из половин КТО (атака Белкора)
+        if gmpy2.powmod(m, self.e, self.n) != blinded:
+            raise ValueError("Decryption error")
+        return int(m * r_inv % self.n)
 
-    asn1, _ = der_decode(container, asn1Spec=RSAContainer())
-    ct = bytes(asn1.getComponentByName('ciphertext'))
-    tag = bytes(asn1.getComponentByName('hmac'))
+    def decrypt(self, ciphertext: bytes) -> bytes:
+        """
+        RSA-OAEP-SHA512: ослеплённое КТО-дешифрование + снятие паддинга.
+        """
+        if len(ciphertext) != self.k:
+            raise ValueError("Decryption error")
+        m = self.raw_decrypt(int.from_bytes(ciphertext, "big"))
+        return oaep_decode(m.to_bytes(self.k, "big"), self.k)
 
-    key = bytes(asn1.getComponentByName('timestamp'))[:16]
-    h = hmac.HMAC(key, hashes.SHA256(), backend=default_backend())
-    h.update(ct)
-    h.verify(tag)
+
+_decryptors: "OrderedDict[int, CRTDecryptor]" = OrderedDict()
+_decryptors_lock = threading.Lock()
+
+
+def get_decryptor(private_key) -> CRTDecryptor:
+    """
+    Расшифровщик для ключа из LRU-кэша (ключ кэша — модуль n).
+    """
+    n = private_key.private_numbers().public_numbers.n
+    with _decryptors_lock:
+        dec = _decryptors.get(n)
+        if dec is not None:
+            _decryptors.move_to_end(n)
+            return dec
+    dec = CRTDecryptor(private_key)
+    with _decryptors_lock:
+        _decryptors[n] = dec
+        while len(_decryptors) > DECRYPTOR_CACHE_SIZE:
+            _decryptors.popitem(last=False)
+    return dec
+
+
+def decrypt_container(container: bytes, private_key=None) -> bytes:
+    """
+    Проверка HMAC и расшифровка ASN.1-контейнера из
+    rsa_encrypt_with_metadata, без выравнивания по времени.
+    """
+    fields = decode_rsa_container(container)
+    ct = fields.ciphertext
+    ent = bytes(fields.entropy)
+    tag = fields.hmac
+
+    # HMAC-SHA256 с ключом entropy — как при шифровании
+    calc = hmac.new(ent, ct, hashlib.sha256).digest()
+    if not hmac.compare_digest(calc, tag):
+        raise ValueError("HMAC check failed")
 
     # Если private_key не передан, то подразумевается, что его берут из контекста
-    priv = private_key
-    if priv is None:
+    if private_key is None:
         raise ValueError("Private key is required for RSA decryption")
 
-    nums = priv.private_numbers()
-    n, e, d = nums.public_numbers.n, nums.public_numbers.e, nums.d
+    return get_decryptor(private_key).decrypt(ct)
+
+
+def secure_decrypt(container: bytes, private_key=None) -> bytes:
+    start = time.time()
+    try:
+        return decrypt_container(container, private_key)
+    finally:
+        # выравниваем время и для успешных, и для неудачных расшифровок
+        elapsed = time.time() - start
+        if elapsed < TARGET_TIME:
+            time.sleep(TARGET_TIME - elapsed)
+
+
+class TimingEqualizer:
+    """
+    Выравнивание времени расшифровки без занятия рабочих потоков.
+
+    CPU-часть выполняется в отдельном пуле потоков, а добивка до
+    целевой задержки — через await asyncio.sleep в цикле событий,
+    так что сотни одновременных запросов не держат по потоку на 100 мс.
+    Джиттер (фактическое время минус цель) копится в скользящем окне.
+    """
+
+    def __init__(self, target: float = TARGET_TIME, workers: Optional[int] = None, window: int = 1024):
+        self.target = target
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="decrypt")
+        self._jitter = deque(maxlen=window)
+        self.calls = 0
+        self.overruns = 0
+
+    async def run(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        try:
+            return await loop.run_in_executor(self._executor, fn, *args)
+        finally:
+            remaining = self.target - (loop.time() - start)
+            if remaining > 0:
+                await asyncio.sleep(remaining)
+            else:
+                self.overruns += 1
+            self.calls += 1
+            self._jitter.append(loop.time() - start - self.target)
+
+    def stats(self) -> Dict[str, float]:
+        jitter = sorted(self._jitter)
+        def pct(q: float) -> float:
+            return jitter[min(len(jitter) - 1, int(q * len(jitter)))] * 1000 if jitter else 0.0
+        return {
+            "target_ms": self.target * 1000,
+            "calls": self.calls,
+            "overruns": self.overruns,
+            "jitter_mean_ms": sum(jitter) / len(jitter) * 1000 if jitter else 0.0,
+            "jitter_p50_ms": pct(0.5),
+            "jitter_p99_ms": pct(0.99),
+            "jitter_max_ms": jitter[-1] * 1000 if jitter else 0.0,
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+
+_equalizer: Optional[TimingEqualizer] = None
+_equalizer_lock = threading.Lock()
+
+
+def configure_timing_equalizer(target: float = TARGET_TIME, workers: Optional[int] = None) -> TimingEqualizer:
+    global _equalizer
+    with _equalizer_lock:
+        old, _equalizer = _equalizer, TimingEqualizer(target, workers)
+    if old is not None:
+        old.shutdown(wait=False)
+    return _equalizer
 
-    r = random.randrange(2, n-1)
-    r_e = pow(r, e, n)
-    c_int = int.from_bytes(ct, 'big')
-    blinded = (r_e * c_int) % n
 
-    m1 = pow(blinded, d, n)
-    r_inv = pow(r, -1, n)
-    m_int = (m1 * r_inv) % n
-    m_len = (m_int.bit_length() + 7)//8
-    plaintext = m_int.to_bytes(m_len, 'big')
+def get_timing_equalizer() -> TimingEqualizer:
+    global _equalizer
+    with _equalizer_lock:
+        if _equalizer is None:
+            _equalizer = TimingEqualizer()
+        return _equalizer
 
-    elapsed = time.time() - start
-    if elapsed < TARGET_TIME:
-        time.sleep(TARGET_TIME - elapsed)
 
-    return plaintext
+async def secure_decrypt_async(container: bytes, private_key=None) -> bytes:
+    """
+    Асинхронный аналог secure_decrypt для обработчиков FastAPI.
+    """
+    return await get_timing_equalizer().run(decrypt_container, container, private_key)
@@ -1,7 +1,11 @@
 import os
+import hmac
 import base64
-from typing import Tuple, Dict
+import threading
+from collections import OrderedDict
+from typing import Tuple, Dict, Optional
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM, ChaCha20Poly1305
 from cryptography.hazmat.primitives import padding as sym_padding
 from cryptography.hazmat.backends import default_backend
 
@@ -54,3 +58,102 @@ class PythonEncryption:
         plaintext = unpadder.update(padded) + unpadder.finalize()
 
         return plaintext, metadata
+
+
+# AEAD-алгоритмы по имени в metadata["alg"]
+AEAD_ALGORITHMS = {
+    "aes-gcm": AESGCM,
+    "chacha20-poly1305": ChaCha20Poly1305,
+}
+DEFAULT_AEAD = "aes-gcm"
+# Старый режим: шифротексты с metadata["iv"]
+LEGACY_CBC = "aes-cbc"
+SYMMETRIC_ALGORITHMS = tuple(AEAD_ALGORITHMS) + (LEGACY_CBC,)
+
+# Случайный 96-битный nonce на каждое сообщение. Счётчик здесь небезопасен:
+# экземпляр пересоздаётся при вытеснении из кэша, перезапуске процесса и в
+# каждом воркере, так что (ключ, nonce) повторялись бы
+NONCE_LEN = 12
+# Сколько инициализированных шифров держим в кэше
+CIPHER_CACHE_SIZE = 1024
+
+
+class AEADEncryption:
+    """
+    AES-256-GCM / ChaCha20-Poly1305 с заранее инициализированным
+    объектом шифра. Состояния между сообщениями нет: кэшируется только
+    объект AESGCM/ChaCha20Poly1305, nonce каждый раз берётся из os.urandom.
+    Принимает любые bytes-like, в т.ч. memoryview, без копирования.
+    """
+
+    def __init__(self, key: bytes, algorithm: str = DEFAULT_AEAD):
+        if algorithm not in AEAD_ALGORITHMS:
+            raise ValueError(f"Unknown AEAD algorithm '{algorithm}'")
+        self.key = key
+        self.algorithm = algorithm
+        self._aead = AEAD_ALGORITHMS[algorithm](key)
+
+    def encrypt(self, plaintext, aad: Optional[bytes] = None) -> Tuple[bytes, Dict[str, str]]:
+        """
+        Возвращает ciphertext||tag и metadata с алгоритмом и base64 nonce.
+        """
+        nonce = os.urandom(NONCE_LEN)
+        ciphertext = self._aead.encrypt(nonce, plaintext, aad)
+        return ciphertext, {
+            "alg": self.algorithm,
+            "nonce": base64.b64encode(nonce).decode("utf-8"),
+        }
+
+    def decrypt(self, ciphertext, metadata: Dict[str, str], aad: Optional[bytes] = None) -> Tuple[bytes, Dict[str, str]]:
+        """
+        Проверяет тег и расшифровывает; при порче бросает InvalidTag.
+        """
+        if metadata.get("alg", self.algorithm) != self.algorithm:
+            raise ValueError(f"Ciphertext algorithm '{metadata.get('alg')}' does not match '{self.algorithm}'")
+        nonce = base64.b64decode(metadata["nonce"])
+        return self._aead.decrypt(nonce, ciphertext, aad), metadata
+
+
+_ciphers: "OrderedDict[Tuple[str, str], AEADEncryption]" = OrderedDict()
+_ciphers_lock = threading.Lock()
+
+
+def get_cipher(key_id: str, key: bytes, algorithm: str = DEFAULT_AEAD) -> AEADEncryption:
+    """
+    Шифр для key_id из LRU-кэша. Если под тем же key_id выпущен
+    новый ключ, запись в кэше заменяется.
+    """
+    cache_key = (key_id, algorithm)
+    with _ciphers_lock:
+        cipher = _ciphers.get(cache_key)
+        if cipher is not None and hmac.compare_digest(cipher.key, key):
+            _ciphers.move_to_end(cache_key)
+            return cipher
+    cipher = AEADEncryption(key, algorithm)
+    with _ciphers_lock:
+        _ciphers[cache_key] = cipher
+        _ciphers.move_to_end(cache_key)
+        while len(_ciphers) > CIPHER_CACHE_SIZE:
+            _ciphers.popitem(last=False)
+    return cipher
+
+
+def symmetric_encrypt(key_id: str, key: bytes, plaintext, algorithm: str = DEFAULT_AEAD) -> Tuple[bytes, Dict[str, str]]:
+    """
+    Шифрует выбранным алгоритмом; aes-cbc — старый PythonEncryption.
+    """
+    if algorithm == LEGACY_CBC:
+        return PythonEncryption(key).encrypt(bytes(plaintext))
+    return get_cipher(key_id, key, algorithm).encrypt(plaintext)
+
+
+def symmetric_decrypt(key_id: str, key: bytes, ciphertext, metadata: Dict[str, str]) -> bytes:
+    """
+    Расшифровка по metadata: "nonce" (+ "alg") — AEAD,
+    "iv" — шифротексты старого формата AES-256-CBC.
+    """
+    if "nonce" in metadata:
+        return get_cipher(key_id, key, metadata.get("alg", DEFAULT_AEAD)).decrypt(ciphertext, metadata)[0]
+    if "iv" in metadata:
+        return PythonEncryption(key).decrypt(bytes(ciphertext), metadata)[0]
+    raise ValueError("Metadata must contain 'nonce' or 'iv'")
@@ -1,8 +1,6 @@
 import os
 import numpy as np
 from math import log2
-import gmpy2
-from gmpy2 import mpz
 
 KEY_BIT_LENGTH = 2048
 used_images = set()
@@ -1,59 +1,46 @@
-import threading
 from fastapi import FastAPI, Depends
-from app.crypto.chaos.dataset import generate_logistic_map_dataset
-from app.crypto.utils        import used_images
-from app.crypto.autoencoder.retraining import build_autoencoder
-from app.crypto.core.enhanced_rsa     import generate_enhanced_rsa_keys_from_image
-from app.api.routes import auth, keys, crypto, config, rsa
+from app.api.routes import auth, keys, crypto, config, rsa, health, models, jobs
 from app.api.routes.auth import get_current_user
+from app.api.routes.health import require_ready
+from app.services import deps
+from app.services.deps import (
+    lifecycle, prime_engine, entropy_sampler, timing_equalizer, batch_processor,
+    job_scheduler,
+)
 
 app = FastAPI(title="Extended Cryptographic Service")
 
-# глобальные объекты модели и ключей
-model_autoencoder = None
-encoder_model      = None
-current_private_key = None
-current_public_key  = None
-
 @app.on_event("startup")
 def startup_event():
-    global model_autoencoder, encoder_model, current_private_key, current_public_key
-
-    # 1. Строим автоэнкодер и энкодер
-    model_autoencoder, encoder_model = build_autoencoder((28, 28))
-
-    # 2. Немедленно генерируем первую пару ключей,
-    # чтобы сервис был готов к шифрованию
-    current_private_key, current_public_key, _, _ = \
-        generate_enhanced_rsa_keys_from_image(encoder_model, used_images)
-
-    # 3. Запускаем предобучение автоэнкодера в фоне на картах хаоса
-    def _pretrain_loop():
-        chaos_data = generate_logistic_map_dataset(
-            num_images=1000,
-            image_size=28,
-            r=3.99,
-            fixed_initial=False
-        )
-        model_autoencoder.fit(
-            chaos_data, chaos_data,
-            epochs=5,
-            batch_size=64,
-            validation_split=0.1,
-            verbose=1
-        )
-        # По желанию: после предобучения можно обновить current_private_key и т.д.
-
-    threading.Thread(target=_pretrain_loop, daemon=True).start()
+    # Порт открывается сразу; модели, пулы ключей и сборщик энтропии
+    # прогреваются в фоне по этапам (см. deps.lifecycle и /health/ready)
+    lifecycle.start()
+
+@app.on_event("shutdown")
+def shutdown_event():
+    for pool in (deps.rsa_key_pool, deps.symmetric_key_pool):
+        if pool is not None:
+            pool.stop(timeout=1.0)
+    prime_engine.shutdown(wait=False)
+    entropy_sampler.stop(timeout=1.0)
+    timing_equalizer.shutdown(wait=False)
+    batch_processor.shutdown(wait=False)
+    job_scheduler.shutdown(wait=False)
+    if deps.inference_batcher is not None:
+        deps.inference_batcher.stop(timeout=1.0)
 
 # --- Роуты без авторизации ---
 app.include_router(auth.router, prefix="/auth")
+app.include_router(health.router, prefix="/health")
 
-# --- Все остальные роуты — под JWT ---
+# --- Все остальные роуты — под JWT; тяжёлые — только после прогрева ---
+ready = [Depends(get_current_user), Depends(require_ready)]
 app.include_router(keys.router,   prefix="/keys",   dependencies=[Depends(get_current_user)])
-app.include_router(crypto.router, prefix="/crypto", dependencies=[Depends(get_current_user)])
-app.include_router(config.router, prefix="/config", dependencies=[Depends(get_current_user)])
-app.include_router(rsa.router,    prefix="/rsa",    dependencies=[Depends(get_current_user)])
+app.include_router(crypto.router, prefix="/crypto", dependencies=ready)
+app.include_router(config.router, prefix="/config", dependencies=ready)
+app.include_router(rsa.router,    prefix="/rsa",    dependencies=ready)
+app.include_router(models.router, prefix="/models", dependencies=ready)
+app.include_router(jobs.router,   prefix="/jobs",   dependencies=[Depends(get_current_user)])
 
 @app.get("/")
 async def root():
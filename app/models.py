@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Integer, String, LargeBinary, Float
 from .db import Base
 
 class User(Base):
@@ -6,3 +6,13 @@ class User(Base):
     id = Column(Integer, primary_key=True, index=True)
     username = Column(String, unique=True, index=True, nullable=False)
     hashed_password = Column(String, nullable=False)
+
+
+class RSAKeyRecord(Base):
+    __tablename__ = "rsa_keys"
+    key_id = Column(String, primary_key=True)
+    private_pem = Column(LargeBinary, nullable=False)   # PKCS8, при наличии пароля — зашифрован
+    public_pem = Column(LargeBinary, nullable=False)    # SubjectPublicKeyInfo
+    entropy = Column(LargeBinary, nullable=False)
+    timestamp = Column(LargeBinary, nullable=False)
+    created_at = Column(Float, nullable=False)
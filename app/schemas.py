@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 
 # --- Ключи и криптография ---
@@ -9,6 +9,14 @@ class KeyOut(BaseModel):
     algorithm: str
     length: int
 
+class KeyStoreStats(BaseModel):
+    size: int
+    shards: int
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+
 class EncryptRequest(BaseModel):
     key_id: str
     data: str
@@ -28,6 +36,29 @@ class DecryptResponse(BaseModel):
     metrics: Dict[str, Any]
     metadata: Dict[str, Any]
 
+class BatchEncryptRequest(BaseModel):
+    key_id: str
+    items: List[str]
+    retrain_autoencoder: Optional[bool] = None
+
+class BatchDecryptItem(BaseModel):
+    ciphertext: str
+    metadata: Dict[str, str]
+
+class BatchDecryptRequest(BaseModel):
+    key_id: str
+    items: List[BatchDecryptItem]
+
+class BatchItemResult(BaseModel):
+    index: int
+    ok: bool
+    result: Optional[str] = None    # шифротекст или открытый текст
+    metadata: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+class BatchResponse(BaseModel):
+    results: List[BatchItemResult]
+
 class TestResult(BaseModel):
     python_ms: float
     ml_ms: float
@@ -38,11 +69,15 @@ class ConfigOptions(BaseModel):
     core_type: str
     entropy_source: str
     retrain_autoencoder: bool
+    kdf_profile: str = "pbkdf2"
+    kdf_iterations: int = 5000
 
 class ConfigUpdate(BaseModel):
     core_type: Optional[str] = None
     entropy_source: Optional[str] = None
     retrain_autoencoder: Optional[bool] = None
+    kdf_profile: Optional[str] = None
+    kdf_iterations: Optional[int] = None
 
 # --- RSA / Chaos-RSA ---
 
@@ -62,6 +97,16 @@ class RSAKeyOut(BaseModel):
 class RSAEncryptRequest(BaseModel):
     key_id: str
     data: str
+    mode: Optional[str] = None  # "oaep" | "hybrid"; по умолчанию — по размеру данных
+
+class RSABatchEncryptRequest(BaseModel):
+    key_id: str
+    items: List[str]
+    mode: Optional[str] = None
+
+class RSABatchDecryptRequest(BaseModel):
+    key_id: str
+    items: List[str]  # ciphertext_asn1_hex
 
 class RSAEncryptResponse(BaseModel):
     ciphertext_asn1_hex: str
@@ -73,11 +118,120 @@ class RSADecryptRequest(BaseModel):
 class RSADecryptResponse(BaseModel):
     plaintext: str
 
+class KeyPoolStats(BaseModel):
+    size: int
+    low_watermark: int
+    high_watermark: int
+    hits: int
+    misses: int
+    produced: int
+    errors: int
+    batch_size: int = 1
+    refills: int = 0
+    last_refill_ms: float = 0.0
+    avg_refill_ms: float = 0.0
+
+class RSAKeyStoreStats(BaseModel):
+    cached: int
+    cache_size: int
+    hits: int
+    misses: int
+    evictions: int
+
+class PrimeSearchStats(BaseModel):
+    workers: int
+    primes: int
+    windows: int
+    sieved: int
+    tested: int
+
+class EntropySamplerStats(BaseModel):
+    running: bool
+    interval_ms: float
+    refresh_rate_hz: float
+    buffer_depth: int
+    buffer_capacity: int
+    samples: int
+
+class DecryptTimingStats(BaseModel):
+    target_ms: float
+    calls: int
+    overruns: int
+    jitter_mean_ms: float
+    jitter_p50_ms: float
+    jitter_p99_ms: float
+    jitter_max_ms: float
+
+class ModelInfo(BaseModel):
+    name: str
+    version: int
+    source: str
+    created_at: float
+    params: int
+    weight_bytes: int
+    optimizer_bytes: int
+
+class BatchLatency(BaseModel):
+    batches: int
+    avg_forward_ms: float
+    avg_latency_ms: float
+
+class InferenceStats(BaseModel):
+    max_batch: int
+    max_wait_ms: float
+    requests: int
+    batches: int
+    bypassed: int
+    avg_batch_size: float
+    # ключ — размер батча, округлённый вверх до степени двойки
+    by_batch_size: Dict[str, BatchLatency]
+
+class RetrainStats(BaseModel):
+    version: int
+    pending: bool
+    running: bool
+    scheduled: int
+    coalesced: int
+    completed: int
+    failed: int
+    last_ms: float
+    last_error: Optional[str] = None
+
+class HealthStatus(BaseModel):
+    state: str
+    stage: Optional[str] = None
+    completed: List[str] = []
+    pending: List[str] = []
+    timings_ms: Dict[str, float] = {}
+    error: Optional[str] = None
+    uptime_s: float = 0.0
+
 class RetrainingResult(BaseModel):
     training_time: float
     mse: float
     key_generation_time: Optional[float] = None
 
+class JobInfo(BaseModel):
+    id: str
+    kind: str
+    state: str
+    progress: float
+    metrics: Dict[str, float] = {}
+    submitted_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    duration_ms: Optional[float] = None
+    result: Optional[RetrainingResult] = None
+    error: Optional[str] = None
+
+class JobSchedulerStats(BaseModel):
+    workers: int
+    queued: int
+    running: int
+    succeeded: int
+    failed: int
+    cancelled: int
+
 # --- Аутентификация ---
 
 class RegisterRequest(BaseModel):
@@ -0,0 +1,58 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, List, Optional, Sized, Tuple
+
+
+class BatchProcessor:
+    """
+    Пул потоков для пакетных эндпоинтов: применяет функцию к каждому
+    элементу пакета и собирает (ok, результат | текст ошибки) по порядку,
+    так что ошибка одного элемента не роняет весь пакет.
+    В пул уходят непрерывные куски пакета (по одному на поток), а не
+    отдельные элементы: на мелких элементах (AES-GCM на сотню байт)
+    future на элемент стоит дороже самой операции.
+    """
+
+    def __init__(self, workers: Optional[int] = None):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch")
+        self.workers = self._executor._max_workers
+
+    @staticmethod
+    def _apply(fn: Callable[[Any], Any], chunk: List[Any]) -> List[Tuple[bool, Any]]:
+        results: List[Tuple[bool, Any]] = []
+        for item in chunk:
+            try:
+                results.append((True, fn(item)))
+            except Exception as e:
+                results.append((False, str(e)))
+        return results
+
+    def map(self, fn: Callable[[Any], Any], items: Iterable[Any]) -> List[Tuple[bool, Any]]:
+        items = list(items)
+        size = -(-len(items) // self.workers) or 1
+        futures = [
+            self._executor.submit(self._apply, fn, items[i:i + size])
+            for i in range(0, len(items), size)
+        ]
+        results: List[Tuple[bool, Any]] = []
+        for fut in futures:
+            results.extend(fut.result())
+        return results
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+
+class BatchTooLarge(ValueError):
+    """Пакет больше допустимого числа элементов (роуты отвечают 413)."""
+
+
+def check_batch_size(items: Sized, max_items: int) -> None:
+    """
+    Общая проверка пакетных эндпоинтов: пустой пакет — ValueError,
+    больше max_items элементов — BatchTooLarge; в HTTP 400 / 413
+    их переводят роуты.
+    """
+    if not items:
+        raise ValueError("Empty batch")
+    if len(items) > max_items:
+        raise BatchTooLarge(f"Batch larger than {max_items} items")
@@ -1,4 +1,5 @@
 from app.schemas import ConfigOptions
+from app.crypto.core.kdf import KDF_PROFILES, DEFAULT_KDF_PROFILE, DEFAULT_KDF_ITERATIONS
 
 
 class CryptoConfigurator:
@@ -6,6 +7,8 @@ class CryptoConfigurator:
         self._core = "python"
         self._entropy = "system"
         self._retrain = False
+        self._kdf_profile = DEFAULT_KDF_PROFILE
+        self._kdf_iterations = DEFAULT_KDF_ITERATIONS
 
     def set_core(self, core: str):
         self._core = core
@@ -19,9 +22,26 @@ class CryptoConfigurator:
         self._retrain = flag
         return self
 
+    @staticmethod
+    def validate_kdf(profile: str = None, iterations: int = None):
+        if profile is not None and profile not in KDF_PROFILES:
+            raise ValueError(f"Unknown KDF profile '{profile}'")
+        if iterations is not None and iterations < 1:
+            raise ValueError("KDF iterations must be positive")
+
+    def set_kdf(self, profile: str = None, iterations: int = None):
+        self.validate_kdf(profile, iterations)
+        if profile is not None:
+            self._kdf_profile = profile
+        if iterations is not None:
+            self._kdf_iterations = iterations
+        return self
+
     def build(self) -> ConfigOptions:
         return ConfigOptions(
             core_type=self._core,
             entropy_source=self._entropy,
             retrain_autoencoder=self._retrain,
+            kdf_profile=self._kdf_profile,
+            kdf_iterations=self._kdf_iterations,
         )
@@ -1,12 +1,17 @@
-from typing import Optional, Tuple, Dict, Any
+from typing import Optional, Tuple, Dict, Any, List
 from app.crypto.core.enhanced_rsa import (
     generate_enhanced_rsa_keys_from_image,
     rsa_encrypt_with_metadata,
 )
 from app.crypto.core.security import secure_decrypt
-from app.crypto.encryption import PythonEncryption
+from app.crypto.core.aead_stream import STREAM_CHUNK_SIZE, StreamSealer, StreamOpener
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from app.crypto.encryption import (
+    DEFAULT_AEAD, SYMMETRIC_ALGORITHMS, symmetric_encrypt, symmetric_decrypt,
+)
 from app.services.key_manager import KeyManager
 from app.services.ml_service import MLService
+from app.services.batch import BatchProcessor
 
 
 class CryptoService:
@@ -16,11 +21,46 @@ class CryptoService:
         key_manager: KeyManager,
         ml_service: MLService,
         encoder,
+        batch_processor: Optional[BatchProcessor] = None,
+        key_pool=None,
+        algorithm: str = DEFAULT_AEAD,
     ):
+        if algorithm not in SYMMETRIC_ALGORITHMS:
+            raise ValueError(f"Unknown symmetric algorithm '{algorithm}'")
         self.settings = settings
         self.km       = key_manager
         self.ml       = ml_service
         self.encoder  = encoder
+        self.batch    = batch_processor
+        self.key_pool = key_pool
+        self.algorithm = algorithm
+
+    def _map(self, fn, items) -> List[Tuple[bool, Any]]:
+        if self.batch is not None:
+            return self.batch.map(fn, items)
+        results = []
+        for item in items:
+            try:
+                results.append((True, fn(item)))
+            except Exception as e:
+                results.append((False, str(e)))
+        return results
+
+    def _issue_key(self, key_id: str, retrain: Optional[bool]) -> bytes:
+        do_retrain = retrain if retrain is not None else self.settings.retrain_autoencoder
+        if do_retrain:
+            # дообучение уходит в фон; этот ключ — от текущей версии модели
+            self.ml.schedule_retrain()
+
+        # 32-байтный ключ из пула; без пула — через MLService на месте
+        if self.key_pool is not None:
+            key_bytes = self.key_pool.acquire()
+        else:
+            key_bytes = self.ml.generate_symmetric_key()
+
+        # сохраняем его в KeyManager под данным key_id
+        self.km.store_key(key_id, key_bytes)
+        return key_bytes
 
     def encrypt(
         self,
@@ -34,26 +74,11 @@ class CryptoService:
             container = rsa_encrypt_with_metadata(pub, priv, sys_ent, ts, key_id, data)
             return container, {"algorithm": "rsa_chaos"}
 
-        # --- Симметричный путь (AES-256-CBC + ML-кодирование ключа) ---
-        do_retrain = retrain if retrain is not None else self.settings.retrain_autoencoder
-        if do_retrain:
-            self.ml.retrain_model()
-
-        # создаём 32-байтный ключ через MLService
-        key_bytes = self.ml.generate_symmetric_key()
-
-        # сохраняем его в KeyManager под данным key_id
-        if hasattr(self.km, "store_key"):
-            # если вы добавили store_key в KeyManager
-            self.km.store_key(key_id, key_bytes)
-        else:
-            # fallback — прямое обновление внутреннего словаря
-            self.km._store[key_id] = key_bytes
+        # --- Симметричный путь (AEAD/AES-256-CBC + ML-кодирование ключа) ---
+        key_bytes = self._issue_key(key_id, retrain)
 
-        # шифруем и возвращаем шифротекст + IV
-        cipher = PythonEncryption(key_bytes)
-        ciphertext, metadata = cipher.encrypt(data)
-        return ciphertext, metadata
+        # шифруем и возвращаем шифротекст + nonce (или IV для aes-cbc)
+        return symmetric_encrypt(key_id, key_bytes, data, self.algorithm)
 
     def decrypt(
         self,
@@ -67,7 +92,63 @@ class CryptoService:
             return plaintext, {}
 
         # --- Симметричный путь ---
+        # алгоритм определяется по metadata, старые CBC-шифротексты тоже читаются
         key_bytes = self.km.get_key(key_id)
-        cipher = PythonEncryption(key_bytes)
-        plaintext, _ = cipher.decrypt(payload, metadata)
-        return plaintext, {}
+        return symmetric_decrypt(key_id, key_bytes, payload, metadata), {}
+
+    def encrypt_batch(
+        self,
+        key_id: str,
+        items: List[bytes],
+        retrain: Optional[bool] = None
+    ) -> List[Tuple[bool, Any]]:
+        """
+        Пакетное шифрование под одним key_id: ключ выпускается
+        (и при необходимости дообучается модель) один раз на пакет,
+        каждый элемент получает свой nonce. Возвращает по элементу
+        (True, (ciphertext, metadata)) или (False, текст ошибки).
+        """
+        if self.settings.core_type == "rsa":
+            return self._map(lambda data: self.encrypt(key_id, data, retrain), items)
+
+        key_bytes = self._issue_key(key_id, retrain)
+        return self._map(lambda data: symmetric_encrypt(key_id, key_bytes, data, self.algorithm), items)
+
+    def decrypt_batch(
+        self,
+        key_id: str,
+        items: List[Tuple[bytes, Dict[str, Any]]]
+    ) -> List[Tuple[bool, Any]]:
+        """
+        Пакетная расшифровка (payload, metadata) под одним key_id:
+        ключ ищется в KeyManager один раз.
+        """
+        if self.settings.core_type == "rsa":
+            return self._map(lambda item: self.decrypt(key_id, *item)[0], items)
+
+        key_bytes = self.km.get_key(key_id)
+        return self._map(lambda item: symmetric_decrypt(key_id, key_bytes, *item), items)
+
+    def encrypt_stream(
+        self,
+        key_id: str,
+        retrain: Optional[bool] = None,
+        chunk_size: int = STREAM_CHUNK_SIZE,
+    ) -> StreamSealer:
+        """
+        Потоковое шифрование AES-256-GCM чанками (см. aead_stream):
+        выпускает ключ под key_id и возвращает StreamSealer, которому
+        вызывающий скармливает тело запроса по кускам.
+        """
+        if self.settings.core_type == "rsa":
+            raise ValueError("Streaming is supported only for the symmetric core")
+        return StreamSealer(AESGCM(self._issue_key(key_id, retrain)), chunk_size)
+
+    def decrypt_stream(self, key_id: str) -> StreamOpener:
+        """
+        StreamOpener для потока из encrypt_stream; параметры
+        (chunk_size, префикс nonce) читаются из заголовка потока.
+        """
+        if self.settings.core_type == "rsa":
+            raise ValueError("Streaming is supported only for the symmetric core")
+        return StreamOpener(AESGCM(self.km.get_key(key_id)))
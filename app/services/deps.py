@@ -1,44 +1,164 @@
+import logging
+
 from app.config import Config
 from app.services.configurator import CryptoConfigurator
 from app.services.key_manager import KeyManager
 from app.services.ml_service import MLService
 from app.services.crypto_service import CryptoService
+from app.services.key_pool import RSAKeyPool, SymmetricKeyPool
+from app.services.batch import BatchProcessor
+from app.services.rsa_key_manager import MEMORY_URL, RSAKeyManager
+from app.services.lifecycle import Lifecycle
+from app.services.jobs import JobScheduler
+from app.services.model_registry import DEFAULT_MODEL, ModelRegistry
+from app.services.inference import InferenceBatcher
 
-from app.crypto.autoencoder.retraining import build_autoencoder
-from app.crypto.chaos.dataset import generate_logistic_map_dataset
+from app.crypto.autoencoder.checkpoint import AutoencoderCheckpoint, load_or_train_autoencoder
+from app.crypto.core.prime_engine import configure_prime_engine
+from app.crypto.core.entropy import configure_entropy_sampler
+from app.crypto.core.kdf import configure_kdf
+from app.crypto.core.security import configure_timing_equalizer
 
-# 1) Предобучение autoencoder на логистических картах хаоса
-autoencoder, encoder = build_autoencoder((28, 28))
-chaos_data = generate_logistic_map_dataset(
-    num_images=1000,
-    image_size=28,
-    r=3.99,
-    fixed_initial=False
-)
-autoencoder.fit(chaos_data, chaos_data, epochs=3, batch_size=64, verbose=0)
+logger = logging.getLogger(__name__)
 
-# 2) Загружаем настройки из .env
+# 1) Загружаем настройки из .env
 cfg = Config()
 
-# 3) Строим «конструктор» и получаем готовые settings
+# 2) Строим «конструктор» и получаем готовые settings
 configurator = (
     CryptoConfigurator()
     .set_core(cfg.CORE_TYPE)
     .set_entropy_source(cfg.ENTROPY_SOURCE)
     .set_retrain(cfg.RETRAIN_AUTOENCODER)
+    .set_kdf(cfg.KDF_PROFILE, cfg.KDF_ITERATIONS)
 )
 settings = configurator.build()
 
-# 4) Инстанцируем вспомогательные сервисы
-key_manager = KeyManager(settings.entropy_source)
-ml_service = MLService(settings.retrain_autoencoder)
+# KDF-стадия генерации RSA-ключей по выбранному профилю
+kdf = configure_kdf(settings.kdf_profile, settings.kdf_iterations)
+
+# Общий пул процессов поиска простых для всех генераторов RSA-ключей
+prime_engine = configure_prime_engine(cfg.PRIME_WORKERS)
+
+# Фоновый сборщик системной энтропии (запускается в main.startup_event)
+entropy_sampler = configure_entropy_sampler(
+    interval=cfg.ENTROPY_SAMPLER_INTERVAL_MS / 1000,
+    depth=cfg.ENTROPY_SAMPLER_DEPTH,
+)
+
+# 3) Инстанцируем лёгкие вспомогательные сервисы (без TensorFlow)
+key_manager = KeyManager(
+    settings.entropy_source,
+    shards=cfg.KEY_MANAGER_SHARDS,
+    ttl=cfg.SYMMETRIC_KEY_TTL_SECONDS or None,
+    max_size=cfg.SYMMETRIC_KEY_MAX or None,
+)
+
+# Выравнивание времени RSA-расшифровки
+timing_equalizer = configure_timing_equalizer(
+    target=cfg.DECRYPT_TARGET_TIME_MS / 1000,
+    workers=cfg.DECRYPT_WORKERS or None,
+)
+
+# Постоянное хранилище RSA-ключей с LRU-кэшем. Без RSA_KEYSTORE_PASSPHRASE
+# закрытые ключи на диск не пишутся: хранилище живёт только в памяти
+if not cfg.RSA_KEYSTORE_PASSPHRASE:
+    logger.warning("RSA_KEYSTORE_PASSPHRASE is not set: RSA keys are kept in memory only")
+rsa_key_manager = RSAKeyManager(
+    cfg.RSA_KEYSTORE_URL if cfg.RSA_KEYSTORE_PASSPHRASE else MEMORY_URL,
+    cache_size=cfg.RSA_KEY_CACHE_SIZE,
+    passphrase=cfg.RSA_KEYSTORE_PASSPHRASE,
+)
+
+# Пул потоков пакетных эндпоинтов
+batch_processor = BatchProcessor(cfg.BATCH_WORKERS or None)
+
+# Очередь долгих задач (дообучение и бенчмарки /rsa/test/*)
+job_scheduler = JobScheduler(cfg.JOB_WORKERS, history=cfg.JOB_HISTORY)
+
+# Одна общая модель автоэнкодера на процесс: все потребители получают
+# ссылки из реестра. Веса берутся из кэша, обучение — только при промахе
+# или по MODEL_FORCE_RETRAIN
+model_registry = ModelRegistry()
+# Одиночные запросы к энкодеру склеиваются в микро-батчи
+inference_batcher = InferenceBatcher(
+    model_registry,
+    DEFAULT_MODEL,
+    max_batch=cfg.INFERENCE_MAX_BATCH,
+    max_wait_ms=cfg.INFERENCE_MAX_WAIT_MS,
+) if cfg.INFERENCE_BATCHING else None
+encoder = inference_batcher or model_registry.encoder_ref(DEFAULT_MODEL)
+model_checkpoint = AutoencoderCheckpoint(
+    epochs=5,
+    batch_size=64,
+    validation_split=0.1,
+    seed=cfg.MODEL_SEED,
+    cache_dir=cfg.MODEL_CHECKPOINT_DIR,
+)
+
+# 4) Тяжёлые сервисы создаются этапами прогрева (lifecycle), а не при импорте:
+# до готовности здесь None, обработчики читают их как deps.<имя> в момент вызова
+ml_service = None
+rsa_key_pool = None
+symmetric_key_pool = None
+crypto_service = None
+
+
+def load_models() -> None:
+    """
+    Этап "models": предобученный autoencoder на логистических картах
+    хаоса в реестре и MLService поверх него (здесь впервые
+    импортируется TensorFlow).
+    """
+    global ml_service
+    autoencoder, enc, hit = load_or_train_autoencoder(model_checkpoint, force=cfg.MODEL_FORCE_RETRAIN)
+    model_registry.publish(DEFAULT_MODEL, autoencoder, enc, source="checkpoint" if hit else "trained")
+    ml_service = MLService(settings.retrain_autoencoder, registry=model_registry, encoder=encoder)
+
+
+def build_services() -> None:
+    """
+    Этап "services": пулы ключей и CryptoService поверх загруженных моделей.
+    """
+    global rsa_key_pool, symmetric_key_pool, crypto_service
+    # Пул RSA-ключей (латенты пачки — одним encoder.predict)
+    rsa_key_pool = RSAKeyPool(
+        encoder,
+        low_watermark=cfg.RSA_POOL_LOW_WATERMARK,
+        high_watermark=cfg.RSA_POOL_HIGH_WATERMARK,
+        batch_size=cfg.RSA_POOL_BATCH,
+    )
+    # Пул симметричных ключей (пополняется пачками через один encoder.predict)
+    symmetric_key_pool = SymmetricKeyPool(
+        ml_service,
+        low_watermark=cfg.SYMMETRIC_POOL_LOW_WATERMARK,
+        high_watermark=cfg.SYMMETRIC_POOL_HIGH_WATERMARK,
+        batch_size=cfg.SYMMETRIC_POOL_BATCH,
+    )
+    # Инжектируем все в CryptoService
+    crypto_service = CryptoService(
+        settings=settings,
+        key_manager=key_manager,
+        ml_service=ml_service,
+        encoder=encoder,
+        batch_processor=batch_processor,
+        key_pool=symmetric_key_pool,
+        algorithm=cfg.SYMMETRIC_ALGORITHM,
+    )
+
+
+def start_key_pools() -> None:
+    rsa_key_pool.start()
+    symmetric_key_pool.start()
+
 
-# 5) Инжектируем все в CryptoService
-crypto_service = CryptoService(
-    settings=settings,
-    key_manager=key_manager,
-    ml_service=ml_service,
-    encoder=encoder
+# 5) Порядок прогрева; запускается в main.startup_event
+lifecycle = (
+    Lifecycle()
+    .add_stage("models", load_models)
+    .add_stage("services", build_services)
+    .add_stage("entropy_sampler", entropy_sampler.start)
+    .add_stage("key_pools", start_key_pools)
 )
 
 __all__ = [
@@ -46,8 +166,20 @@ __all__ = [
     "settings",
     "key_manager",
     "ml_service",
+    "model_checkpoint",
+    "model_registry",
+    "lifecycle",
     "crypto_service",
-    "autoencoder",
+    "rsa_key_pool",
+    "symmetric_key_pool",
+    "prime_engine",
+    "entropy_sampler",
+    "kdf",
+    "timing_equalizer",
+    "batch_processor",
+    "job_scheduler",
+    "rsa_key_manager",
     "encoder",
+    "inference_batcher",
     "configurator",
 ]
@@ -0,0 +1,198 @@
+import time
+import queue
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.services.model_registry import DEFAULT_MODEL, ModelRegistry
+
+logger = logging.getLogger(__name__)
+
+# forward(images) -> latents: скомпилированный прямой проход энкодера
+Forward = Callable[[np.ndarray], np.ndarray]
+# (изображения, результат, момент постановки в очередь)
+_Request = Tuple[np.ndarray, Future, float]
+
+
+def _compile_encoder(encoder) -> Forward:
+    # TensorFlow импортируется только при первой компиляции
+    from app.crypto.autoencoder.retraining import compile_encoder
+
+    return compile_encoder(encoder)
+
+
+def _bucket(size: int) -> int:
+    # верхняя граница степени двойки: 1, 2, 4, 8, ...
+    return 1 << (size - 1).bit_length()
+
+
+class InferenceBatcher:
+    """
+    Склейка одиночных запросов к энкодеру в микро-батчи.
+
+    predict() ставит изображения в очередь и ждёт результат; фоновый
+    поток собирает запросы, пока не наберётся max_batch изображений
+    или не пройдёт max_wait_ms с первого, и делает один прямой проход
+    (tf.function с фиксированной сигнатурой вместо Keras predict).
+    Запросы от max_batch изображений идут мимо очереди. Прямой проход
+    компилируется заново, когда в реестре появляется новая версия.
+    Интерфейс predict(x, verbose=0) тот же, что у Keras-энкодера.
+    """
+
+    def __init__(
+        self,
+        registry: ModelRegistry,
+        name: str = DEFAULT_MODEL,
+        max_batch: int = 64,
+        max_wait_ms: float = 2.0,
+        compile_fn: Callable[[Any], Forward] = _compile_encoder,
+    ):
+        if max_batch < 1:
+            raise ValueError("max_batch must be positive")
+        self.registry = registry
+        self.name = name
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._compile = compile_fn
+        self._compiled: Optional[Tuple[int, Forward]] = None
+        self._compile_lock = threading.Lock()
+
+        self._queue: "queue.Queue[Optional[_Request]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+        self.requests = 0
+        self.batches = 0
+        self.images = 0
+        self.bypassed = 0
+        # размер батча (степень двойки) -> [батчей, сумма forward, сумма задержек запросов, запросов]
+        self._latency: Dict[int, List[float]] = {}
+
+    @property
+    def version(self) -> int:
+        return self.registry.get(self.name).version
+
+    def _forward(self) -> Forward:
+        entry = self.registry.get(self.name)
+        with self._compile_lock:
+            if self._compiled is None or self._compiled[0] != entry.version:
+                self._compiled = (entry.version, self._compile(entry.encoder))
+            return self._compiled[1]
+
+    def _enqueue(self, x: np.ndarray) -> Future:
+        # поток и его очередь меняются в stop() под той же блокировкой,
+        # поэтому запрос не может встать в очередь за стоп-меткой
+        fut: Future = Future()
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._loop, args=(self._queue,), name="inference-batcher", daemon=True,
+                )
+                self._thread.start()
+            self._queue.put((x, fut, time.perf_counter()))
+        return fut
+
+    def predict(self, x, verbose: int = 0) -> np.ndarray:
+        x = np.asarray(x, dtype=np.float32)
+        if len(x) >= self.max_batch:
+            # уже полноценный батч — склеивать не с чем
+            with self._lock:
+                self.bypassed += 1
+            return self._forward()(x)
+        return self._enqueue(x).result()
+
+    def _loop(self, requests: "queue.Queue[Optional[_Request]]") -> None:
+        pending: Optional[_Request] = None
+        while True:
+            first = pending if pending is not None else requests.get()
+            pending = None
+            if first is None:
+                return
+            batch = [first]
+            size = len(first[0])
+            deadline = time.perf_counter() + self.max_wait
+            stop = False
+            while size < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    item = requests.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                if size + len(item[0]) > self.max_batch:
+                    # не помещается — открывает следующий батч
+                    pending = item
+                    break
+                batch.append(item)
+                size += len(item[0])
+            self._run_batch(batch)
+            if stop:
+                return
+
+    def _run_batch(self, batch: List[_Request]) -> None:
+        start = time.perf_counter()
+        try:
+            images = np.concatenate([x for x, _, _ in batch]) if len(batch) > 1 else batch[0][0]
+            latents = self._forward()(images)
+        except Exception as e:
+            logger.exception("Batched encoder forward pass failed")
+            for _, fut, _ in batch:
+                fut.set_exception(e)
+            return
+        done = time.perf_counter()
+
+        pos = 0
+        for x, fut, _ in batch:
+            fut.set_result(latents[pos:pos + len(x)])
+            pos += len(x)
+
+        with self._lock:
+            self.requests += len(batch)
+            self.batches += 1
+            self.images += len(images)
+            row = self._latency.setdefault(_bucket(len(images)), [0, 0.0, 0.0, 0])
+            row[0] += 1
+            row[1] += done - start
+            row[2] += sum(done - enqueued for _, _, enqueued in batch)
+            row[3] += len(batch)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            by_size = {
+                str(size): {
+                    "batches": int(batches),
+                    "avg_forward_ms": forward * 1000 / batches,
+                    "avg_latency_ms": latency * 1000 / requests,
+                }
+                for size, (batches, forward, latency, requests) in sorted(self._latency.items())
+            }
+            return {
+                "max_batch": self.max_batch,
+                "max_wait_ms": self.max_wait * 1000,
+                "requests": self.requests,
+                "batches": self.batches,
+                "bypassed": self.bypassed,
+                "avg_batch_size": self.images / self.batches if self.batches else 0.0,
+                "by_batch_size": by_size,
+            }
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Останавливает фоновый поток: запросы, уже стоящие в очереди,
+        обрабатываются до стоп-метки, новые predict() запускают
+        новый поток со своей очередью.
+        """
+        with self._lock:
+            thread, self._thread = self._thread, None
+            if thread is None:
+                return
+            requests, self._queue = self._queue, queue.Queue()
+            requests.put(None)
+        thread.join(timeout)
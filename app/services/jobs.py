@@ -0,0 +1,176 @@
+import time
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from app.crypto.core.key_generation import new_key_id
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class Job:
+    """
+    Фоновая задача планировщика. Функция задачи получает сам Job
+    первым аргументом: через update() она сообщает прогресс и метрики,
+    а через cancel_requested / check_cancelled() узнаёт об отмене.
+    """
+
+    def __init__(self, kind: str):
+        self.id = new_key_id()
+        self.kind = kind
+        self.state = QUEUED
+        self.progress = 0.0
+        self.metrics: Dict[str, float] = {}
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.future: Optional[Future] = None
+        self._cancel = threading.Event()
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self._cancel.is_set()
+
+    @property
+    def done(self) -> bool:
+        return self.state in FINISHED_STATES
+
+    def check_cancelled(self) -> None:
+        if self._cancel.is_set():
+            raise JobCancelled(f"Job '{self.id}' was cancelled")
+
+    def update(self, progress: Optional[float] = None, **metrics: float) -> None:
+        if progress is not None:
+            self.progress = min(1.0, max(0.0, progress))
+        self.metrics.update({k: float(v) for k, v in metrics.items()})
+
+    def info(self) -> Dict[str, Any]:
+        duration = None
+        if self.started_at is not None:
+            duration = ((self.finished_at or time.time()) - self.started_at) * 1000
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "state": self.state,
+            "progress": self.progress,
+            "metrics": dict(self.metrics),
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "duration_ms": duration,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class JobScheduler:
+    """
+    Очередь долгих задач (дообучение, бенчмарки) на отдельном пуле
+    из `workers` потоков. submit() сразу возвращает Job, статус
+    опрашивается по id. Отмена ждущей задачи снимает её с очереди,
+    запущенной — выставляет флаг, который задача проверяет сама
+    (для Keras — колбэк между батчами). Завершённые задачи хранятся,
+    пока их не больше history.
+    """
+
+    def __init__(self, workers: int = 1, history: int = 256):
+        if workers < 1:
+            raise ValueError("workers must be positive")
+        self.workers = workers
+        self.history = history
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="jobs")
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, fn: Callable[..., Optional[Dict[str, Any]]], *args: Any) -> Job:
+        job = Job(kind)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._trim()
+            job.future = self._executor.submit(self._run, job, fn, args)
+        return job
+
+    def _trim(self) -> None:
+        # вызывается под self._lock; активные задачи не вытесняются
+        excess = len(self._jobs) - self.history
+        for job_id in [j.id for j in self._jobs.values() if j.done][:max(0, excess)]:
+            del self._jobs[job_id]
+
+    def _run(self, job: Job, fn, args) -> None:
+        with self._lock:
+            if job.cancel_requested:
+                job.state = CANCELLED
+                job.finished_at = time.time()
+                return
+            job.state = RUNNING
+            job.started_at = time.time()
+        try:
+            result = fn(job, *args)
+            job.check_cancelled()
+        except JobCancelled:
+            state, result, error = CANCELLED, None, None
+        except Exception as e:
+            logger.exception("Job %s (%s) failed", job.id, job.kind)
+            state, result, error = FAILED, None, str(e)
+        else:
+            state, error = SUCCEEDED, None
+            job.update(1.0)
+        with self._lock:
+            job.state = state
+            job.result = result
+            job.error = error
+            job.finished_at = time.time()
+
+    def get(self, job_id: str) -> Job:
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            raise KeyError(f"Job '{job_id}' not found")
+        return job
+
+    def list(self) -> List[Job]:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Запрашивает отмену; False — задача уже завершилась.
+        """
+        job = self.get(job_id)
+        with self._lock:
+            if job.done:
+                return False
+            job._cancel.set()
+            if job.future is not None and job.future.cancel():
+                job.state = CANCELLED
+                job.finished_at = time.time()
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        counts = {state: 0 for state in (QUEUED, RUNNING) + FINISHED_STATES}
+        with self._lock:
+            for job in self._jobs.values():
+                counts[job.state] += 1
+        counts["workers"] = self.workers
+        return counts
+
+    def shutdown(self, wait: bool = True) -> None:
+        for job in self.list():
+            if not job.done:
+                self.cancel(job.id)
+        self._executor.shutdown(wait=wait)
@@ -1,54 +1,186 @@
-from typing import Dict, List
+import time
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
 from app.crypto.core.entropy import generate_symmetric_key
 from app.crypto.core.key_generation import new_key_id
 
+# (ключ, момент истечения или None)
+_Entry = Tuple[bytes, Optional[float]]
+
+
+class _Shard:
+    __slots__ = ("lock", "items", "hits", "misses", "evictions", "expirations")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.items: "OrderedDict[str, _Entry]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+
 class KeyManager:
     """
     In‐memory хранилище симметричных ключей.
     Ключи генерируются через указанный источник энтропии.
+
+    Хранилище разбито на шарды со своей блокировкой (lock striping),
+    поэтому конкурентные запросы к разным ключам не сериализуются.
+    Поддерживаются TTL на ключ (ttl=None — без срока) и ограничение
+    размера max_size с вытеснением давно не используемых ключей.
     """
 
-    def __init__(self, entropy_source: str):
+    def __init__(
+        self,
+        entropy_source: str,
+        shards: int = 16,
+        ttl: Optional[float] = None,
+        max_size: Optional[int] = None,
+    ):
+        if shards < 1:
+            raise ValueError("shards must be positive")
         self.entropy_source = entropy_source
-        self._store: Dict[str, bytes] = {}
+        self.ttl = ttl
+        self.max_size = max_size
+        self._shards = [_Shard() for _ in range(shards)]
+        # лимит делится между шардами поровну (с округлением вверх)
+        self._shard_limit = -(-max_size // shards) if max_size else None
+
+    def _shard(self, key_id: str) -> _Shard:
+        return self._shards[hash(key_id) % len(self._shards)]
+
+    def _expiry(self, ttl: Optional[float]) -> Optional[float]:
+        ttl = self.ttl if ttl is None else ttl
+        return time.monotonic() + ttl if ttl else None
+
+    def _put(self, shard: _Shard, key_id: str, key: bytes, expires: Optional[float]) -> None:
+        # вызывается под shard.lock
+        shard.items[key_id] = (key, expires)
+        shard.items.move_to_end(key_id)
+        if self._shard_limit is not None:
+            while len(shard.items) > self._shard_limit:
+                _, (_, old_expires) = shard.items.popitem(last=False)
+                if old_expires is not None and old_expires <= time.monotonic():
+                    shard.expirations += 1
+                else:
+                    shard.evictions += 1
+
+    def _lookup(self, shard: _Shard, key_id: str, now: float) -> Optional[bytes]:
+        # вызывается под shard.lock
+        entry = shard.items.get(key_id)
+        if entry is None:
+            shard.misses += 1
+            return None
+        key, expires = entry
+        if expires is not None and expires <= now:
+            del shard.items[key_id]
+            shard.expirations += 1
+            shard.misses += 1
+            return None
+        shard.items.move_to_end(key_id)
+        shard.hits += 1
+        return key
 
-    def create_key(self, length: int = 32) -> str:
+    def create_key(self, length: int = 32, ttl: Optional[float] = None) -> str:
         """
         Генерирует симметричный ключ длиной length байт
         и возвращает его UUID.
         """
         key = generate_symmetric_key(length, self.entropy_source)
         key_id = new_key_id()
-        self._store[key_id] = key
+        self.store_key(key_id, key, ttl)
         return key_id
 
-    def store_key(self, key_id: str, key: bytes) -> None:
+    def store_key(self, key_id: str, key: bytes, ttl: Optional[float] = None) -> None:
         """
         Сохраняет уже сгенерированный ключ под заданным key_id.
         Если ключ с таким key_id уже есть — перезаписывает.
         """
-        self._store[key_id] = key
+        shard = self._shard(key_id)
+        expires = self._expiry(ttl)
+        with shard.lock:
+            self._put(shard, key_id, key, expires)
+
+    def put_many(self, keys: Mapping[str, bytes], ttl: Optional[float] = None) -> None:
+        """
+        Сохраняет несколько ключей, беря блокировку каждого шарда один раз.
+        """
+        expires = self._expiry(ttl)
+        by_shard: Dict[int, List[Tuple[str, bytes]]] = {}
+        for key_id, key in keys.items():
+            by_shard.setdefault(hash(key_id) % len(self._shards), []).append((key_id, key))
+        for idx, items in by_shard.items():
+            shard = self._shards[idx]
+            with shard.lock:
+                for key_id, key in items:
+                    self._put(shard, key_id, key, expires)
 
     def get_key(self, key_id: str) -> bytes:
         """
         Возвращает raw‐ключ по его идентификатору.
-        Если ключ не найден — бросает KeyError.
+        Если ключ не найден или истёк — бросает KeyError.
         """
-        if key_id not in self._store:
+        shard = self._shard(key_id)
+        with shard.lock:
+            key = self._lookup(shard, key_id, time.monotonic())
+        if key is None:
             raise KeyError(f"Key '{key_id}' not found")
-        return self._store[key_id]
+        return key
+
+    def get_many(self, key_ids: Iterable[str]) -> Dict[str, bytes]:
+        """
+        Возвращает найденные ключи {key_id: key}; отсутствующие и
+        истёкшие в результат не попадают.
+        """
+        by_shard: Dict[int, List[str]] = {}
+        for key_id in key_ids:
+            by_shard.setdefault(hash(key_id) % len(self._shards), []).append(key_id)
+        now = time.monotonic()
+        found: Dict[str, bytes] = {}
+        for idx, ids in by_shard.items():
+            shard = self._shards[idx]
+            with shard.lock:
+                for key_id in ids:
+                    key = self._lookup(shard, key_id, now)
+                    if key is not None:
+                        found[key_id] = key
+        return found
 
     def delete_key(self, key_id: str) -> None:
         """
         Удаляет ключ по его идентификатору.
         Если ключ не найден — бросает KeyError.
         """
-        if key_id not in self._store:
-            raise KeyError(f"Key '{key_id}' not found")
-        del self._store[key_id]
+        shard = self._shard(key_id)
+        with shard.lock:
+            if key_id not in shard.items:
+                raise KeyError(f"Key '{key_id}' not found")
+            del shard.items[key_id]
 
     def list_keys(self) -> List[str]:
         """
-        Возвращает список всех сохранённых идентификаторов ключей.
+        Возвращает список всех сохранённых (неистёкших) идентификаторов ключей.
         """
-        return list(self._store.keys())
+        now = time.monotonic()
+        ids: List[str] = []
+        for shard in self._shards:
+            with shard.lock:
+                ids.extend(
+                    key_id for key_id, (_, expires) in shard.items.items()
+                    if expires is None or expires > now
+                )
+        return ids
+
+    def stats(self) -> Dict[str, int]:
+        totals = {"size": 0, "hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+        for shard in self._shards:
+            with shard.lock:
+                totals["size"] += len(shard.items)
+                totals["hits"] += shard.hits
+                totals["misses"] += shard.misses
+                totals["evictions"] += shard.evictions
+                totals["expirations"] += shard.expirations
+        totals["shards"] = len(self._shards)
+        return totals
@@ -0,0 +1,188 @@
+import abc
+import time
+import logging
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from app.crypto.core.enhanced_rsa import (
+    generate_enhanced_rsa_keys_from_image,
+    encode_latents,
+    derive_rsa_keys_from_latent,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class KeyPool(abc.ABC):
+    """
+    Ограниченный пул заранее сгенерированных ключей с фоновым пополнением.
+
+    Фоновый поток поддерживает уровень пула между low/high watermark:
+    как только после выдачи в пуле остаётся не больше low_watermark
+    элементов, он догенерирует их до high_watermark. Выдача — O(1)
+    (popleft из deque под блокировкой), каждый элемент отдаётся ровно
+    один раз. Если пул пуст, ключ генерируется синхронно (miss).
+    Пополнение идёт пачками до batch_size элементов (_produce_batch),
+    время каждой пачки учитывается в статистике.
+    """
+
+    def __init__(self, low_watermark: int, high_watermark: int, batch_size: int = 1):
+        if low_watermark < 0 or high_watermark <= low_watermark:
+            raise ValueError("Expected 0 <= low_watermark < high_watermark")
+        self.low_watermark = low_watermark
+        self.high_watermark = high_watermark
+        self.batch_size = max(1, batch_size)
+
+        self._items: Deque[Any] = deque()
+        self._lock = threading.Lock()
+        self._refill_needed = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.hits = 0
+        self.misses = 0
+        self.produced = 0
+        self.errors = 0
+        self.refills = 0
+        self.refill_time = 0.0
+        self.last_refill_ms = 0.0
+
+    @abc.abstractmethod
+    def _produce(self) -> Any:
+        """
+        Генерирует один элемент пула. Переопределяется в наследниках.
+        """
+
+    def _produce_batch(self, count: int) -> List[Any]:
+        """
+        Генерирует пачку элементов; наследники переопределяют, если
+        пачку можно построить дешевле, чем count одиночных вызовов.
+        """
+        return [self._produce() for _ in range(count)]
+
+    def start(self) -> None:
+        """
+        Запускает фоновое пополнение (повторный вызов ничего не делает).
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._refill_loop,
+            name=f"{type(self).__name__}-refill",
+            daemon=True,
+        )
+        self._thread.start()
+        self._refill_needed.set()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        self._refill_needed.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def acquire(self) -> Any:
+        """
+        Забирает элемент из пула; при пустом пуле генерирует его на месте.
+        Блокирует на всё время генерации: из async-кода вызывать
+        через run_in_threadpool.
+        """
+        with self._lock:
+            if self._items:
+                item = self._items.popleft()
+                self.hits += 1
+                found = True
+            else:
+                item = None
+                self.misses += 1
+                found = False
+            level = len(self._items)
+
+        if level <= self.low_watermark:
+            self._refill_needed.set()
+        if not found:
+            item = self._produce()
+        return item
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "size": len(self._items),
+                "low_watermark": self.low_watermark,
+                "high_watermark": self.high_watermark,
+                "hits": self.hits,
+                "misses": self.misses,
+                "produced": self.produced,
+                "errors": self.errors,
+                "batch_size": self.batch_size,
+                "refills": self.refills,
+                "last_refill_ms": self.last_refill_ms,
+                "avg_refill_ms": self.refill_time * 1000 / self.refills if self.refills else 0.0,
+            }
+
+    def _refill_loop(self) -> None:
+        while not self._stop.is_set():
+            self._refill_needed.wait()
+            self._refill_needed.clear()
+            while not self._stop.is_set() and len(self._items) < self.high_watermark:
+                count = min(self.batch_size, self.high_watermark - len(self._items))
+                start = time.perf_counter()
+                try:
+                    items = self._produce_batch(count)
+                except Exception:
+                    # Ошибку не пробрасываем: следующий acquire снова
+                    # разбудит поток, а запрос уйдёт в синхронный путь.
+                    self.errors += 1
+                    logger.exception("Key pool refill failed")
+                    break
+                elapsed = time.perf_counter() - start
+                with self._lock:
+                    self._items.extend(items)
+                    self.produced += len(items)
+                    self.refills += 1
+                    self.refill_time += elapsed
+                    self.last_refill_ms = elapsed * 1000
+
+
+class RSAKeyPool(KeyPool):
+    """
+    Пул Chaos-RSA ключей: элементы — кортежи
+    (private_key, public_key, entropy, timestamp), как у
+    generate_enhanced_rsa_keys_from_image.
+    """
+
+    def __init__(self, encoder, low_watermark: int, high_watermark: int,
+                 used_images=None, batch_size: int = 1):
+        super().__init__(low_watermark, high_watermark, batch_size)
+        self.encoder = encoder
+        self.used_images = used_images if used_images is not None else set()
+
+    def _produce(self):
+        return generate_enhanced_rsa_keys_from_image(self.encoder, self.used_images)
+
+    def _produce_batch(self, count: int):
+        # латенты всей пачки — одним encoder.predict
+        latents = encode_latents(self.encoder, count, self.used_images)
+        return [derive_rsa_keys_from_latent(latent) for latent in latents]
+
+
+class SymmetricKeyPool(KeyPool):
+    """
+    Пул 32-байтных AES-ключей из латентов автоэнкодера: пачка ключей
+    выводится одним векторизованным encoder.predict (MLService).
+    """
+
+    def __init__(self, ml_service, low_watermark: int, high_watermark: int, batch_size: int = 32):
+        super().__init__(low_watermark, high_watermark, batch_size)
+        self.ml = ml_service
+
+    def _produce(self) -> bytes:
+        return self.ml.generate_symmetric_key()
+
+    def _produce_batch(self, count: int) -> List[bytes]:
+        return self.ml.generate_symmetric_keys(count)
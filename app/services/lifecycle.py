@@ -0,0 +1,88 @@
+import time
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class Lifecycle:
+    """
+    Поэтапный прогрев сервиса в фоновом потоке.
+
+    Этапы (загрузка моделей, пулы ключей, сборщик энтропии и т.д.)
+    выполняются по порядку после старта процесса, так что порт
+    открывается сразу, а /health/ready сообщает, какой этап идёт.
+    Ошибка этапа останавливает прогрев: сервис остаётся live, но не ready.
+    """
+
+    def __init__(self):
+        self._stages: List[Tuple[str, Callable[[], Any]]] = []
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.state = "pending"
+        self.stage: Optional[str] = None
+        self.completed: List[str] = []
+        self.timings_ms: Dict[str, float] = {}
+        self.error: Optional[str] = None
+        self.started_at: Optional[float] = None
+
+    def add_stage(self, name: str, fn: Callable[[], Any]) -> "Lifecycle":
+        self._stages.append((name, fn))
+        return self
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._ready.wait(timeout)
+
+    def start(self) -> None:
+        """
+        Запускает прогрев (повторный вызов ничего не делает).
+        """
+        with self._lock:
+            if self._thread is not None:
+                return
+            self.state = "starting"
+            self.started_at = time.time()
+            self._thread = threading.Thread(target=self.run, name="lifecycle-warmup", daemon=True)
+        self._thread.start()
+
+    def run(self) -> None:
+        """
+        Выполняет этапы синхронно в текущем потоке.
+        """
+        for name, fn in self._stages:
+            with self._lock:
+                self.stage = name
+            start = time.perf_counter()
+            try:
+                fn()
+            except Exception as e:
+                logger.exception("Warm-up stage '%s' failed", name)
+                with self._lock:
+                    self.state = "failed"
+                    self.error = f"{name}: {e}"
+                return
+            with self._lock:
+                self.timings_ms[name] = (time.perf_counter() - start) * 1000
+                self.completed.append(name)
+        with self._lock:
+            self.state = "ready"
+            self.stage = None
+        self._ready.set()
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self.state,
+                "stage": self.stage,
+                "completed": list(self.completed),
+                "pending": [name for name, _ in self._stages if name not in self.completed and name != self.stage],
+                "timings_ms": dict(self.timings_ms),
+                "error": self.error,
+                "uptime_s": time.time() - self.started_at if self.started_at else 0.0,
+            }
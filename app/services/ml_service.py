@@ -1,49 +1,85 @@
 import hashlib
 import numpy as np
-from typing import Optional
+from typing import List, Optional
 
 from app.crypto.chaos.dataset import (
     generate_logistic_map_dataset,
 )
 from app.crypto.utils import generate_unique_random_images
-from app.crypto.autoencoder.retraining import build_autoencoder
+from app.crypto.autoencoder.checkpoint import AutoencoderCheckpoint, load_or_train_autoencoder
+from app.services.model_registry import DEFAULT_MODEL, ModelRegistry, ModelVersion
+from app.services.retrainer import BackgroundRetrainer
 
 
 class MLService:
     """
     Сервис ML-операций: предобучение/дообучение автоэнкодера
     и генерация 32-байтного ключа AES из латентного вектора.
+    Модель берётся из общего реестра (ModelRegistry) по имени;
+    дообучение идёт на теневой копии в фоне, новая версия публикуется
+    атомарно, а до этого запросы обслуживает прежняя.
     """
-    def __init__(self, retrain: bool = False, image_size: int = 28):
+    def __init__(
+        self,
+        retrain: bool = False,
+        image_size: int = 28,
+        checkpoint: Optional[AutoencoderCheckpoint] = None,
+        force_train: bool = False,
+        registry: Optional[ModelRegistry] = None,
+        model_name: str = DEFAULT_MODEL,
+        encoder=None,
+    ):
         self.retrain = retrain
         self.image_size = image_size
+        self.registry = registry if registry is not None else ModelRegistry()
+        self.model_name = model_name
 
-        # 1) Строим автоэнкодер и энкодер
-        self.autoencoder, self.encoder = build_autoencoder((image_size, image_size))
+        # Если модели ещё нет в реестре — строим автоэнкодер и энкодер;
+        # первичное обучение на хаотических картах — только если весов
+        # с такими параметрами нет в кэше
+        if model_name not in self.registry:
+            if checkpoint is None:
+                checkpoint = AutoencoderCheckpoint(
+                    image_size=image_size,
+                    epochs=5,
+                    batch_size=64,
+                    validation_split=0.1,
+                )
+            autoencoder, encoder, hit = load_or_train_autoencoder(
+                checkpoint, force=force_train, verbose=1,
+            )
+            self.registry.publish(model_name, autoencoder, encoder, source="checkpoint" if hit else "trained")
+        # encoder — любой объект с predict поверх реестра (ссылка или батчер)
+        self.encoder = encoder if encoder is not None else self.registry.encoder_ref(model_name)
+        self.retrainer = BackgroundRetrainer(self.retrain_model)
 
-        # 2) Первичное обучение на хаотических картах
-        initial_data = generate_logistic_map_dataset(
-            num_images=1000,
-            image_size=image_size,
-            r=3.99,
-            fixed_initial=False
-        )
-        self.autoencoder.fit(
-            initial_data,
-            initial_data,
-            epochs=5,
-            batch_size=64,
-            validation_split=0.1,
-            verbose=1
-        )
+    @property
+    def autoencoder(self):
+        return self.registry.get(self.model_name).autoencoder
+
+    def schedule_retrain(self) -> bool:
+        """
+        Ставит дообучение в фоновую очередь и сразу возвращается.
+        Если self.retrain=False, метод бездействует.
+        """
+        if not self.retrain:
+            return False
+        return self.retrainer.schedule()
 
-    def retrain_model(self, num_images: int = 500, epochs: int = 2) -> None:
+    def retrain_model(self, num_images: int = 500, epochs: int = 2) -> Optional[ModelVersion]:
         """
         Динамическое дообучение автоэнкодера на новых хаотических картах.
+        Обучается копия текущей версии; результат публикуется в реестр,
+        только если за время обучения версию никто не сменил.
+        Блокирует на всё время fit — из запросов вызывать schedule_retrain.
         Если self.retrain=False, метод бездействует.
         """
         if not self.retrain:
-            return
+            return None
+        from app.crypto.autoencoder.retraining import clone_autoencoder
+
+        current = self.registry.get(self.model_name)
+        autoencoder, encoder = clone_autoencoder(current.autoencoder)
 
         new_data = generate_logistic_map_dataset(
             num_images=num_images,
@@ -52,17 +88,21 @@ class MLService:
             fixed_initial=False
         )
         # Замораживаем нижние слои, чтобы fine-tune только верхние
-        for layer in self.autoencoder.layers[:-3]:
+        for layer in autoencoder.layers[:-3]:
             layer.trainable = False
 
-        self.autoencoder.compile(optimizer='adam', loss='mse')
-        self.autoencoder.fit(
+        autoencoder.compile(optimizer='adam', loss='mse')
+        autoencoder.fit(
             new_data,
             new_data,
             epochs=epochs,
             batch_size=32,
             verbose=1
         )
+        return self.registry.publish(
+            self.model_name, autoencoder, encoder,
+            source="retrained", expected_version=current.version,
+        )
 
     def generate_symmetric_key(self) -> bytes:
         """
@@ -71,10 +111,17 @@ class MLService:
         2) Прогоняем его через энкодер
         3) Хэшируем выходной латент вектор в 32-байтный ключ
         """
-        img = generate_unique_random_images(
-            num_images=1,
+        return self.generate_symmetric_keys(1)[0]
+
+    def generate_symmetric_keys(self, count: int) -> List[bytes]:
+        """
+        То же для пачки: `count` изображений → один encoder.predict
+        → sha256 каждого латента.
+        """
+        imgs = generate_unique_random_images(
+            num_images=count,
             shape=(self.image_size, self.image_size, 1)
-        )[0]
-        latent = self.encoder.predict(img[np.newaxis, ...], verbose=0)[0]
+        )
+        latents = self.encoder.predict(imgs, verbose=0)
         # sha256(latent_bytes) → 32 байта
-        return hashlib.sha256(latent.tobytes()).digest()
+        return [hashlib.sha256(latent.tobytes()).digest() for latent in latents]
@@ -0,0 +1,141 @@
+import time
+import threading
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+# Имя общей модели автоэнкодера, которой пользуются все сервисы
+DEFAULT_MODEL = "chaos"
+
+
+def _itemsize(dtype) -> int:
+    # tf.DType хранит размер в .size, у Keras 3 dtype — строка
+    size = getattr(dtype, "size", None)
+    return size if isinstance(size, int) else np.dtype(dtype).itemsize
+
+
+def _variables_footprint(variables) -> Dict[str, int]:
+    params, nbytes = 0, 0
+    for var in variables:
+        count = int(np.prod(var.shape))
+        params += count
+        nbytes += count * _itemsize(var.dtype)
+    return {"params": params, "bytes": nbytes}
+
+
+def model_footprint(autoencoder) -> Dict[str, int]:
+    """
+    Память модели: веса автоэнкодера (энкодер — его подграф, веса общие)
+    и переменные оптимизатора, если он уже создал слоты.
+    """
+    weights = _variables_footprint(autoencoder.weights)
+    optimizer = getattr(autoencoder, "optimizer", None)
+    opt_vars = getattr(optimizer, "variables", []) if optimizer is not None else []
+    if callable(opt_vars):
+        opt_vars = opt_vars()
+    return {
+        "params": weights["params"],
+        "weight_bytes": weights["bytes"],
+        "optimizer_bytes": _variables_footprint(opt_vars)["bytes"],
+    }
+
+
+class ModelVersion:
+    """
+    Неизменяемая запись реестра: пара autoencoder/encoder одной версии.
+    """
+
+    __slots__ = ("name", "version", "autoencoder", "encoder", "source", "created_at")
+
+    def __init__(self, name: str, version: int, autoencoder, encoder, source: str):
+        self.name = name
+        self.version = version
+        self.autoencoder = autoencoder
+        self.encoder = encoder
+        self.source = source
+        self.created_at = time.time()
+
+
+class EncoderRef:
+    """
+    Ссылка на текущую версию энкодера с интерфейсом encoder.predict.
+    Потребители (пулы ключей, MLService, CryptoService) держат ссылку,
+    а не саму модель, поэтому подмена версии в реестре видна им сразу.
+    """
+
+    def __init__(self, registry: "ModelRegistry", name: str):
+        self._registry = registry
+        self.name = name
+
+    @property
+    def version(self) -> int:
+        return self._registry.get(self.name).version
+
+    def predict(self, x, verbose: int = 0):
+        return self._registry.get(self.name).encoder.predict(x, verbose=verbose)
+
+
+class ModelRegistry:
+    """
+    Реестр именованных версионированных моделей автоэнкодера.
+
+    Одна модель на имя в памяти процесса; publish атомарно заменяет
+    текущую версию (замена ссылки под блокировкой), так что запросы,
+    уже получившие ModelVersion, доработают на старой версии.
+    """
+
+    def __init__(self):
+        self._models: Dict[str, ModelVersion] = {}
+        self._lock = threading.Lock()
+
+    def __contains__(self, name: str) -> bool:
+        with self._lock:
+            return name in self._models
+
+    def publish(
+        self,
+        name: str,
+        autoencoder,
+        encoder,
+        source: str = "manual",
+        expected_version: Optional[int] = None,
+    ) -> ModelVersion:
+        """
+        Публикует новую версию модели. expected_version — проверка
+        «сравнить и заменить»: если текущая версия уже другая, бросает
+        RuntimeError и ничего не меняет.
+        """
+        with self._lock:
+            current = self._models.get(name)
+            current_version = current.version if current is not None else 0
+            if expected_version is not None and expected_version != current_version:
+                raise RuntimeError(
+                    f"Model '{name}' is at version {current_version}, expected {expected_version}"
+                )
+            entry = ModelVersion(name, current_version + 1, autoencoder, encoder, source)
+            self._models[name] = entry
+            return entry
+
+    def get(self, name: str = DEFAULT_MODEL) -> ModelVersion:
+        with self._lock:
+            entry = self._models.get(name)
+        if entry is None:
+            raise KeyError(f"Model '{name}' is not loaded")
+        return entry
+
+    def encoder_ref(self, name: str = DEFAULT_MODEL) -> EncoderRef:
+        return EncoderRef(self, name)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            entries = list(self._models.values())
+        return [
+            dict(
+                name=entry.name,
+                version=entry.version,
+                source=entry.source,
+                created_at=entry.created_at,
+                **model_footprint(entry.autoencoder),
+            )
+            for entry in entries
+        ]
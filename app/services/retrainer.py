@@ -0,0 +1,98 @@
+import time
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundRetrainer:
+    """
+    Дообучение модели вне пути запроса.
+
+    schedule() только ставит флаг и сразу возвращается; работу делает
+    фоновый поток, который живёт, пока есть заявки. Заявки, пришедшие
+    во время дообучения, склеиваются в одно следующее дообучение
+    (на уже обновлённой версии), так что поток запросов с
+    retrain_autoencoder=True не выстраивает очередь из fit-ов.
+    """
+
+    def __init__(self, fn: Callable[[], Any], name: str = "model-retrain"):
+        self._fn = fn
+        self._name = name
+        self._lock = threading.Lock()
+        self._pending = False
+        self._thread: Optional[threading.Thread] = None
+
+        self.scheduled = 0
+        self.coalesced = 0
+        self.completed = 0
+        self.failed = 0
+        self.running = False
+        self.last_ms = 0.0
+        self.last_error: Optional[str] = None
+
+    def schedule(self) -> bool:
+        """
+        Ставит дообучение в очередь; False — заявка уже ждёт и эта
+        склеена с ней.
+        """
+        with self._lock:
+            if self._pending:
+                self.coalesced += 1
+                return False
+            self._pending = True
+            self.scheduled += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+                self._thread.start()
+        return True
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Ждёт, пока очередь опустеет; False — не дождались за timeout.
+        """
+        with self._lock:
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+            return not thread.is_alive()
+        return True
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                if not self._pending:
+                    self._thread = None
+                    return
+                self._pending = False
+                self.running = True
+            start = time.perf_counter()
+            try:
+                self._fn()
+            except Exception as e:
+                # старая версия модели продолжает обслуживать запросы
+                logger.exception("Background retrain failed")
+                with self._lock:
+                    self.failed += 1
+                    self.last_error = str(e)
+            else:
+                with self._lock:
+                    self.completed += 1
+            finally:
+                with self._lock:
+                    self.running = False
+                    self.last_ms = (time.perf_counter() - start) * 1000
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "pending": self._pending,
+                "running": self.running,
+                "scheduled": self.scheduled,
+                "coalesced": self.coalesced,
+                "completed": self.completed,
+                "failed": self.failed,
+                "last_ms": self.last_ms,
+                "last_error": self.last_error,
+            }
@@ -1,17 +1,173 @@
+import time
+import threading
+from contextlib import nullcontext
+from collections import OrderedDict
 from uuid import uuid4
-from typing import Tuple
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from cryptography.hazmat.primitives import serialization
 from cryptography.hazmat.primitives.asymmetric import rsa
 
+from app.models import RSAKeyRecord
+
+RSAKeyEntry = Tuple[rsa.RSAPrivateKey, rsa.RSAPublicKey, bytes, bytes]
+
+# Хранилище в памяти процесса: ключи теряются при перезапуске
+MEMORY_URL = "sqlite://"
+
+
 class RSAKeyManager:
-    def __init__(self):
-        self._store: dict[str, Tuple[rsa.RSAPrivateKey, rsa.RSAPublicKey, bytes, bytes]] = {}
+    """
+    Хранилище Chaos-RSA ключей: SQLite (или другой URL SQLAlchemy)
+    как постоянное хранилище плюс LRU-кэш десериализованных ключей.
+
+    Горячие ключи отдаются из кэша за O(1); вытесненные лениво
+    подгружаются из базы при следующем обращении. Публичные PEM
+    кэшируются отдельно, чтобы не сериализовать ключ повторно.
+
+    Закрытые ключи на диске всегда зашифрованы паролем passphrase;
+    без пароля допускается только хранилище в памяти (MEMORY_URL).
+    """
+
+    def __init__(
+        self,
+        url: str = MEMORY_URL,
+        cache_size: int = 1024,
+        passphrase: Optional[str] = None,
+    ):
+        if cache_size < 1:
+            raise ValueError("cache_size must be positive")
+        if not passphrase and url != MEMORY_URL:
+            raise ValueError("A passphrase is required to persist RSA private keys")
+        if url == MEMORY_URL:
+            # одно соединение на все потоки, иначе у каждого своя пустая база;
+            # транзакции на общем соединении перемешиваются, поэтому сессии —
+            # строго по одной
+            self._engine = create_engine(
+                url, connect_args={"check_same_thread": False}, poolclass=StaticPool,
+            )
+            self._db_lock = threading.Lock()
+        else:
+            connect_args = {"check_same_thread": False} if url.startswith("sqlite") else {}
+            self._engine = create_engine(url, connect_args=connect_args)
+            self._db_lock = nullcontext()
+        RSAKeyRecord.metadata.create_all(bind=self._engine, tables=[RSAKeyRecord.__table__])
+        self._session = sessionmaker(autocommit=False, autoflush=False, bind=self._engine)
+        self._passphrase = passphrase.encode("utf-8") if passphrase else None
+
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, RSAKeyEntry]" = OrderedDict()
+        self._public_pem: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _encryption(self):
+        if self._passphrase:
+            return serialization.BestAvailableEncryption(self._passphrase)
+        return serialization.NoEncryption()
+
+    def _remember_pem(self, key_id: str, public_pem: bytes) -> None:
+        # вызывается под self._lock
+        self._public_pem[key_id] = public_pem
+        self._public_pem.move_to_end(key_id)
+        # PEM в разы меньше объекта ключа — держим их вчетверо больше
+        while len(self._public_pem) > 4 * self.cache_size:
+            self._public_pem.popitem(last=False)
+
+    def _remember(self, key_id: str, entry: RSAKeyEntry, public_pem: bytes) -> None:
+        with self._lock:
+            self._cache[key_id] = entry
+            self._cache.move_to_end(key_id)
+            self._remember_pem(key_id, public_pem)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+                self.evictions += 1
 
     def create(self, priv, pub, entropy, ts) -> str:
         key_id = str(uuid4())
-        self._store[key_id] = (priv, pub, entropy, ts)
+        public_pem = pub.public_bytes(
+            serialization.Encoding.PEM,
+            serialization.PublicFormat.SubjectPublicKeyInfo,
+        )
+        record = RSAKeyRecord(
+            key_id=key_id,
+            private_pem=priv.private_bytes(
+                serialization.Encoding.PEM,
+                serialization.PrivateFormat.PKCS8,
+                self._encryption(),
+            ),
+            public_pem=public_pem,
+            entropy=entropy,
+            timestamp=ts,
+            created_at=time.time(),
+        )
+        with self._db_lock, self._session() as db:
+            db.add(record)
+            db.commit()
+        self._remember(key_id, (priv, pub, entropy, ts), public_pem)
         return key_id
 
-    def get(self, key_id):
-        if key_id not in self._store:
+    def _load(self, key_id: str) -> Optional[RSAKeyRecord]:
+        with self._db_lock, self._session() as db:
+            record = db.get(RSAKeyRecord, key_id)
+            if record is not None:
+                db.expunge(record)
+            return record
+
+    def cached(self, key_id) -> Optional[RSAKeyEntry]:
+        """
+        Ключ из LRU-кэша или None, без обращения к базе: из event loop
+        можно звать напрямую, а промах отдавать get() в пул потоков.
+        """
+        with self._lock:
+            entry = self._cache.get(key_id)
+            if entry is not None:
+                self._cache.move_to_end(key_id)
+                self.hits += 1
+            return entry
+
+    def get(self, key_id) -> RSAKeyEntry:
+        entry = self.cached(key_id)
+        if entry is not None:
+            return entry
+        with self._lock:
+            self.misses += 1
+
+        record = self._load(key_id)
+        if record is None:
+            raise KeyError(f"RSA key_id `{key_id}` not found")
+        priv = serialization.load_pem_private_key(record.private_pem, password=self._passphrase)
+        entry = (priv, priv.public_key(), record.entropy, record.timestamp)
+        self._remember(key_id, entry, record.public_pem)
+        return entry
+
+    def public_pem(self, key_id: str) -> bytes:
+        """
+        Публичный ключ в PEM (SubjectPublicKeyInfo) без повторной сериализации.
+        """
+        with self._lock:
+            pem = self._public_pem.get(key_id)
+            if pem is not None:
+                self._public_pem.move_to_end(key_id)
+                return pem
+        record = self._load(key_id)
+        if record is None:
             raise KeyError(f"RSA key_id `{key_id}` not found")
-        return self._store[key_id]
+        with self._lock:
+            self._remember_pem(key_id, record.public_pem)
+        return record.public_pem
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "cached": len(self._cache),
+                "cache_size": self.cache_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
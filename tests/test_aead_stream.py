@@ -0,0 +1,67 @@
+import os
+import random
+
+import pytest
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+from app.crypto.core.aead_stream import (
+    STREAM_HEADER_LEN, TAG_LEN, StreamSealer, StreamOpener,
+)
+
+CHUNK = 256
+
+
+def _pieces(data, rnd):
+    pos = 0
+    while pos < len(data):
+        step = rnd.randint(1, 3 * CHUNK)
+        yield data[pos:pos + step]
+        pos += step
+
+
+def _seal(key, data, rnd):
+    sealer = StreamSealer(AESGCM(key), CHUNK)
+    return b"".join(sealer.update(p) for p in _pieces(data, rnd)) + sealer.finalize()
+
+
+def _open(key, blob, rnd):
+    opener = StreamOpener(AESGCM(key))
+    return b"".join(opener.update(p) for p in _pieces(blob, rnd)) + opener.finalize()
+
+
+@pytest.mark.parametrize("size", [0, 1, CHUNK - 1, CHUNK, CHUNK + 1, 2 * CHUNK, 10 * CHUNK + 17])
+def test_stream_roundtrip(size):
+    rnd = random.Random(size)
+    key = AESGCM.generate_key(256)
+    data = os.urandom(size)
+    blob = _seal(key, data, rnd)
+    # заголовок + (size // CHUNK + 1) кадров, последний короче chunk_size
+    assert len(blob) == STREAM_HEADER_LEN + size + (size // CHUNK + 1) * TAG_LEN
+    assert _open(key, blob, rnd) == data
+
+
+def test_stream_detects_truncation_and_tampering():
+    rnd = random.Random(0)
+    key = AESGCM.generate_key(256)
+    blob = _seal(key, os.urandom(3 * CHUNK), rnd)
+    frame = CHUNK + TAG_LEN
+
+    # отрезан последний кадр: полный кадр не может быть последним
+    with pytest.raises(ValueError):
+        _open(key, blob[:STREAM_HEADER_LEN + 3 * frame], rnd)
+    with pytest.raises(InvalidTag):
+        _open(key, blob[:STREAM_HEADER_LEN + 3 * frame - 1], rnd)
+    with pytest.raises(ValueError):
+        _open(key, blob[:STREAM_HEADER_LEN + 2], rnd)
+
+    tampered = bytearray(blob)
+    tampered[STREAM_HEADER_LEN + 5] ^= 1
+    with pytest.raises(InvalidTag):
+        _open(key, bytes(tampered), rnd)
+
+    # chunk_size в заголовке входит в AAD
+    tampered = bytearray(blob)
+    tampered[8] ^= 0x01
+    with pytest.raises(InvalidTag):
+        _open(key, bytes(tampered), rnd)
@@ -0,0 +1,27 @@
+import numpy as np
+
+from app.crypto.chaos.dataset import generate_logistic_map_dataset
+from app.crypto.autoencoder.checkpoint import AutoencoderCheckpoint, load_or_train_autoencoder
+
+
+def test_dataset_seed_is_reproducible():
+    a = generate_logistic_map_dataset(4, image_size=8, fixed_initial=False, seed=7)
+    b = generate_logistic_map_dataset(4, image_size=8, fixed_initial=False, seed=7)
+    c = generate_logistic_map_dataset(4, image_size=8, fixed_initial=False, seed=8)
+    assert np.array_equal(a, b)
+    assert not np.array_equal(a, c)
+
+
+def test_checkpoint_hit_restores_weights(tmp_path):
+    ckpt = AutoencoderCheckpoint(num_images=64, epochs=1, batch_size=32, seed=1, cache_dir=str(tmp_path))
+    trained, encoder, hit = load_or_train_autoencoder(ckpt)
+    assert not hit
+
+    loaded, loaded_encoder, hit = load_or_train_autoencoder(ckpt)
+    assert hit
+    x = generate_logistic_map_dataset(2, fixed_initial=False, seed=3)
+    assert np.allclose(encoder.predict(x, verbose=0), loaded_encoder.predict(x, verbose=0))
+
+    # другие параметры датасета — другой файл кэша
+    other = AutoencoderCheckpoint(num_images=32, epochs=1, batch_size=32, seed=1, cache_dir=str(tmp_path))
+    assert other.path(loaded) != ckpt.path(loaded)
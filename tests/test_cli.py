@@ -0,0 +1,100 @@
+import os
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from app.cli import main
+from app.crypto.core.file_container import FILE_SUFFIX
+
+
+@pytest.fixture(scope="module")
+def pems(tmp_path_factory):
+    d = tmp_path_factory.mktemp("keys")
+    priv = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    (d / "priv.pem").write_bytes(priv.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ))
+    (d / "pub.pem").write_bytes(priv.public_key().public_bytes(
+        serialization.Encoding.PEM,
+        serialization.PublicFormat.SubjectPublicKeyInfo,
+    ))
+    return str(d / "pub.pem"), str(d / "priv.pem")
+
+
+@pytest.mark.parametrize("workers", ["1", "2"])
+def test_cli_directory_roundtrip(tmp_path, pems, workers):
+    pub, priv = pems
+    src = tmp_path / "src"
+    (src / "nested").mkdir(parents=True)
+    files = {
+        "empty.bin": b"",
+        "small.txt": b"hello",
+        "nested/big.bin": os.urandom(300 * 1024 + 7),
+    }
+    for name, data in files.items():
+        (src / name).write_bytes(data)
+
+    enc, dec = tmp_path / "enc", tmp_path / "dec"
+    assert main(["encrypt", "--public-key", pub, "-o", str(enc), "-j", workers,
+                 "--chunk-size", "4096", str(src)]) == 0
+    assert (enc / ("nested/big.bin" + FILE_SUFFIX)).exists()
+    assert main(["decrypt", "--private-key", priv, "-o", str(dec), "-j", workers, str(enc)]) == 0
+    for name, data in files.items():
+        assert (dec / name).read_bytes() == data
+
+
+def test_cli_rejects_tampered_file(tmp_path, pems):
+    pub, priv = pems
+    src = tmp_path / "data.bin"
+    src.write_bytes(os.urandom(10000))
+    assert main(["encrypt", "--public-key", pub, "-o", str(tmp_path / "enc"), "-j", "1", str(src)]) == 0
+
+    target = tmp_path / "enc" / ("data.bin" + FILE_SUFFIX)
+    blob = bytearray(target.read_bytes())
+    blob[-100] ^= 1
+    target.write_bytes(bytes(blob))
+    assert main(["decrypt", "--private-key", priv, "-o", str(tmp_path / "dec"), "-j", "1", str(target)]) == 1
+    # частично расшифрованный файл не остаётся
+    assert not os.listdir(tmp_path / "dec")
+
+
+def test_cli_key_id_without_jwt_secret(tmp_path, monkeypatch):
+    from datetime import datetime
+    from app.services.rsa_key_manager import RSAKeyManager
+
+    monkeypatch.delenv("JWT_SECRET_KEY", raising=False)
+    monkeypatch.setenv("RSA_KEYSTORE_PASSPHRASE", "secret")
+    url = f"sqlite:///{tmp_path / 'keys.db'}"
+    priv = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    key_id = RSAKeyManager(url, passphrase="secret").create(
+        priv, priv.public_key(), os.urandom(32), datetime.utcnow().isoformat().encode("utf-8"),
+    )
+
+    src = tmp_path / "src"
+    src.mkdir()
+    for i in range(3):
+        (src / f"f{i}.bin").write_bytes(os.urandom(5000 + i))
+    enc, dec = tmp_path / "enc", tmp_path / "dec"
+    assert main(["encrypt", "--key-id", key_id, "--keystore", url, "-o", str(enc), str(src)]) == 0
+    assert main(["decrypt", "--key-id", key_id, "--keystore", url, "-o", str(dec), "-j", "2", str(enc)]) == 0
+    for i in range(3):
+        assert (dec / f"f{i}.bin").read_bytes() == (src / f"f{i}.bin").read_bytes()
+
+    monkeypatch.delenv("RSA_KEYSTORE_PASSPHRASE")
+    with pytest.raises(SystemExit):
+        main(["decrypt", "--key-id", key_id, "--keystore", url, "-o", str(dec), str(enc)])
+
+
+def test_cli_wrong_passphrase_fails_once(tmp_path):
+    priv = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pem = tmp_path / "priv.pem"
+    pem.write_bytes(priv.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.BestAvailableEncryption(b"right"),
+    ))
+    with pytest.raises(SystemExit):
+        main(["decrypt", "--private-key", str(pem), "--passphrase", "wrong", "-o", str(tmp_path), str(pem)])
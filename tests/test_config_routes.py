@@ -0,0 +1,44 @@
+import pytest
+from fastapi import FastAPI
+from starlette.testclient import TestClient
+
+from app.api.routes import config as config_routes
+from app.api.routes.auth import get_current_user
+from app.crypto.core.kdf import DEFAULT_KDF_ITERATIONS, DEFAULT_KDF_PROFILE
+from app.services import deps
+from app.services.configurator import CryptoConfigurator
+
+
+class FakeML:
+    def __init__(self):
+        self.retrain = False
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(config_routes, "configurator", CryptoConfigurator())
+    for name in ("settings", "kdf", "key_manager", "crypto_service"):
+        monkeypatch.setattr(deps, name, getattr(deps, name))
+    monkeypatch.setattr(deps, "ml_service", FakeML())
+    app = FastAPI()
+    app.include_router(config_routes.router, prefix="/config")
+    app.dependency_overrides[get_current_user] = lambda: "test"
+    return TestClient(app)
+
+
+def test_invalid_kdf_leaves_config_untouched(client):
+    before = config_routes.configurator.build()
+    resp = client.post("/config/", json={"core_type": "cpp", "retrain_autoencoder": True, "kdf_profile": "nope"})
+    assert resp.status_code == 400
+    assert config_routes.configurator.build() == before
+    assert deps.ml_service.retrain is False
+
+
+def test_retrain_toggles_existing_ml_service(client):
+    ml = deps.ml_service
+    resp = client.post("/config/", json={"retrain_autoencoder": True, "kdf_profile": DEFAULT_KDF_PROFILE,
+                                         "kdf_iterations": DEFAULT_KDF_ITERATIONS})
+    assert resp.status_code == 200
+    assert resp.json()["retrain_autoencoder"] is True
+    assert deps.ml_service is ml and ml.retrain is True
+    assert deps.crypto_service.ml is ml
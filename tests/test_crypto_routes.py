@@ -0,0 +1,90 @@
+import os
+
+import pytest
+from fastapi import FastAPI
+from starlette.testclient import TestClient
+
+from app.api.routes import crypto as crypto_routes
+from app.api.routes.auth import get_current_user
+from app.schemas import ConfigOptions
+from app.services import deps
+from app.services.batch import BatchProcessor
+from app.services.crypto_service import CryptoService
+from app.services.key_manager import KeyManager
+
+
+class FixedKeyML:
+    # вместо автоэнкодера — случайный ключ
+    def retrain_model(self):
+        pass
+
+    def generate_symmetric_key(self):
+        return os.urandom(32)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    settings = ConfigOptions(core_type="python", entropy_source="system", retrain_autoencoder=False)
+    batch = BatchProcessor(2)
+    service = CryptoService(settings, KeyManager("system"), FixedKeyML(), encoder=None, batch_processor=batch)
+    monkeypatch.setattr(deps, "crypto_service", service)
+    app = FastAPI()
+    app.include_router(crypto_routes.router, prefix="/crypto")
+    app.dependency_overrides[get_current_user] = lambda: "test"
+    yield TestClient(app)
+    batch.shutdown()
+
+
+def test_decrypt_batch_reports_invalid_base64(client):
+    enc = client.post("/crypto/encrypt/batch", json={"key_id": "k", "items": ["a", "b"]}).json()["results"]
+    items = [
+        {"ciphertext": enc[0]["result"], "metadata": enc[0]["metadata"]},
+        {"ciphertext": "not base64!", "metadata": enc[1]["metadata"]},
+        {"ciphertext": enc[1]["result"], "metadata": enc[1]["metadata"]},
+    ]
+    resp = client.post("/crypto/decrypt/batch", json={"key_id": "k", "items": items})
+    assert resp.status_code == 200
+    results = resp.json()["results"]
+    assert [r["index"] for r in results] == [0, 1, 2]
+    assert (results[0]["ok"], results[0]["result"]) == (True, "a")
+    assert (results[1]["ok"], results[1]["error"]) == (False, "invalid base64")
+    assert (results[2]["ok"], results[2]["result"]) == (True, "b")
+
+
+def test_batch_size_limits(client):
+    assert client.post("/crypto/encrypt/batch", json={"key_id": "k", "items": []}).status_code == 400
+    items = ["x"] * (deps.cfg.BATCH_MAX_ITEMS + 1)
+    assert client.post("/crypto/encrypt/batch", json={"key_id": "k", "items": items}).status_code == 413
+
+
+def test_raw_roundtrip(client):
+    data = os.urandom(10_000)
+    enc = client.post("/crypto/encrypt/raw", content=data, headers={"X-Key-Id": "raw"})
+    assert enc.status_code == 200
+    assert enc.headers["content-type"] == "application/octet-stream"
+    metadata = enc.headers[crypto_routes.METADATA_HEADER]
+
+    dec = client.post(
+        "/crypto/decrypt/raw",
+        content=enc.content,
+        headers={"X-Key-Id": "raw", crypto_routes.METADATA_HEADER: metadata},
+    )
+    assert dec.status_code == 200
+    assert dec.content == data
+
+
+def test_raw_decrypt_errors(client):
+    enc = client.post("/crypto/encrypt/raw", content=b"secret", headers={"X-Key-Id": "raw"})
+    metadata = enc.headers[crypto_routes.METADATA_HEADER]
+
+    resp = client.post("/crypto/decrypt/raw", content=enc.content,
+                       headers={"X-Key-Id": "missing", crypto_routes.METADATA_HEADER: metadata})
+    assert resp.status_code == 404
+    for bad in ("not json", "[1]"):
+        resp = client.post("/crypto/decrypt/raw", content=enc.content,
+                           headers={"X-Key-Id": "raw", crypto_routes.METADATA_HEADER: bad})
+        assert resp.status_code == 400
+    tampered = bytes([enc.content[0] ^ 1]) + enc.content[1:]
+    resp = client.post("/crypto/decrypt/raw", content=tampered,
+                       headers={"X-Key-Id": "raw", crypto_routes.METADATA_HEADER: metadata})
+    assert resp.status_code == 400
@@ -0,0 +1,75 @@
+import os
+import random
+
+import pytest
+from pyasn1.codec.der import encoder as der_encoder, decoder as der_decoder
+
+from app.crypto.core.der import encode_rsa_container, decode_rsa_container
+from app.crypto.core.enhanced_rsa import RSAContainer
+
+# длины на границах коротких/длинных форм DER-длины
+_LENGTHS = [0, 1, 127, 128, 255, 256, 512, 65535, 65536]
+
+
+def _pyasn1_encode(ct, ts, ent, n, e, mac):
+    c = RSAContainer()
+    c.setComponentByName('ciphertext', ct)
+    c.setComponentByName('timestamp', ts)
+    c.setComponentByName('entropy', ent)
+    c.setComponentByName('n', n)
+    c.setComponentByName('e', e)
+    c.setComponentByName('hmac', mac)
+    return der_encoder.encode(c)
+
+
+def _random_int(rng):
+    bits = rng.choice([0, 1, 7, 8, 9, 15, 16, 17, 2048, 4095, 4096])
+    value = rng.getrandbits(bits) if bits else 0
+    return -value if rng.random() < 0.2 else value
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_matches_pyasn1(seed):
+    rng = random.Random(seed)
+    fields = (
+        os.urandom(rng.choice(_LENGTHS)),
+        os.urandom(rng.choice(_LENGTHS[:5])),
+        os.urandom(rng.choice(_LENGTHS[:5])),
+        _random_int(rng),
+        _random_int(rng),
+        os.urandom(rng.choice([0, 32, 200])),
+    )
+    reference = _pyasn1_encode(*fields)
+    fast = encode_rsa_container(*fields)
+    assert fast == reference
+
+    decoded = decode_rsa_container(reference)
+    assert bytes(decoded.ciphertext) == fields[0]
+    assert bytes(decoded.timestamp) == fields[1]
+    assert bytes(decoded.entropy) == fields[2]
+    assert (decoded.n, decoded.e) == (fields[3], fields[4])
+    assert bytes(decoded.hmac) == fields[5]
+
+    asn1, rest = der_decoder.decode(fast, asn1Spec=RSAContainer())
+    assert rest == b"" and int(asn1['n']) == fields[3]
+
+
+def test_rejects_malformed():
+    good = encode_rsa_container(b"ct", b"ts", b"ent", 65537, 3, b"mac")
+    bad_inputs = [
+        good[:-1],                        # обрезан
+        good + b"\x00",                   # мусор в конце
+        b"\x31" + good[1:],               # не SEQUENCE
+        b"\x30\x80" + good[2:] + b"\x00\x00",  # неопределённая длина
+        b"\x30\x81" + good[1:],           # неминимальная длина
+    ]
+    for data in bad_inputs:
+        with pytest.raises(ValueError):
+            decode_rsa_container(data)
+    # неминимальный INTEGER
+    padded = bytearray(good)
+    idx = padded.index(b"\x02\x03\x01\x00\x01")
+    padded[idx:idx + 5] = b"\x02\x04\x00\x01\x00\x01"
+    padded[1] += 1
+    with pytest.raises(ValueError):
+        decode_rsa_container(bytes(padded))
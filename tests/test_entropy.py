@@ -0,0 +1,69 @@
+import time
+
+from fastapi import FastAPI
+from starlette.testclient import TestClient
+
+from app.crypto.core.entropy import SystemEntropySampler
+
+
+def _wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    return predicate()
+
+
+def test_read_does_not_wait_for_sampler():
+    # следующее измерение — только через 10 с
+    sampler = SystemEntropySampler(interval=10, depth=8)
+    sampler.start()
+    try:
+        assert _wait_for(lambda: sampler.samples >= 1)
+        start = time.perf_counter()
+        values = {sampler.read() for _ in range(100)}
+        elapsed = time.perf_counter() - start
+    finally:
+        sampler.stop(1)
+    assert elapsed < 0.5
+    assert all(len(v) == 64 for v in values)
+    assert len(values) == 100  # свежий таймер в каждом read()
+
+
+def test_read_before_start():
+    sampler = SystemEntropySampler(interval=10, depth=8)
+    assert len(sampler.read()) == 64
+    assert sampler.stats()["samples"] == 0
+
+
+def test_buffer_stays_at_configured_depth():
+    sampler = SystemEntropySampler(interval=0.001, depth=4)
+    sampler.start()
+    try:
+        assert _wait_for(lambda: sampler.samples >= 20)
+        stats = sampler.stats()
+    finally:
+        sampler.stop(1)
+    assert stats["buffer_depth"] == stats["buffer_capacity"] == 4
+    assert stats["samples"] >= 20
+
+
+def test_entropy_stats_endpoint(monkeypatch):
+    from app.api.routes import rsa as rsa_routes
+    from app.api.routes.auth import get_current_user
+
+    sampler = SystemEntropySampler(interval=0.02, depth=5)
+    monkeypatch.setattr(rsa_routes, "entropy_sampler", sampler)
+    app = FastAPI()
+    app.include_router(rsa_routes.router, prefix="/rsa")
+    app.dependency_overrides[get_current_user] = lambda: "test"
+
+    sampler.start()
+    try:
+        assert _wait_for(lambda: sampler.samples >= 1)
+        body = TestClient(app).get("/rsa/entropy/stats").json()
+    finally:
+        sampler.stop(1)
+    assert body["interval_ms"] == 20.0
+    assert body["buffer_capacity"] == 5
+    assert body["running"] is True
+    assert 1 <= body["buffer_depth"] <= 5
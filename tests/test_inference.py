@@ -0,0 +1,149 @@
+import threading
+
+import numpy as np
+import pytest
+
+from app.services.inference import InferenceBatcher
+from app.services.model_registry import ModelRegistry
+
+
+class _Encoder:
+    def __init__(self, scale):
+        self.scale = scale
+        self.calls = []
+
+    def forward(self, x):
+        self.calls.append(len(x))
+        return x.reshape(len(x), -1)[:, :4] * self.scale
+
+
+def _batcher(reg, **kwargs):
+    compiled = []
+
+    def compile_fn(encoder):
+        compiled.append(encoder)
+        return encoder.forward
+
+    return InferenceBatcher(reg, "chaos", compile_fn=compile_fn, **kwargs), compiled
+
+
+def test_concurrent_requests_share_forward_pass():
+    reg = ModelRegistry()
+    enc = _Encoder(2.0)
+    reg.publish("chaos", None, enc)
+    batcher, compiled = _batcher(reg, max_batch=16, max_wait_ms=200)
+
+    images = [np.full((1, 28, 28, 1), i, dtype=np.float32) for i in range(8)]
+    results = [None] * len(images)
+    start = threading.Barrier(len(images))
+
+    def call(i):
+        start.wait()
+        results[i] = batcher.predict(images[i], verbose=0)
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(len(images))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(5)
+
+    # каждый получил свой латент, проходов меньше, чем запросов
+    for i, latent in enumerate(results):
+        assert latent.shape == (1, 4) and latent[0, 0] == 2.0 * i
+    assert len(enc.calls) < len(images) and sum(enc.calls) == len(images)
+    stats = batcher.stats()
+    assert stats["requests"] == 8 and stats["batches"] == len(enc.calls)
+    assert sum(row["batches"] for row in stats["by_batch_size"].values()) == stats["batches"]
+    assert len(compiled) == 1
+    batcher.stop(1)
+
+
+def test_large_batches_bypass_queue_and_swap_recompiles():
+    reg = ModelRegistry()
+    reg.publish("chaos", None, _Encoder(1.0))
+    batcher, compiled = _batcher(reg, max_batch=4)
+
+    out = batcher.predict(np.ones((4, 28, 28, 1)))
+    assert out.shape == (4, 4) and batcher.stats()["bypassed"] == 1
+
+    reg.publish("chaos", None, _Encoder(3.0))
+    assert batcher.predict(np.ones((1, 28, 28, 1)))[0, 0] == 3.0
+    assert len(compiled) == 2
+    batcher.stop(1)
+
+
+def test_forward_error_reaches_caller():
+    reg = ModelRegistry()
+    batcher, _ = _batcher(reg, max_batch=4, max_wait_ms=1)
+    with pytest.raises(KeyError):
+        batcher.predict(np.ones((1, 28, 28, 1)))
+    batcher.stop(1)
+
+
+def test_stop_never_strands_concurrent_requests():
+    reg = ModelRegistry()
+    reg.publish("chaos", None, _Encoder(1.0))
+    batcher, _ = _batcher(reg, max_batch=64, max_wait_ms=1)
+
+    results = []
+    done = threading.Event()
+
+    def call():
+        while not done.is_set():
+            results.append(batcher.predict(np.ones((1, 28, 28, 1)), verbose=0))
+
+    # daemon: при регрессии зависший predict не держит процесс pytest
+    threads = [threading.Thread(target=call, daemon=True) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for _ in range(50):
+        batcher.stop(1)
+    done.set()
+    for t in threads:
+        t.join(5)
+    assert not any(t.is_alive() for t in threads)
+    assert results and all(r.shape == (1, 4) for r in results)
+    batcher.stop(1)
+
+
+def test_bad_batch_fails_callers_instead_of_killing_loop():
+    reg = ModelRegistry()
+    reg.publish("chaos", None, _Encoder(1.0))
+    batcher, _ = _batcher(reg, max_batch=16, max_wait_ms=200)
+
+    errors = []
+    start = threading.Barrier(2)
+
+    def call(shape):
+        start.wait()
+        try:
+            batcher.predict(np.ones(shape), verbose=0)
+        except ValueError as e:
+            errors.append(e)
+
+    # изображения разной формы не склеиваются в один батч
+    threads = [threading.Thread(target=call, args=(s,), daemon=True) for s in ((1, 28, 28, 1), (1, 14, 14, 1))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(5)
+    assert not any(t.is_alive() for t in threads)
+    assert len(errors) == 2
+    assert batcher.predict(np.ones((1, 28, 28, 1))).shape == (1, 4)
+    batcher.stop(1)
+
+
+def test_batch_never_exceeds_max_batch():
+    reg = ModelRegistry()
+    enc = _Encoder(1.0)
+    reg.publish("chaos", None, enc)
+    batcher, _ = _batcher(reg, max_batch=4, max_wait_ms=200)
+
+    # все запросы в очереди до сборки батча; 2 + 3 и 3 + 3 больше max_batch
+    sizes = (2, 3, 3, 1)
+    futures = [batcher._enqueue(np.ones((n, 28, 28, 1))) for n in sizes]
+    for fut, n in zip(futures, sizes):
+        assert fut.result(5).shape == (n, 4)
+    # не влезший запрос открывает следующий батч, а не теряется
+    assert enc.calls == [2, 3, 4]
+    batcher.stop(1)
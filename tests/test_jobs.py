@@ -0,0 +1,68 @@
+import threading
+
+import pytest
+
+from app.services.jobs import JobScheduler
+
+
+def test_submit_returns_immediately_and_reports_result():
+    gate = threading.Event()
+
+    def work(job, n):
+        gate.wait(2)
+        job.update(0.5, loss=0.25)
+        return {"training_time": 0.1, "mse": 0.01 * n}
+
+    sched = JobScheduler(workers=1)
+    job = sched.submit("retrain-chaos", work, 3)
+    assert sched.get(job.id).state in ("queued", "running")
+
+    gate.set()
+    job.future.result(2)
+    info = sched.get(job.id).info()
+    assert info["state"] == "succeeded" and info["progress"] == 1.0
+    assert info["result"]["mse"] == pytest.approx(0.03)
+    assert info["metrics"] == {"loss": 0.25}
+    assert info["duration_ms"] >= 0
+    sched.shutdown()
+
+
+def test_cancel_queued_and_running_jobs():
+    started = threading.Event()
+
+    def work(job):
+        started.set()
+        while not job.cancel_requested:
+            pass
+        return {"training_time": 0.0, "mse": 0.0}
+
+    sched = JobScheduler(workers=1)
+    running = sched.submit("retrain-random", work)
+    queued = sched.submit("retrain-random", work)
+    assert started.wait(2)
+
+    assert sched.cancel(queued.id)
+    assert queued.state == "cancelled"
+    assert sched.cancel(running.id)
+    running.future.result(2)
+    assert running.state == "cancelled" and running.result is None
+    assert not sched.cancel(running.id)
+    assert sched.stats()["cancelled"] == 2
+    sched.shutdown()
+
+
+def test_failed_job_and_history_limit():
+    def boom(job):
+        raise RuntimeError("no model")
+
+    sched = JobScheduler(workers=1, history=2)
+    jobs = []
+    for _ in range(4):
+        jobs.append(sched.submit("retrain-chaos", boom))
+        jobs[-1].future.result(2)
+    assert jobs[-1].state == "failed" and jobs[-1].error == "no model"
+    # завершённые задачи сверх history вытесняются при следующем submit
+    assert [job.id for job in sched.list()] == [job.id for job in jobs[2:]]
+    with pytest.raises(KeyError):
+        sched.get("missing")
+    sched.shutdown()
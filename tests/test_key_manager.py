@@ -0,0 +1,29 @@
+import time
+
+import pytest
+
+from app.services.key_manager import KeyManager
+
+
+def test_ttl_and_eviction():
+    km = KeyManager("system", shards=1, max_size=2)
+    km.store_key("a", b"1")
+    km.store_key("b", b"2", ttl=0.05)
+    km.get_key("a")                 # «a» становится самым свежим
+    km.store_key("c", b"3")         # вытесняет «b»
+    assert km.get_many(["a", "b", "c"]) == {"a": b"1", "c": b"3"}
+    assert km.stats()["evictions"] == 1
+
+    km.store_key("d", b"4", ttl=0.01)
+    time.sleep(0.02)
+    with pytest.raises(KeyError):
+        km.get_key("d")
+    assert km.stats()["expirations"] == 1
+
+
+def test_put_many_and_list():
+    km = KeyManager("system", shards=4)
+    km.put_many({f"k{i}": bytes([i]) for i in range(10)})
+    assert sorted(km.list_keys()) == sorted(f"k{i}" for i in range(10))
+    km.delete_key("k3")
+    assert "k3" not in km.get_many(["k3"])
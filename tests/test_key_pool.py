@@ -0,0 +1,92 @@
+import itertools
+import time
+
+import pytest
+
+from app.services.key_pool import KeyPool
+
+
+class CounterPool(KeyPool):
+    def __init__(self, low, high):
+        super().__init__(low, high)
+        self._seq = itertools.count()
+
+    def _produce(self):
+        return next(self._seq)
+
+
+def test_pool_fallback_and_refill():
+    pool = CounterPool(low=1, high=4)
+    # пул не запущен — синхронная генерация
+    assert pool.acquire() == 0
+    assert pool.stats()["misses"] == 1
+
+    pool.start()
+    deadline = time.time() + 2
+    while len(pool) < 4 and time.time() < deadline:
+        time.sleep(0.01)
+    assert len(pool) == 4
+
+    items = [pool.acquire() for _ in range(3)]
+    pool.stop(timeout=1)
+    assert len(set(items)) == 3  # каждый ключ выдаётся один раз
+    assert pool.stats()["hits"] == 3
+
+
+class BatchPool(CounterPool):
+    def __init__(self, low, high, batch_size):
+        KeyPool.__init__(self, low, high, batch_size)
+        self._seq = itertools.count()
+        self.batches = []
+
+    def _produce_batch(self, count):
+        self.batches.append(count)
+        return [next(self._seq) for _ in range(count)]
+
+
+def test_pool_refills_in_batches():
+    pool = BatchPool(low=2, high=10, batch_size=4)
+    pool.start()
+    deadline = time.time() + 2
+    while len(pool) < 10 and time.time() < deadline:
+        time.sleep(0.01)
+    pool.stop(timeout=1)
+
+    # пачки не выходят за high_watermark
+    assert pool.batches == [4, 4, 2]
+    stats = pool.stats()
+    assert stats["size"] == 10
+    assert stats["refills"] == 3
+    assert stats["produced"] == 10
+    assert stats["avg_refill_ms"] >= 0.0
+
+
+class _Encoder:
+    def __init__(self):
+        self.calls = []
+
+    def predict(self, images, verbose=0):
+        self.calls.append(len(images))
+        return images.reshape(len(images), -1)[:, :16]
+
+
+def test_rsa_pool_batches_latents():
+    from app.services.key_pool import RSAKeyPool
+
+    enc = _Encoder()
+    pool = RSAKeyPool(enc, low_watermark=1, high_watermark=2, batch_size=2)
+    pool.start()
+    deadline = time.time() + 30
+    while len(pool) < 2 and time.time() < deadline:
+        time.sleep(0.01)
+    pool.stop(timeout=1)
+
+    # два ключа — из одного encoder.predict
+    assert len(pool) == 2
+    assert enc.calls == [2]
+
+
+def test_key_pool_is_abstract():
+    # без _produce пул не создаётся
+    with pytest.raises(TypeError):
+        KeyPool(1, 2)
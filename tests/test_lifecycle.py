@@ -0,0 +1,59 @@
+import os
+import subprocess
+import sys
+import threading
+
+from app.services.lifecycle import Lifecycle
+
+
+def test_stages_run_in_order_and_report_progress():
+    order = []
+    entered = threading.Event()
+    gate = threading.Event()
+    lc = (
+        Lifecycle()
+        .add_stage("models", lambda: (order.append("models"), entered.set(), gate.wait(2)))
+        .add_stage("pools", lambda: order.append("pools"))
+    )
+    assert lc.status()["state"] == "pending"
+    lc.start()
+    assert entered.wait(2)
+    status = lc.status()
+    assert status["stage"] == "models"
+    assert not lc.ready
+    assert status["pending"] == ["pools"]
+
+    gate.set()
+    assert lc.wait(2)
+    status = lc.status()
+    assert order == ["models", "pools"]
+    assert status["state"] == "ready" and status["stage"] is None
+    assert set(status["timings_ms"]) == {"models", "pools"}
+
+
+def test_failed_stage_keeps_service_not_ready():
+    def boom():
+        raise RuntimeError("no weights")
+
+    lc = Lifecycle().add_stage("models", boom).add_stage("pools", lambda: None)
+    lc.run()
+    status = lc.status()
+    assert not lc.ready
+    assert status["state"] == "failed"
+    assert status["error"] == "models: no weights"
+    assert status["completed"] == []
+
+
+def test_import_app_skips_heavy_modules():
+    # отдельный процесс: в этом интерпретаторе другие тесты уже могли их загрузить
+    code = (
+        "import sys, app.main\n"
+        "print(sorted(m for m in ('tensorflow', 'torch', 'gmpy2') if m in sys.modules))\n"
+        "print(app.main.lifecycle.status()['pending'])"
+    )
+    env = dict(os.environ, JWT_SECRET_KEY=os.environ.get("JWT_SECRET_KEY", "test"))
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env, check=True)
+    loaded, pending = out.stdout.strip().splitlines()[-2:]
+    assert loaded == "[]"
+    # прогрев не генерирует неиспользуемый RSA-ключ до готовности
+    assert pending == "['models', 'services', 'entropy_sampler', 'key_pools']"
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from app.services.model_registry import ModelRegistry, model_footprint
+
+
+class _Var:
+    def __init__(self, shape, dtype="float32"):
+        self.shape = shape
+        self.dtype = dtype
+
+
+class _Encoder:
+    def __init__(self, value):
+        self.value = value
+
+    def predict(self, x, verbose=0):
+        return np.full((len(x), 4), self.value, dtype=np.float32)
+
+
+class _Autoencoder:
+    def __init__(self):
+        self.weights = [_Var((3, 3, 1, 8)), _Var((8,))]
+        self.optimizer = None
+
+
+def test_publish_increments_version_and_ref_follows_swap():
+    reg = ModelRegistry()
+    ref = reg.encoder_ref("chaos")
+    with pytest.raises(KeyError):
+        ref.predict(np.zeros((1, 28, 28, 1)))
+
+    reg.publish("chaos", _Autoencoder(), _Encoder(1.0), source="trained")
+    assert ref.version == 1
+    assert ref.predict(np.zeros((2, 28, 28, 1)))[0, 0] == 1.0
+
+    reg.publish("chaos", _Autoencoder(), _Encoder(2.0), expected_version=1)
+    assert ref.version == 2
+    assert ref.predict(np.zeros((1, 28, 28, 1)))[0, 0] == 2.0
+
+
+def test_publish_rejects_stale_expected_version():
+    reg = ModelRegistry()
+    first = reg.publish("chaos", _Autoencoder(), _Encoder(1.0))
+    reg.publish("chaos", _Autoencoder(), _Encoder(2.0), expected_version=1)
+    with pytest.raises(RuntimeError):
+        reg.publish("chaos", _Autoencoder(), _Encoder(3.0), expected_version=1)
+    assert reg.get("chaos").version == 2
+    # уже выданная версия не меняется
+    assert first.encoder.value == 1.0
+
+
+def test_stats_report_footprint():
+    ae = _Autoencoder()
+    ae.optimizer = type("Opt", (), {"variables": [_Var((3, 3, 1, 8)), _Var((8,))]})()
+    assert model_footprint(ae) == {"params": 80, "weight_bytes": 320, "optimizer_bytes": 320}
+
+    reg = ModelRegistry()
+    reg.publish("chaos", ae, _Encoder(0.0), source="checkpoint")
+    (info,) = reg.stats()
+    assert info["name"] == "chaos" and info["version"] == 1
+    assert info["source"] == "checkpoint" and info["weight_bytes"] == 320
@@ -14,3 +14,165 @@ def test_performance():
     cs.encrypt(kid, data)
     elapsed = (time.perf_counter() - start) * 1000
     assert elapsed < 500  # должно работать быстрее 0.5 сек
+
+
+def test_prime_engine_scaling():
+    import os
+    from app.crypto.core.prime_engine import benchmark_prime_engine
+
+    cores = os.cpu_count() or 1
+    counts = sorted({1, min(2, cores), cores})
+    results = benchmark_prime_engine(counts, pairs=4)
+    for workers, rate in results.items():
+        print(f"prime engine: {workers} процесс(ов) — {rate:.2f} ключей/с")
+    assert all(rate > 0 for rate in results.values())
+    if cores > 1:
+        # p и q ищутся одновременно: на нескольких ядрах не медленнее одного
+        assert results[cores] >= results[1]
+
+
+def test_kdf_profiles_benchmark():
+    from app.crypto.core.kdf import PBKDF2Strategy, HKDFStrategy, benchmark_kdf
+
+    results = benchmark_kdf([
+        PBKDF2Strategy(5000),
+        PBKDF2Strategy(1000),
+        HKDFStrategy(),
+    ])
+    for label, ms in results.items():
+        print(f"KDF {label}: {ms:.3f} мс")
+    assert results["hkdf"] < results["pbkdf2-5000"]
+
+
+def test_der_codec_benchmark():
+    import os
+    import timeit
+    from pyasn1.codec.der import encoder as der_encoder, decoder as der_decoder
+    from app.crypto.core.der import encode_rsa_container, decode_rsa_container
+    from app.crypto.core.enhanced_rsa import RSAContainer
+
+    fields = (os.urandom(512), b"2025-01-01T00:00:00.000000", os.urandom(32),
+              int.from_bytes(os.urandom(512), "big"), 65537, os.urandom(32))
+
+    def slow_encode():
+        c = RSAContainer()
+        for name, value in zip(("ciphertext", "timestamp", "entropy", "n", "e", "hmac"), fields):
+            c.setComponentByName(name, value)
+        return der_encoder.encode(c)
+
+    blob = slow_encode()
+    rounds = 200
+    slow_enc = timeit.timeit(slow_encode, number=rounds) / rounds
+    fast_enc = timeit.timeit(lambda: encode_rsa_container(*fields), number=rounds) / rounds
+    slow_dec = timeit.timeit(lambda: der_decoder.decode(blob, asn1Spec=RSAContainer()), number=rounds) / rounds
+    fast_dec = timeit.timeit(lambda: decode_rsa_container(blob), number=rounds) / rounds
+    print(f"DER encode: pyasn1 {slow_enc * 1e6:.1f} мкс, fast {fast_enc * 1e6:.1f} мкс")
+    print(f"DER decode: pyasn1 {slow_dec * 1e6:.1f} мкс, fast {fast_dec * 1e6:.1f} мкс")
+    assert fast_enc < slow_enc and fast_dec < slow_dec
+
+
+def test_batch_vs_single_encrypt_benchmark():
+    import os
+    import time
+    from app.schemas import ConfigOptions
+    from app.services.batch import BatchProcessor
+    from app.services.key_manager import KeyManager
+    from app.services.crypto_service import CryptoService
+
+    class FixedKeyML:
+        # вместо автоэнкодера — готовый ключ: замеряем только накладные расходы
+        def retrain_model(self):
+            pass
+
+        def generate_symmetric_key(self):
+            return os.urandom(32)
+
+    settings = ConfigOptions(core_type="python", entropy_source="system", retrain_autoencoder=False)
+    batch = BatchProcessor(4)
+    cs = CryptoService(settings, KeyManager("system"), FixedKeyML(), encoder=None, batch_processor=batch)
+    messages = [f"message {i}".encode() for i in range(1000)]
+
+    # лучший из трёх чередующихся прогонов — чтобы шум планировщика не решал исход
+    single_time = batch_time = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        singles = [cs.encrypt("bench", m) for m in messages]
+        single_time = min(single_time, time.perf_counter() - start)
+
+        start = time.perf_counter()
+        outcomes = cs.encrypt_batch("bench", messages)
+        batch_time = min(batch_time, time.perf_counter() - start)
+
+    print(f"1000 одиночных encrypt: {single_time * 1000:.1f} мс, пакет из 1000: {batch_time * 1000:.1f} мс")
+    assert len(singles) == 1000
+    assert all(ok for ok, _ in outcomes)
+    assert batch_time < single_time
+    decrypted = cs.decrypt_batch("bench", [value for _, value in outcomes])
+    batch.shutdown()
+    assert [value for _, value in decrypted] == messages
+
+
+def test_key_manager_stress():
+    import os
+    import threading
+    import time
+    from app.services.key_manager import KeyManager
+
+    def run(km, threads=8, ops=20000):
+        ids = [f"k{i}" for i in range(1000)]
+        km.put_many({key_id: os.urandom(32) for key_id in ids})
+
+        def worker(n):
+            for i in range(ops):
+                key_id = ids[(i * 7 + n) % len(ids)]
+                if i % 4 == 0:
+                    km.store_key(key_id, b"x" * 32)
+                else:
+                    km.get_key(key_id)
+
+        pool = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+        start = time.perf_counter()
+        for t in pool:
+            t.start()
+        for t in pool:
+            t.join()
+        return threads * ops / (time.perf_counter() - start)
+
+    # прогоны чередуются, берётся лучший: один замер слишком шумный для сравнения
+    single_km = KeyManager("system", shards=1)
+    sharded_km = KeyManager("system", shards=16, max_size=2000)
+    single = sharded = 0.0
+    for _ in range(3):
+        single = max(single, run(single_km))
+        sharded = max(sharded, run(sharded_km))
+    print(f"KeyManager: 1 шард {single:,.0f} оп/с, 16 шардов {sharded:,.0f} оп/с")
+    stats = sharded_km.stats()
+    assert stats["misses"] == 0 and stats["hits"] > 0
+    # под GIL шардирование не ускоряет, но и не должно отнимать пропускную способность
+    assert sharded >= 0.8 * single
+
+
+def test_symmetric_engine_throughput():
+    import os
+    import time
+    from app.crypto.encryption import PythonEncryption, get_cipher
+
+    key = os.urandom(32)
+    engines = {
+        "aes-cbc": PythonEncryption(key),
+        "aes-gcm": get_cipher("bench-gcm", key, "aes-gcm"),
+        "chacha20-poly1305": get_cipher("bench-chacha", key, "chacha20-poly1305"),
+    }
+    for size in (64, 4 * 1024, 256 * 1024, 4 * 1024 * 1024):
+        payload = memoryview(os.urandom(size))
+        rounds = max(4, (16 * 1024 * 1024) // size)
+        line = []
+        for name, engine in engines.items():
+            data = bytes(payload) if name == "aes-cbc" else payload
+            start = time.perf_counter()
+            for _ in range(rounds):
+                ct, meta = engine.encrypt(data)
+            elapsed = time.perf_counter() - start
+            assert engine.decrypt(ct, meta)[0] == payload
+            line.append(f"{name} {size * rounds / elapsed / 2 ** 20:,.0f} МБ/с")
+        print(f"{size:>8} Б: " + ", ".join(line))
@@ -0,0 +1,17 @@
+import os
+
+import gmpy2
+
+from app.crypto.core.prime import KEY_BIT_LENGTH, SIEVE_WINDOW, generate_prime, search_prime
+
+
+def test_matches_next_prime():
+    for seed in [os.urandom(32) for _ in range(5)] + [b"\x00" * 32, os.urandom(256)]:
+        si = int.from_bytes(seed, "big") | (1 << (KEY_BIT_LENGTH - 1))
+        assert generate_prime(seed) == int(gmpy2.next_prime(si))
+
+
+def test_search_stats():
+    _, stats = search_prime(os.urandom(32))
+    assert stats["tested"] >= 1
+    assert stats["sieved"] + stats["tested"] <= stats["windows"] * SIEVE_WINDOW
@@ -0,0 +1,50 @@
+import threading
+
+from app.services.model_registry import ModelRegistry
+from app.services.retrainer import BackgroundRetrainer
+
+
+def test_schedule_returns_immediately_and_coalesces():
+    started = threading.Event()
+    gate = threading.Event()
+    runs = []
+
+    def train():
+        started.set()
+        gate.wait(2)
+        runs.append(1)
+
+    r = BackgroundRetrainer(train)
+    assert r.schedule()
+    assert started.wait(2)
+    assert r.stats()["running"]
+    # одна заявка ждёт за текущим обучением, остальные к ней приклеиваются
+    assert r.schedule()
+    assert not r.schedule()
+    assert not r.schedule()
+
+    gate.set()
+    assert r.wait(2)
+    stats = r.stats()
+    assert len(runs) == 2
+    assert stats["completed"] == 2 and stats["coalesced"] == 2
+    assert not stats["pending"] and not stats["running"]
+
+
+def test_failed_retrain_keeps_serving_version():
+    reg = ModelRegistry()
+    reg.publish("chaos", "ae-v1", "enc-v1")
+
+    def train():
+        current = reg.get("chaos")
+        # кто-то опубликовал версию, пока шло обучение
+        reg.publish("chaos", "ae-v2", "enc-v2")
+        reg.publish("chaos", "shadow", "shadow", expected_version=current.version)
+
+    r = BackgroundRetrainer(train)
+    r.schedule()
+    assert r.wait(2)
+    stats = r.stats()
+    assert stats["failed"] == 1 and stats["completed"] == 0
+    assert "expected 1" in stats["last_error"]
+    assert reg.get("chaos").encoder == "enc-v2"
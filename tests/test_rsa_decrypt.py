@@ -0,0 +1,95 @@
+import os
+import time
+from datetime import datetime
+
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from app.crypto.core.enhanced_rsa import rsa_encrypt_with_metadata, rsa_decrypt_with_metadata
+from app.crypto.core.security import decrypt_container, get_decryptor
+
+private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+public_key = private_key.public_key()
+
+
+def _container(data: bytes) -> bytes:
+    entropy = os.urandom(32)
+    ts = datetime.utcnow().isoformat().encode("utf-8")
+    return rsa_encrypt_with_metadata(public_key, private_key, entropy, ts, data)
+
+
+def test_crt_decrypt_roundtrip():
+    for data in (b"", b"Hello, RSA!", os.urandom(100)):
+        # несколько вызовов подряд — проверка обновления ослепления
+        for _ in range(3):
+            assert decrypt_container(_container(data), private_key) == data
+
+
+def test_tampered_container_rejected():
+    container = bytearray(_container(b"secret"))
+    container[20] ^= 1
+    with pytest.raises(Exception):
+        decrypt_container(bytes(container), private_key)
+
+
+def test_crt_faster_than_full_modulus():
+    container = _container(b"timing")
+    dec = get_decryptor(private_key)
+    nums = private_key.private_numbers()
+    c = int.from_bytes(os.urandom(64), "big")
+
+    start = time.perf_counter()
+    for _ in range(20):
+        dec.raw_decrypt(c)
+    crt = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(20):
+        pow(c, nums.d, nums.public_numbers.n)
+    full = time.perf_counter() - start
+    print(f"CRT: {crt * 50:.2f} мс, полный модуль: {full * 50:.2f} мс")
+    assert crt < full
+    assert decrypt_container(container, private_key) == rsa_decrypt_with_metadata(container, private_key)
+
+
+def test_async_timing_equalizer_concurrency():
+    import asyncio
+    from app.crypto.core.security import TimingEqualizer
+
+    eq = TimingEqualizer(target=0.05, workers=4)
+    container = _container(b"concurrent")
+
+    async def main():
+        return await asyncio.gather(*[
+            eq.run(decrypt_container, container, private_key) for _ in range(100)
+        ])
+
+    start = time.perf_counter()
+    results = asyncio.run(main())
+    elapsed = time.perf_counter() - start
+    eq.shutdown()
+    assert all(r == b"concurrent" for r in results)
+    stats = eq.stats()
+    print(f"100 расшифровок за {elapsed:.2f} с, джиттер p99 {stats['jitter_p99_ms']:.2f} мс")
+    assert stats["calls"] == 100
+    # 100 запросов × 50 мс последовательно заняли бы 5 с
+    assert elapsed < 2.5
+
+
+def test_hybrid_roundtrip_large_payload():
+    from app.crypto.core.enhanced_rsa import (
+        rsa_hybrid_encrypt, rsa_hybrid_decrypt, is_hybrid_container, HYBRID_CHUNK_SIZE,
+    )
+
+    entropy = os.urandom(32)
+    for size in (0, HYBRID_CHUNK_SIZE, 3 * HYBRID_CHUNK_SIZE + 5, 1 << 20):
+        data = os.urandom(size)
+        container = rsa_hybrid_encrypt(public_key, entropy, b"ts", data)
+        assert is_hybrid_container(container)
+        assert rsa_hybrid_decrypt(container, private_key) == data
+
+    assert not is_hybrid_container(_container(b"short"))
+    broken = bytearray(rsa_hybrid_encrypt(public_key, entropy, b"ts", b"x" * 1000))
+    broken[-1] ^= 1
+    with pytest.raises(Exception):
+        rsa_hybrid_decrypt(bytes(broken), private_key)
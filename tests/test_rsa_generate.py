@@ -0,0 +1,55 @@
+import json
+
+from fastapi import FastAPI
+from starlette.testclient import TestClient
+
+from app.api.routes import rsa as rsa_routes
+from app.api.routes.auth import get_current_user
+from app.crypto.core.enhanced_rsa import encode_latents, derive_rsa_keys_from_latent
+from app.services import deps
+from app.services.rsa_key_manager import RSAKeyManager
+
+
+class _Encoder:
+    def __init__(self):
+        self.calls = []
+
+    def predict(self, images, verbose=0):
+        self.calls.append(len(images))
+        return images.reshape(len(images), -1)[:, :16]
+
+
+def _check_key(priv, pub):
+    numbers = priv.private_numbers()
+    assert numbers.p * numbers.q == pub.public_numbers().n
+    assert numbers.p != numbers.q
+
+
+def test_latents_from_single_predict():
+    enc = _Encoder()
+    latents = encode_latents(enc, 3)
+    assert enc.calls == [3]
+
+    keys = [derive_rsa_keys_from_latent(latent) for latent in latents]
+    for priv, pub, _, _ in keys:
+        _check_key(priv, pub)
+    assert len({pub.public_numbers().n for _, pub, _, _ in keys}) == 3
+
+
+def test_generate_batch_endpoint(tmp_path, monkeypatch):
+    enc = _Encoder()
+    monkeypatch.setattr(deps, "encoder", enc)
+    monkeypatch.setattr(rsa_routes, "rsa_km", RSAKeyManager(f"sqlite:///{tmp_path / 'keys.db'}", passphrase="secret"))
+    app = FastAPI()
+    app.include_router(rsa_routes.router, prefix="/rsa")
+    app.dependency_overrides[get_current_user] = lambda: "test"
+
+    resp = TestClient(app).post("/rsa/generate/batch", params={"count": 3})
+    assert resp.status_code == 200
+    rows = [json.loads(line) for line in resp.text.splitlines()]
+    assert enc.calls == [3]
+    assert len(rows) == 3 and all("error" not in row for row in rows)
+    assert len({row["key_id"] for row in rows}) == 3
+    assert len({row["public_key_pem"] for row in rows}) == 3
+    for row in rows:
+        _check_key(*rsa_routes.rsa_km.get(row["key_id"])[:2])
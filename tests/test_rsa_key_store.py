@@ -0,0 +1,82 @@
+import threading
+
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from app.services.rsa_key_manager import RSAKeyManager
+
+
+def _key():
+    priv = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    return priv, priv.public_key(), b"e" * 32, b"2025-01-01T00:00:00"
+
+
+def test_lru_eviction_and_persistence(tmp_path):
+    url = f"sqlite:///{tmp_path / 'keys.db'}"
+    km = RSAKeyManager(url, cache_size=2, passphrase="secret")
+    keys = [_key() for _ in range(3)]
+    ids = [km.create(*k) for k in keys]
+
+    # первый ключ вытеснен из кэша, но лениво подгружается из базы
+    assert km.stats()["evictions"] == 1
+    priv, pub, entropy, ts = km.get(ids[0])
+    assert priv.private_numbers() == keys[0][0].private_numbers()
+    assert (entropy, ts) == keys[0][2:]
+    assert km.stats()["misses"] == 1
+
+    # после «перезапуска» ключи на месте
+    km2 = RSAKeyManager(url, cache_size=2, passphrase="secret")
+    assert km2.get(ids[2])[1].public_numbers() == keys[2][1].public_numbers()
+    assert km2.public_pem(ids[1]).startswith(b"-----BEGIN PUBLIC KEY-----")
+
+
+def test_unknown_key(tmp_path):
+    km = RSAKeyManager(f"sqlite:///{tmp_path / 'keys.db'}", passphrase="secret")
+    try:
+        km.get("missing")
+    except KeyError:
+        pass
+    else:
+        raise AssertionError("KeyError expected")
+
+
+def test_persistent_store_requires_passphrase(tmp_path):
+    with pytest.raises(ValueError):
+        RSAKeyManager(f"sqlite:///{tmp_path / 'keys.db'}")
+    assert not (tmp_path / "keys.db").exists()
+
+    # в памяти — без пароля, одна база на все потоки
+    km = RSAKeyManager(cache_size=1)
+    key = _key()
+    key_id = km.create(*key)
+    km.create(*_key())  # вытесняет первый ключ из кэша
+    result = []
+    t = threading.Thread(target=lambda: result.append(km.get(key_id)))
+    t.start()
+    t.join()
+    assert result[0][1].public_numbers() == key[1].public_numbers()
+
+
+def test_memory_store_concurrent_access():
+    # общее соединение в памяти: параллельные create/get не должны мешать друг другу
+    km = RSAKeyManager(cache_size=1)
+    key = _key()
+    ids, errors = [], []
+
+    def worker():
+        try:
+            for _ in range(25):
+                key_id = km.create(*key)
+                ids.append(key_id)
+                km.public_pem(ids[0])  # PEM-кэш на 4 ключа — почти всегда чтение из базы
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+    assert len(ids) == 200
+    assert all(km.public_pem(key_id) for key_id in ids)
@@ -0,0 +1,86 @@
+import os
+from datetime import datetime
+
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi import FastAPI
+from starlette.testclient import TestClient
+
+from app.api.routes import rsa as rsa_routes
+from app.api.routes.auth import get_current_user
+from app.services.deps import cfg
+from app.services.rsa_key_manager import RSAKeyManager
+
+
+@pytest.fixture
+def client(monkeypatch):
+    km = RSAKeyManager()
+    monkeypatch.setattr(rsa_routes, "rsa_km", km)
+    priv = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    key_id = km.create(priv, priv.public_key(), os.urandom(32), datetime.utcnow().isoformat().encode("utf-8"))
+    app = FastAPI()
+    app.include_router(rsa_routes.router, prefix="/rsa")
+    app.dependency_overrides[get_current_user] = lambda: "test"
+    return TestClient(app), key_id
+
+
+@pytest.mark.parametrize("size, mode", [(100, None), (100, "oaep"), (100_000, None), (100, "hybrid")])
+def test_raw_roundtrip(client, size, mode):
+    client, key_id = client
+    data = os.urandom(size)
+    headers = {"X-Key-Id": key_id}
+    if mode:
+        headers["X-Crypto-Mode"] = mode
+    enc = client.post("/rsa/encrypt/raw", content=data, headers=headers)
+    assert enc.status_code == 200
+    assert enc.headers["content-type"] == "application/octet-stream"
+
+    dec = client.post("/rsa/decrypt/raw", content=enc.content, headers={"X-Key-Id": key_id})
+    assert dec.status_code == 200
+    assert dec.content == data
+
+
+def test_raw_errors(client):
+    client, key_id = client
+    assert client.post("/rsa/encrypt/raw", content=b"x", headers={"X-Key-Id": "missing"}).status_code == 404
+    assert client.post("/rsa/decrypt/raw", content=b"x", headers={"X-Key-Id": "missing"}).status_code == 404
+    resp = client.post("/rsa/encrypt/raw", content=b"x", headers={"X-Key-Id": key_id, "X-Crypto-Mode": "nope"})
+    assert resp.status_code == 400
+    assert client.post("/rsa/decrypt/raw", content=b"garbage", headers={"X-Key-Id": key_id}).status_code == 400
+
+
+def test_decrypt_unknown_key_before_hex(client):
+    client, key_id = client
+    # неизвестный ключ важнее битого hex
+    resp = client.post("/rsa/decrypt", json={"key_id": "missing", "ciphertext_asn1_hex": "zz"})
+    assert resp.status_code == 404
+    resp = client.post("/rsa/decrypt", json={"key_id": key_id, "ciphertext_asn1_hex": "zz"})
+    assert resp.status_code == 400
+
+
+def test_batch_size_limits(client):
+    client, key_id = client
+    for path in ("/rsa/encrypt/batch", "/rsa/decrypt/batch"):
+        assert client.post(path, json={"key_id": key_id, "items": []}).status_code == 400
+        items = ["00"] * (cfg.BATCH_MAX_ITEMS + 1)
+        assert client.post(path, json={"key_id": key_id, "items": items}).status_code == 413
+
+
+def test_evicted_key_reloaded(monkeypatch):
+    km = RSAKeyManager(cache_size=1)
+    monkeypatch.setattr(rsa_routes, "rsa_km", km)
+    keys = [rsa.generate_private_key(public_exponent=65537, key_size=2048) for _ in range(2)]
+    ts = datetime.utcnow().isoformat().encode("utf-8")
+    key_id, _ = [km.create(k, k.public_key(), os.urandom(32), ts) for k in keys]
+    app = FastAPI()
+    app.include_router(rsa_routes.router, prefix="/rsa")
+    app.dependency_overrides[get_current_user] = lambda: "test"
+    client = TestClient(app)
+
+    # первый ключ вытеснен вторым — оба запроса идут мимо кэша
+    enc = client.post("/rsa/encrypt", json={"key_id": key_id, "data": "hello"})
+    assert enc.status_code == 200
+    km.create(keys[1], keys[1].public_key(), os.urandom(32), ts)
+    dec = client.post("/rsa/decrypt", json={"key_id": key_id, "ciphertext_asn1_hex": enc.json()["ciphertext_asn1_hex"]})
+    assert dec.status_code == 200 and dec.json()["plaintext"] == "hello"
+    assert km.stats()["misses"] == 2
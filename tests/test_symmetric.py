@@ -0,0 +1,51 @@
+import base64
+import os
+
+import pytest
+from cryptography.exceptions import InvalidTag
+
+from app.crypto.encryption import (
+    AEADEncryption,
+    PythonEncryption,
+    get_cipher,
+    symmetric_encrypt,
+    symmetric_decrypt,
+)
+
+
+@pytest.mark.parametrize("algorithm", ["aes-gcm", "chacha20-poly1305", "aes-cbc"])
+def test_symmetric_roundtrip(algorithm):
+    key = os.urandom(32)
+    data = bytearray(os.urandom(1000))
+    ct, meta = symmetric_encrypt("k1", key, memoryview(data)[100:], algorithm)
+    assert symmetric_decrypt("k1", key, memoryview(ct), meta) == bytes(data[100:])
+
+
+def test_legacy_cbc_ciphertext_still_decrypts():
+    key = os.urandom(32)
+    ct, meta = PythonEncryption(key).encrypt(b"old message")
+    assert set(meta) == {"iv"}
+    assert symmetric_decrypt("k2", key, ct, meta) == b"old message"
+
+
+def test_random_nonces_are_unique():
+    key = os.urandom(32)
+    # разные экземпляры с одним ключом (вытеснение из кэша, другой воркер)
+    engines = [AEADEncryption(key), AEADEncryption(key)]
+    nonces = [base64.b64decode(e.encrypt(b"x")[1]["nonce"]) for e in engines for _ in range(500)]
+    assert all(len(n) == 12 for n in nonces)
+    assert len(set(nonces)) == 1000
+
+
+def test_cipher_cache_follows_key_rotation():
+    k1, k2 = os.urandom(32), os.urandom(32)
+    first = get_cipher("k3", k1)
+    assert get_cipher("k3", k1) is first
+    second = get_cipher("k3", k2)
+    assert second is not first
+
+    ct, meta = second.encrypt(b"data")
+    with pytest.raises(InvalidTag):
+        symmetric_decrypt("k3", k1, ct, meta)
+    with pytest.raises(ValueError):
+        symmetric_decrypt("k3", k2, ct, {})